@@ -1,211 +1,657 @@
 """
 QA Testing Checklist Application
-Flask Backend with Local JSON Storage
+Flask Backend with Local JSON (or SQLite) Storage
 Python Version: 3.12.8
 Flask Version: 3.1.2
 """
 
-from flask import Flask, render_template, request, jsonify
-import json
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.local import LocalProxy
+import atexit
+import click
+import io
 import os
+import queue
+import re
+import time
 from datetime import datetime
 from pathlib import Path
-import traceback
-
-# Initialize Flask app
-app = Flask(__name__)
-app.config['JSON_SORT_KEYS'] = False
-
-# File paths
-DATA_DIR = Path('data')
-DATA_DIR.mkdir(exist_ok=True)
-
-CURRENT_SESSION_FILE = DATA_DIR / 'current_session.json'
-COMPLETED_FILE = DATA_DIR / 'completed.json'
-DEFAULT_CHECKLIST_FILE = Path('default_checklist.json')
-
-# Load default checklist from external JSON file
-def load_default_checklist():
-    """Load default checklist from external JSON file"""
-    try:
-        if DEFAULT_CHECKLIST_FILE.exists():
-            with open(DEFAULT_CHECKLIST_FILE, 'r', encoding='utf-8') as f:
-                checklist = json.load(f)
-                print(f"✓ Loaded default checklist from {DEFAULT_CHECKLIST_FILE}")
-                return checklist
-        else:
-            print(f"✗ Default checklist file not found: {DEFAULT_CHECKLIST_FILE}")
-            print("  Please create 'default_checklist.json' in the project root directory")
-            return []
-    except json.JSONDecodeError as e:
-        print(f"✗ Error parsing default_checklist.json: {str(e)}")
-        return []
-    except Exception as e:
-        print(f"✗ Error loading default checklist: {str(e)}")
-        traceback.print_exc()
-        return []
-
-# Load default checklist at startup
-DEFAULT_CHECKLIST = load_default_checklist()
+
+import codec
+import metrics
+from checklists import TemplateRegistry
+from events import ChangeBroadcaster, format_event
+from export import CSV_COLUMNS, EXPORT_FORMATS, export_history
+from history_stats import HistoryStats
+from importer import IMPORT_FORMATS, detect_format, import_history
+from logs import configure_logging, logger, new_request_id
+from models import build_batch_operations, find_heading, heading_summary, project_stats, project_summary
+from search import SearchIndex, tokenize
+from storage import (DEFAULT_SESSION_ID, JsonBackend, SessionManager, create_backend, migrate_json_to_sqlite,
+                     set_storage_format)
+
+# Routes and CLI commands; create_app() registers them on an application
+bp = Blueprint('qa', __name__, cli_group=None)
+
+# Responses under these paths are compressed (see compress_response)
+COMPRESSED_PATHS = ('/api/session', '/api/sessions', '/api/history')
+
+# The running application's storage objects (see AppState). session_store and
+# broadcaster belong to the session the request is about: the one in the
+# /api/sessions/<session_id>/... URL, or the default session.
+storage_backend = LocalProxy(lambda: current_app.extensions['qa_checklist'].storage_backend)
+search_index = LocalProxy(lambda: current_app.extensions['qa_checklist'].search_index)
+history_stats = LocalProxy(lambda: current_app.extensions['qa_checklist'].history_stats)
+session_store = LocalProxy(lambda: current_session_store())
+broadcaster = LocalProxy(lambda: current_app.extensions['qa_checklist'].broadcasters[current_session_id()])
+
+
+def default_config():
+    """Configuration read from QA_* environment variables"""
+    return {
+        # Where current_session.json / completed.json / qa_checklist.db live
+        'DATA_DIR': os.environ.get('QA_DATA_DIR', 'data'),
+        'DEFAULT_CHECKLIST_FILE': os.environ.get(
+            'QA_DEFAULT_CHECKLIST', str(Path(__file__).resolve().parent / 'default_checklist.json')),
+        # Further checklist templates, one <name>.json each (see GET /api/templates)
+        'TEMPLATES_DIR': os.environ.get(
+            'QA_TEMPLATES_DIR', str(Path(__file__).resolve().parent / 'checklist_templates')),
+        # Development server only (python app.py); production servers bind themselves
+        'HOST': os.environ.get('QA_HOST', '127.0.0.1'),
+        'PORT': int(os.environ.get('QA_PORT', '10101')),
+        # Upper bound (seconds) on how long a change can sit in memory before it is
+        # written to current_session.json. 0 writes on every request.
+        'SESSION_FLUSH_INTERVAL': float(os.environ.get('QA_SESSION_FLUSH_INTERVAL', '1.0')),
+        # Journal mode appends each change to current_session.journal instead of
+        # rewriting the snapshot; the journal is folded back in past this many bytes
+        'SESSION_JOURNAL': os.environ.get('QA_SESSION_JOURNAL', '0') == '1',
+        'JOURNAL_COMPACT_BYTES': int(os.environ.get('QA_JOURNAL_COMPACT_BYTES', str(256 * 1024))),
+        # 'json' (current_session.json + completed.json) or 'sqlite' (data/qa_checklist.db)
+        'STORAGE_BACKEND': os.environ.get('QA_STORAGE_BACKEND', 'json'),
+        # Several worker processes share the data directory (e.g. gunicorn -w 4):
+        # every request locks the session across processes, picks up other workers'
+        # changes and writes its own before answering. Disables write-behind and
+        # journal mode.
+        'MULTI_PROCESS': os.environ.get('QA_MULTI_PROCESS', '0') == '1',
+        # How session files and other snapshots are written: 'compact' or 'pretty'
+        # (indented) JSON, compressed with 'none', 'gzip' or 'zstd' (needs zstandard).
+        # Files in any of these forms are read back regardless of the setting.
+        'STORAGE_FORMAT': os.environ.get('QA_STORAGE_FORMAT', 'compact'),
+        'STORAGE_COMPRESSION': os.environ.get('QA_STORAGE_COMPRESSION', 'none'),
+        # gzip (or brotli, if installed) for /api/session and /api/history responses
+        # when the client accepts it and the body is at least COMPRESS_MIN_SIZE bytes
+        'RESPONSE_COMPRESSION': os.environ.get('QA_RESPONSE_COMPRESSION', '1') == '1',
+        'COMPRESS_MIN_SIZE': 1024,
+        'COMPRESS_LEVEL': 6,
+        # Prometheus metrics at /metrics (request latency, storage timings, cache hits)
+        'METRICS': os.environ.get('QA_METRICS', '1') == '1',
+        # Log every request slower than this many seconds, with where its time went. 0 = off
+        'SLOW_REQUEST_SECONDS': float(os.environ.get('QA_SLOW_REQUEST_SECONDS', '0')),
+        # DEBUG, INFO, WARNING or ERROR; 'text' or 'json' (one object per line), to stderr
+        'LOG_LEVEL': os.environ.get('QA_LOG_LEVEL', 'INFO'),
+        'LOG_FORMAT': os.environ.get('QA_LOG_FORMAT', 'text'),
+        # Page size for /api/history when the client doesn't ask for one, and the cap
+        'HISTORY_PAGE_SIZE': 25,
+        'HISTORY_MAX_PAGE_SIZE': 200,
+        # Headings per page of a project's outline, and items/notes/bugs per page of
+        # one heading or section, when the history details view doesn't ask for more
+        'HISTORY_HEADING_PAGE_SIZE': 50,
+        'HISTORY_ITEM_PAGE_SIZE': 100,
+        # Results per page of /api/history/search
+        'SEARCH_PAGE_SIZE': 20,
+        # Projects stored per write by /api/history/import and flask import-history
+        'IMPORT_BATCH_SIZE': 500,
+        # Most operations accepted by one /api/checklist/batch request
+        'BATCH_MAX_OPERATIONS': 500,
+        # Recent session operations kept in memory for /api/session/changes; clients
+        # that fall further behind than this get the full session instead
+        'SESSION_CHANGELOG_SIZE': int(os.environ.get('QA_SESSION_CHANGELOG_SIZE', '1000')),
+        # Live updates over /api/session/stream. Each open stream holds one worker
+        # thread, so they are capped; clients turned away fall back to polling.
+        # Streams are recycled after SESSION_STREAM_MAX_AGE seconds (the browser
+        # reconnects and resumes from the last event it saw).
+        'SESSION_STREAM_MAX': int(os.environ.get('QA_SESSION_STREAM_MAX', '20')),
+        'SESSION_STREAM_QUEUE_SIZE': 256,
+        'SESSION_STREAM_HEARTBEAT': 15,
+        'SESSION_STREAM_MAX_AGE': 300,
+    }
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """jsonify() and request.get_json() through codec (orjson when it is installed)"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        text = codec.dumps(obj, pretty=bool(kwargs.get('indent')),
+                           sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                           default=kwargs.get('default', self.default))
+        if has_request_context():
+            metrics.record_response_encode(request_route(), started)
+        return text
+
+    def loads(self, s, **kwargs):
+        return codec.decode(s)
+
+
+class AppState:
+    """Everything one application instance keeps between requests"""
+
+    def __init__(self, storage_backend, sessions, broadcasters, templates, search_index, history_stats):
+        self.storage_backend = storage_backend
+        # session id -> SessionStore, opened on first use
+        self.sessions = sessions
+        # session id -> ChangeBroadcaster for that session's open streams
+        self.broadcasters = broadcasters
+        self.templates = templates
+        # Full-text index over completed history (/api/history/search)
+        self.search_index = search_index
+        # Running totals over completed history (/api/history/stats)
+        self.history_stats = history_stats
+
+
+def create_app(config=None):
+    """Build the application: configuration, storage, default checklist and routes.
+
+    All file access happens here, once per process (so once per worker under
+    a production server), rather than as a side effect of importing this
+    module. ``config`` overrides any of the defaults from default_config().
+    """
+    app = Flask(__name__)
+    app.json = CodecJSONProvider(app)
+    app.config['JSON_SORT_KEYS'] = False
+    app.config.update(default_config())
+    if config:
+        app.config.update(config)
+    
+    configure_logging(app.config['LOG_LEVEL'], app.config['LOG_FORMAT'])
+    
+    if app.config['MULTI_PROCESS'] and app.config['SESSION_JOURNAL']:
+        logger.warning("QA_SESSION_JOURNAL is ignored when QA_MULTI_PROCESS=1")
+        app.config['SESSION_JOURNAL'] = False
+    
+    set_storage_format(app.config['STORAGE_FORMAT'], app.config['STORAGE_COMPRESSION'])
+    
+    data_dir = Path(app.config['DATA_DIR'])
+    data_dir.mkdir(parents=True, exist_ok=True)
+    
+    storage_backend = create_backend(app.config['STORAGE_BACKEND'], data_dir)
+    # Registered before sessions.close so it runs after it: waits for a history
+    # compaction in progress instead of killing it mid-copy
+    atexit.register(storage_backend.close)
+    broadcasters = {}
+    
+    def open_session(session_id, session_store):
+        # Pushes every change of this session to its open stream connections
+        broadcaster = ChangeBroadcaster(
+            max_subscribers=app.config['SESSION_STREAM_MAX'],
+            queue_size=app.config['SESSION_STREAM_QUEUE_SIZE']
+        )
+        broadcasters[session_id] = broadcaster
+        
+        def publish_session_change(kind, data):
+            broadcaster.publish(kind, data, event_id=f"{session_store.epoch}-{data['version']}")
+        
+        def record_session_info(kind, data):
+            # Keeps the session listing current without it opening any session
+            if kind == 'replace' or data.get('op') == 'update_info':
+                session_data = session_store.load()
+                storage_backend.update_session_meta(
+                    session_id,
+                    target_website=session_data.get('target_website', ''),
+                    start_date=session_data.get('start_date', '')
+                )
+        
+        session_store.add_listener(publish_session_change)
+        session_store.add_listener(record_session_info)
+    
+    # Each session lives in memory and is flushed to disk in the background
+    sessions = SessionManager(
+        storage_backend,
+        journal_dir=data_dir if app.config['SESSION_JOURNAL'] else None,
+        on_open=open_session,
+        shared=app.config['MULTI_PROCESS'],
+        flush_interval=app.config['SESSION_FLUSH_INTERVAL'],
+        compact_bytes=app.config['JOURNAL_COMPACT_BYTES'],
+        changelog_size=app.config['SESSION_CHANGELOG_SIZE']
+    )
+    atexit.register(sessions.close)
+    
+    # Every template is validated and compiled here, never on the request path
+    templates = TemplateRegistry(app.config['DEFAULT_CHECKLIST_FILE'], app.config['TEMPLATES_DIR'])
+    templates.load()
+    
+    metrics.file_size_gauge('qa_data_file_bytes', 'Current size of the data files', storage_backend.data_files)
+    
+    search_index = SearchIndex(data_dir / 'search_index.json')
+    history_stats = HistoryStats(data_dir / 'history_stats.json')
+    
+    app.extensions['qa_checklist'] = AppState(storage_backend, sessions, broadcasters, templates,
+                                              search_index, history_stats)
+    # /api/sessions/default/... is served as is, not redirected to /api/session...
+    app.url_map.redirect_defaults = False
+    app.register_blueprint(bp)
+    
+    with app.app_context():
+        init_data_files()
+    return app
+
+def current_session_id():
+    """The session the request is about (the default session outside session routes)"""
+    return g.get('session_id') or DEFAULT_SESSION_ID
+
+def current_session_store():
+    store = g.get('session_store')
+    if store is None:
+        store = current_app.extensions['qa_checklist'].sessions.get(DEFAULT_SESSION_ID)
+    return store
+
+@bp.url_value_preprocessor
+def pull_session_id(endpoint, values):
+    """Session routes get their session from the URL rather than as an argument"""
+    g.session_id = values.pop('session_id', None) if values else None
+    g.session_store = None
+
+@bp.before_request
+def open_requested_session():
+    """Look the URL's session up once per request; 404 if there is no such session"""
+    if g.get('session_id') is not None:
+        g.session_store = current_app.extensions['qa_checklist'].sessions.get(g.session_id)
+        if g.session_store is None:
+            return jsonify({"error": "Session not found"}), 404
+
+def request_route():
+    """The URL rule the request matched (the label metrics use), not the concrete path"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@bp.before_app_request
+def start_request_timer():
+    # Ties the request's log lines together (and to the client's, if it sent an id)
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    if current_app.config['METRICS'] or current_app.config['SLOW_REQUEST_SECONDS']:
+        g.request_started = time.perf_counter()
+        metrics.start_request()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    """Latency and response size per route, and the slow-request log"""
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    seconds = time.perf_counter() - started
+    route = request_route()
+    spent = metrics.finish_request()
+    if current_app.config['METRICS']:
+        metrics.record_request(request.method, route, response.status_code, seconds,
+                               None if response.is_streamed else response.content_length,
+                               response.headers.get('Content-Encoding'))
+    threshold = current_app.config['SLOW_REQUEST_SECONDS']
+    if threshold and seconds >= threshold:
+        metrics.SLOW_REQUESTS.inc((request.method, route))
+        logger.warning("Slow request: %s %s -> %s in %.1f ms", request.method, request.full_path.rstrip('?'),
+                       response.status_code, seconds * 1000,
+                       extra={"fields": {f"{kind.replace(' ', '_')}_ms": round(value * 1000, 1)
+                                         for kind, value in sorted(spent.items())}})
+    return response
+
+@bp.after_request
+def compress_response(response):
+    """gzip/brotli-encode session and history JSON for clients that accept it"""
+    if not request.path.startswith(COMPRESSED_PATHS):
+        return response
+    response.vary.add('Accept-Encoding')
+    if (not current_app.config['RESPONSE_COMPRESSION'] or response.status_code != 200
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype != 'application/json'):
+        return response
+    body = response.get_data()
+    if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    encoding = codec.negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    response.set_data(codec.encode_body(body, encoding, current_app.config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    # The same entity in other bytes: a strong validator would no longer match
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def default_checklist():
+    """A fresh copy of the default checklist (re-read only if the file changed)"""
+    return current_app.extensions['qa_checklist'].templates.default.checklist()
+
+def requested_template(data):
+    """The template named by a request body's "template" field (default if absent); None if unknown"""
+    name = (data or {}).get('template')
+    if name is not None and not isinstance(name, str):
+        return None
+    return current_app.extensions['qa_checklist'].templates.get(name)
 
 # Initialize data files if they don't exist
 def init_data_files():
-    """Initialize JSON data files with default structure"""
-    try:
-        # Check and fix current_session.json
-        needs_init = False
-        if not CURRENT_SESSION_FILE.exists():
-            needs_init = True
-        else:
-            # Check if file is valid
-            try:
-                with open(CURRENT_SESSION_FILE, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if not content or content == '':
-                        needs_init = True
-                    else:
-                        json.loads(content)  # Try to parse
-            except (json.JSONDecodeError, Exception):
-                needs_init = True
-        
-        if needs_init:
-            default_session = {
-                "target_website": "",
-                "start_date": "",
-                "checklist": DEFAULT_CHECKLIST,
-                "notes": [],
-                "bugs": []
-            }
-            save_json(CURRENT_SESSION_FILE, default_session)
-            print(f"✓ Created/Fixed {CURRENT_SESSION_FILE}")
-        
-        # Check and fix completed.json
-        needs_init_completed = False
-        if not COMPLETED_FILE.exists():
-            needs_init_completed = True
-        else:
-            try:
-                with open(COMPLETED_FILE, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if not content or content == '':
-                        needs_init_completed = True
-                    else:
-                        json.loads(content)  # Try to parse
-            except (json.JSONDecodeError, Exception):
-                needs_init_completed = True
-        
-        if needs_init_completed:
-            save_json(COMPLETED_FILE, [])
-            print(f"✓ Created/Fixed {COMPLETED_FILE}")
-            
-    except Exception as e:
-        print(f"✗ Error initializing data files: {str(e)}")
-        traceback.print_exc()
-
-def load_json(filepath):
-    """Load JSON data from file"""
+    """Initialize session and history storage with default structure"""
     try:
-        if not filepath.exists():
-            print(f"File not found: {filepath}")
-            return None
-            
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            
-            # Check if file is empty
-            if not content or content == '':
-                print(f"File is empty: {filepath}")
-                return None
+        # Other worker processes may be initializing at the same time
+        with session_store.lock:
+            # Check and fix the current session (missing, empty or unparsable)
+            if session_store.backend.load_session() is None:
+                # Never overwrite an unreadable session: keep it for recovery
+                backup = session_store.backend.backup_corrupt_session()
+                if backup is not None:
+                    logger.warning("Current session was unreadable; moved it to %s", backup)
+                default_session = {
+                    "target_website": "",
+                    "start_date": "",
+                    "checklist": default_checklist(),
+                    "notes": [],
+                    "bugs": []
+                }
+                # Goes through the store so a stale journal is discarded too
+                session_store.save(default_session, sync=True)
+                logger.info("Created/Fixed current session in %s", storage_backend.location)
+        
+            # Check and fix completed history
+            if storage_backend.ensure_history():
+                logger.info("Created/Fixed completed history in %s", storage_backend.location)
+        
+            # Load the search index and index whatever it is missing (everything, the first time)
+            search_index.load()
+            reindexed = search_index.sync(storage_backend)
+            if reindexed:
+                logger.info("Updated the search index for %d project(s)", reindexed)
+            counted = history_stats.sync(storage_backend)
+            if counted:
+                logger.info("Updated history statistics for %d project(s)", counted)
+        
+            # Load the snapshot and replay any journaled operations over it
+            session_data = session_store.reload()
             
-            return json.loads(content)
+            # A session file from before sessions were listed
+            if session_data is not None:
+                storage_backend.update_session_meta(
+                    DEFAULT_SESSION_ID,
+                    target_website=session_data.get('target_website', ''),
+                    start_date=session_data.get('start_date', '')
+                )
             
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error in {filepath}: {str(e)}")
-        print(f"File content length: {len(content) if 'content' in locals() else 'N/A'}")
-        return None
     except Exception as e:
-        print(f"Error loading {filepath}: {str(e)}")
-        traceback.print_exc()
-        return None
+        logger.exception("Error initializing data files: %s", e)
+
+def session_etag(session_data):
+    """ETag for the current session: server epoch plus session version"""
+    return f"{session_store.epoch}-{session_data.get('version', 0)}"
+
+def session_stream(store, hub, subscriber, backlog, heartbeat, max_age):
+    """Yield SSE messages for one subscriber until the stream is recycled.
 
-def save_json(filepath, data):
-    """Save JSON data to file"""
+    Runs after the request context is gone, so it gets the real objects
+    rather than the module-level proxies.
+    """
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving {filepath}: {str(e)}")
-        traceback.print_exc()
-        return False
+        yield "retry: 3000\n\n"
+        for message in backlog:
+            yield message
+        
+        deadline = time.monotonic() + max_age
+        while time.monotonic() < deadline:
+            if subscriber.overflowed:
+                # We dropped events for this client; it has to refetch
+                subscriber.drain()
+                yield format_event('resync', {})
+                continue
+            try:
+                yield subscriber.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                if store.is_stale():
+                    # Another worker process changed the session; we never saw the operations
+                    yield format_event('resync', {})
+                    continue
+                # Comment line: keeps proxies from timing out and detects dead clients
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(subscriber)
 
 # Routes
-@app.route('/')
+def export_arguments(default_format):
+    """(format, rows, from, to) of an export request; raises ValueError if one is invalid"""
+    export_format = request.args.get('format', default_format)
+    rows = request.args.get('rows', 'projects')
+    start = request.args.get('from') or None
+    end = request.args.get('to') or None
+    
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if rows not in CSV_COLUMNS:
+        raise ValueError(f"rows must be one of {', '.join(CSV_COLUMNS)}")
+    for value in (start, end):
+        try:
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("from and to must be YYYY-MM-DD dates")
+    return export_format, rows, start, end
+
+def page_arguments(default_limit):
+    """(limit, offset) of a paged request, the limit capped; raises ValueError if one is invalid"""
+    limit = request.args.get('limit', default_limit, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be >= 1 and offset >= 0")
+    return min(limit, current_app.config['HISTORY_MAX_PAGE_SIZE']), offset
+
+def export_response(chunks, export_format, filename):
+    """Stream an export as a download; each chunk is sent as soon as it is ready"""
+    # The generator outlives the request context
+    request_id = g.get('request_id')
+    
+    def stream():
+        # Headers are long gone by the time a chunk fails, so just end the download
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.exception("Error while exporting %s: %s", filename, e, extra={"request_id": request_id})
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream(),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}.{extension}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+def import_projects(stream, import_format, batch_size, on_batch=None):
+    """Bulk-import a text stream into history, keeping the search index and statistics in step"""
+    backend = storage_backend._get_current_object()
+    search = search_index._get_current_object()
+    stats = history_stats._get_current_object()
+    
+    def index_batch(stored):
+        search.add_many(stored)
+        stats.add_many(stored)
+        if on_batch is not None:
+            on_batch(stored)
+    
+    return import_history(stream, import_format, backend.add_history_entries, batch_size, index_batch)
+
+@bp.route('/')
 def index():
     """Main checklist page"""
     return render_template('index.html')
 
-@app.route('/history')
+@bp.route('/history')
 def history():
     """Completed projects history page"""
     return render_template('history.html')
 
+@bp.route('/bench')
+def bench():
+    """Browser benchmark for the checklist renderer"""
+    return render_template('bench.html')
+
+@bp.route('/metrics')
+def get_metrics():
+    """Prometheus metrics of this process"""
+    if not current_app.config['METRICS']:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 # API Endpoints
-@app.route('/api/session', methods=['GET'])
+@bp.route('/api/session', methods=['GET'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>', methods=['GET'])
 def get_session():
     """Get current session data"""
     try:
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        # If file is corrupted or empty, reinitialize
-        if session_data is None:
-            print("Session data is None, reinitializing...")
-            init_data_files()
-            session_data = load_json(CURRENT_SESSION_FILE)
-        
-        # If still None, create default session manually
-        if session_data is None:
-            print("Creating default session manually...")
-            session_data = {
-                "target_website": "",
-                "start_date": "",
-                "checklist": DEFAULT_CHECKLIST if DEFAULT_CHECKLIST else [],
-                "notes": [],
-                "bugs": []
-            }
-            save_json(CURRENT_SESSION_FILE, session_data)
-        
-        return jsonify(session_data), 200
+        with session_store.lock:
+            session_data = session_store.load()
+        
+            # If file is corrupted or empty, reinitialize
+            if session_data is None:
+                logger.warning("Session data is None, reinitializing...")
+                init_data_files()
+                session_data = session_store.reload()
+        
+            # If still None, create default session manually
+            if session_data is None:
+                logger.warning("Creating default session manually...")
+                session_data = {
+                    "target_website": "",
+                    "start_date": "",
+                    "checklist": default_checklist(),
+                    "notes": [],
+                    "bugs": []
+                }
+                session_store.save(session_data)
+        
+            # Unchanged since the client's copy: skip serializing the session at all
+            etag = session_etag(session_data)
+            # Weak comparison: a compressed response carries the same ETag as a weak one
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = jsonify(session_data)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
         
     except Exception as e:
-        print(f"Error in get_session: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in get_session: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/session/info', methods=['POST'])
+@bp.route('/api/session/changes', methods=['GET'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/changes', methods=['GET'])
+def get_session_changes():
+    """Get the operations applied to the session since a given version"""
+    try:
+        since = request.args.get('since', type=int)
+        epoch = request.args.get('epoch', '')
+        
+        if since is None:
+            return jsonify({"error": "since must be a session version"}), 400
+        
+        with session_store.lock:
+            session_data = session_store.load()
+        
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
+        
+            # Versions from another server process can't be compared with ours
+            operations = session_store.changes_since(since) if epoch == session_store.epoch else None
+        
+            if operations is None:
+                # Too far behind for the changelog: send the whole session instead
+                return jsonify({
+                    "epoch": session_store.epoch,
+                    "version": session_data['version'],
+                    "full": True,
+                    "session": session_data
+                }), 200
+        
+            return jsonify({
+                "epoch": session_store.epoch,
+                "version": session_data['version'],
+                "full": False,
+                "operations": operations
+            }), 200
+    except Exception as e:
+        logger.exception("Error in get_session_changes: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/session/stream', methods=['GET'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/stream', methods=['GET'])
+def stream_session():
+    """Server-Sent Events stream of session changes"""
+    try:
+        subscriber = broadcaster.subscribe()
+        if subscriber is None:
+            return jsonify({"error": "Too many open streams"}), 503
+        
+        # Subscribed first, so nothing published from here on can be missed
+        try:
+            with session_store.lock:
+                backlog = [format_event('hello', {"epoch": session_store.epoch})]
+                # A reconnecting browser sends the id of the last event it saw
+                epoch, _, version = request.headers.get('Last-Event-ID', '').partition('-')
+                operations = None
+                if epoch == session_store.epoch and version.isdigit():
+                    operations = session_store.changes_since(int(version))
+                if operations is not None:
+                    backlog.extend(format_event('operation', operation, f"{epoch}-{operation['version']}")
+                                   for operation in operations)
+                elif epoch:
+                    backlog.append(format_event('resync', {}))
+        except Exception:
+            broadcaster.unsubscribe(subscriber)
+            raise
+        
+        return Response(
+            session_stream(
+                session_store._get_current_object(),
+                broadcaster._get_current_object(),
+                subscriber,
+                backlog,
+                current_app.config['SESSION_STREAM_HEARTBEAT'],
+                current_app.config['SESSION_STREAM_MAX_AGE']
+            ),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    except Exception as e:
+        logger.exception("Error in stream_session: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/session/info', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/info', methods=['POST'])
 def update_session_info():
     """Update target website and start date"""
     try:
         data = request.get_json()
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        if 'target_website' in data:
-            session_data['target_website'] = data['target_website']
-        if 'start_date' in data:
-            session_data['start_date'] = data['start_date']
+            operation = {"op": "update_info"}
+            if 'target_website' in data:
+                operation['target_website'] = data['target_website']
+            if 'start_date' in data:
+                operation['start_date'] = data['start_date']
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True, "data": session_data}), 200
-        return jsonify({"error": "Failed to save session"}), 500
+            if session_store.apply(operation):
+                return jsonify({"success": True, "data": session_store.load()}), 200
+            return jsonify({"error": "Failed to save session"}), 500
     except Exception as e:
-        print(f"Error in update_session_info: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in update_session_info: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/item', methods=['POST'])
+@bp.route('/api/checklist/item', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/item', methods=['POST'])
 def toggle_checklist_item():
     """Toggle checklist item checked status"""
     try:
@@ -214,28 +660,60 @@ def toggle_checklist_item():
         item_id = data.get('item_id')
         checked = data.get('checked')
         
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        for heading in session_data['checklist']:
-            if heading['id'] == heading_id:
-                for item in heading['items']:
-                    if item['id'] == item_id:
-                        item['checked'] = checked
-                        break
-                break
+            operation = {
+                "op": "toggle_item",
+                "heading_id": heading_id,
+                "item_id": item_id,
+                "checked": checked
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply(operation):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in toggle_checklist_item: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in toggle_checklist_item: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/heading', methods=['POST'])
+@bp.route('/api/checklist/batch', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/batch', methods=['POST'])
+def batch_checklist():
+    """Apply several checklist operations atomically with a single save"""
+    try:
+        data = request.get_json()
+        requested = data.get('operations') if isinstance(data, dict) else None
+        
+        if not isinstance(requested, list) or not requested:
+            return jsonify({"error": "operations must be a non-empty list"}), 400
+        
+        if len(requested) > current_app.config['BATCH_MAX_OPERATIONS']:
+            return jsonify({"error": f"At most {current_app.config['BATCH_MAX_OPERATIONS']} operations per batch"}), 400
+        
+        with session_store.lock:
+            model = session_store.model()
+        
+            if model is None:
+                return jsonify({"error": "Session data not found"}), 500
+        
+            operations, results, error = build_batch_operations(model, requested)
+            if error:
+                return jsonify({"error": error}), 400
+        
+            # One operation (one journal line / one snapshot write) for the whole batch
+            if session_store.apply({"op": "batch", "operations": operations}):
+                return jsonify({"success": True, "results": results}), 200
+            return jsonify({"error": "Failed to save"}), 500
+    except Exception as e:
+        logger.exception("Error in batch_checklist: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/checklist/heading', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/heading', methods=['POST'])
 def add_heading():
     """Add new heading to checklist"""
     try:
@@ -245,31 +723,27 @@ def add_heading():
         if not title:
             return jsonify({"error": "Title is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            model = session_store.model()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
-        
-        # Get max ID
-        max_id = max([h['id'] for h in session_data['checklist']], default=0)
-        
-        new_heading = {
-            "id": max_id + 1,
-            "title": title,
-            "items": []
-        }
+            if model is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        session_data['checklist'].append(new_heading)
+            new_heading = {
+                "id": model.next_heading_id(),
+                "title": title,
+                "items": []
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True, "heading": new_heading}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "add_heading", "heading": new_heading}):
+                return jsonify({"success": True, "heading": new_heading}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in add_heading: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in add_heading: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/heading/<int:heading_id>', methods=['PUT'])
+@bp.route('/api/checklist/heading/<int:heading_id>', methods=['PUT'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/heading/<int:heading_id>', methods=['PUT'])
 def edit_heading(heading_id):
     """Edit heading title"""
     try:
@@ -279,44 +753,39 @@ def edit_heading(heading_id):
         if not title:
             return jsonify({"error": "Title is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+        with session_store.lock:
+            session_data = session_store.load()
         
-        for heading in session_data['checklist']:
-            if heading['id'] == heading_id:
-                heading['title'] = title
-                break
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "edit_heading", "heading_id": heading_id, "title": title}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in edit_heading: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in edit_heading: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/heading/<int:heading_id>', methods=['DELETE'])
+@bp.route('/api/checklist/heading/<int:heading_id>', methods=['DELETE'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/heading/<int:heading_id>', methods=['DELETE'])
 def delete_heading(heading_id):
     """Delete heading from checklist"""
     try:
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+        with session_store.lock:
+            session_data = session_store.load()
         
-        session_data['checklist'] = [h for h in session_data['checklist'] if h['id'] != heading_id]
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "delete_heading", "heading_id": heading_id}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in delete_heading: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in delete_heading: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/item', methods=['PUT'])
+@bp.route('/api/checklist/item', methods=['PUT'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/item', methods=['PUT'])
 def add_item():
     """Add new item to heading"""
     try:
@@ -327,34 +796,30 @@ def add_item():
         if not text:
             return jsonify({"error": "Text is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            model = session_store.model()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if model is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        for heading in session_data['checklist']:
-            if heading['id'] == heading_id:
-                # Get max item ID
-                max_id = max([item['id'] for item in heading['items']], default=0)
-                
-                new_item = {
-                    "id": max_id + 1,
-                    "text": text,
-                    "checked": False
-                }
-                
-                heading['items'].append(new_item)
-                break
+            if model.heading(heading_id) is None:
+                return jsonify({"error": "Heading not found"}), 404
+        
+            new_item = {
+                "id": model.next_item_id(heading_id),
+                "text": text,
+                "checked": False
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True, "item": new_item}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "add_item", "heading_id": heading_id, "item": new_item}):
+                return jsonify({"success": True, "item": new_item}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in add_item: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in add_item: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/item/<int:heading_id>/<int:item_id>', methods=['PUT'])
+@bp.route('/api/checklist/item/<int:heading_id>/<int:item_id>', methods=['PUT'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/item/<int:heading_id>/<int:item_id>', methods=['PUT'])
 def edit_item(heading_id, item_id):
     """Edit item text"""
     try:
@@ -364,50 +829,46 @@ def edit_item(heading_id, item_id):
         if not text:
             return jsonify({"error": "Text is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        for heading in session_data['checklist']:
-            if heading['id'] == heading_id:
-                for item in heading['items']:
-                    if item['id'] == item_id:
-                        item['text'] = text
-                        break
-                break
+            operation = {
+                "op": "edit_item",
+                "heading_id": heading_id,
+                "item_id": item_id,
+                "text": text
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply(operation):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in edit_item: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in edit_item: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/checklist/item/<int:heading_id>/<int:item_id>', methods=['DELETE'])
+@bp.route('/api/checklist/item/<int:heading_id>/<int:item_id>', methods=['DELETE'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/checklist/item/<int:heading_id>/<int:item_id>', methods=['DELETE'])
 def delete_item(heading_id, item_id):
     """Delete item from heading"""
     try:
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+        with session_store.lock:
+            session_data = session_store.load()
         
-        for heading in session_data['checklist']:
-            if heading['id'] == heading_id:
-                heading['items'] = [item for item in heading['items'] if item['id'] != item_id]
-                break
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "delete_item", "heading_id": heading_id, "item_id": item_id}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in delete_item: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in delete_item: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/notes', methods=['POST'])
+@bp.route('/api/notes', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/notes', methods=['POST'])
 def add_note():
     """Add new note"""
     try:
@@ -417,31 +878,27 @@ def add_note():
         if not text:
             return jsonify({"error": "Text is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
-        
-        # Get max note ID
-        max_id = max([note['id'] for note in session_data['notes']], default=0)
+        with session_store.lock:
+            model = session_store.model()
         
-        new_note = {
-            "id": max_id + 1,
-            "text": text,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+            if model is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        session_data['notes'].append(new_note)
+            new_note = {
+                "id": model.next_note_id(),
+                "text": text,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True, "note": new_note}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "add_note", "note": new_note}):
+                return jsonify({"success": True, "note": new_note}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in add_note: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in add_note: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/notes/<int:note_id>', methods=['PUT'])
+@bp.route('/api/notes/<int:note_id>', methods=['PUT'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/notes/<int:note_id>', methods=['PUT'])
 def edit_note(note_id):
     """Edit note text"""
     try:
@@ -451,144 +908,434 @@ def edit_note(note_id):
         if not text:
             return jsonify({"error": "Text is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        for note in session_data['notes']:
-            if note['id'] == note_id:
-                note['text'] = text
-                break
-        
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "edit_note", "note_id": note_id, "text": text}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in edit_note: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in edit_note: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/notes/<int:note_id>', methods=['DELETE'])
+@bp.route('/api/notes/<int:note_id>', methods=['DELETE'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/notes/<int:note_id>', methods=['DELETE'])
 def delete_note(note_id):
     """Delete note"""
     try:
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        session_data['notes'] = [note for note in session_data['notes'] if note['id'] != note_id]
-        
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "delete_note", "note_id": note_id}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in delete_note: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in delete_note: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/session/complete', methods=['POST'])
+@bp.route('/api/session/complete', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/complete', methods=['POST'])
 def complete_session():
     """Complete current session and save to history"""
     try:
         data = request.get_json()
         end_date = data.get('end_date', datetime.now().strftime("%Y-%m-%d"))
         
-        session_data = load_json(CURRENT_SESSION_FILE)
-        completed_data = load_json(COMPLETED_FILE)
-        
-        if session_data is None or completed_data is None:
-            return jsonify({"error": "Failed to load data"}), 500
-        
-        if not session_data['target_website']:
-            return jsonify({"error": "Target website is required"}), 400
-        
-        # Create completed entry
-        completed_entry = {
-            "id": len(completed_data) + 1,
-            "target_website": session_data['target_website'],
-            "start_date": session_data['start_date'],
-            "end_date": end_date,
-            "completed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "checklist": session_data['checklist'],
-            "notes": session_data['notes'],
-            "bugs": session_data.get('bugs', [])  # Add this line
-        }
+        # The next session starts from this template
+        template = requested_template(data)
+        if template is None:
+            return jsonify({"error": "Unknown template"}), 400
+        
+        with session_store.lock:
+            session_data = session_store.load()
+        
+            if session_data is None:
+                return jsonify({"error": "Failed to load data"}), 500
+        
+            if not session_data['target_website']:
+                return jsonify({"error": "Target website is required"}), 400
+        
+            # Create completed entry
+            completed_entry = {
+                "target_website": session_data['target_website'],
+                "start_date": session_data['start_date'],
+                "end_date": end_date,
+                "completed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "checklist": session_data['checklist'],
+                "notes": session_data['notes'],
+                "bugs": session_data.get('bugs', [])  # Add this line
+            }
+            # Precompute once so listings and the details modal never walk the checklist
+            completed_entry['stats'] = project_stats(completed_entry)
         
-        completed_data.append(completed_entry)
+            # SQLite inserts just this project's rows; the JSON backend appends one line
+            stored_entry = storage_backend.add_history_entry(completed_entry)
+            if stored_entry is None:
+                return jsonify({"error": "Failed to save"}), 500
         
-        # Reset current session with fresh checklist from default file
-        reset_session = {
-            "target_website": "",
-            "start_date": "",
-            "checklist": load_default_checklist(),  # Reload from file
-            "notes": [],
-            "bugs": []
-        }
+            search_index.add(stored_entry)
+            history_stats.add(stored_entry)
+        
+            # Let other testers' browsers know before their session is replaced
+            broadcaster.publish('completed', {
+                "id": stored_entry['id'],
+                "target_website": stored_entry['target_website']
+            })
+        
+            # Reset current session with a fresh copy of the chosen template
+            reset_session = {
+                "target_website": "",
+                "start_date": "",
+                "checklist": template.checklist(),
+                "notes": [],
+                "bugs": []
+            }
         
-        if save_json(COMPLETED_FILE, completed_data) and save_json(CURRENT_SESSION_FILE, reset_session):
-            return jsonify({"success": True, "message": "Session completed successfully"}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            # Both writes are fsynced: completing is the point testers rely on
+            if session_store.save(reset_session, sync=True):
+                return jsonify({"success": True, "message": "Session completed successfully"}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in complete_session: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in complete_session: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/session/reset', methods=['POST'])
+@bp.route('/api/session/reset', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/reset', methods=['POST'])
 def reset_session():
     """Reset current session without saving to history"""
     try:
-        # Reload checklist from default file
+        template = requested_template(request.get_json(silent=True))
+        if template is None:
+            return jsonify({"error": "Unknown template"}), 400
+        
+        # Fresh copy of the chosen template (picks up edits to its file)
         reset_data = {
             "target_website": "",
             "start_date": "",
-            "checklist": load_default_checklist(),  # Reload from file
+            "checklist": template.checklist(),
             "notes": [],
             "bugs": []
         }
         
-        if save_json(CURRENT_SESSION_FILE, reset_data):
+        with session_store.lock:
+            saved = session_store.save(reset_data, sync=True)
+        
+        if saved:
             return jsonify({"success": True, "message": "Session reset successfully"}), 200
         return jsonify({"error": "Failed to reset"}), 500
     except Exception as e:
-        print(f"Error in reset_session: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in reset_session: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/history', methods=['GET'])
-def get_history():
-    """Get completed projects history"""
+@bp.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """List every in-progress session (metadata only, no checklists)"""
     try:
-        completed_data = load_json(COMPLETED_FILE)
-        if completed_data is not None:
-            return jsonify(completed_data), 200
-        return jsonify({"error": "Failed to load history"}), 500
+        sessions = current_app.extensions['qa_checklist'].sessions
+        return jsonify({"default": DEFAULT_SESSION_ID, "sessions": sessions.list()}), 200
     except Exception as e:
-        print(f"Error in get_history: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in list_sessions: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/history/<int:project_id>', methods=['DELETE'])
-def delete_history_entry(project_id):
-    """Delete a history entry"""
+@bp.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Start another session, from a template"""
     try:
-        completed_data = load_json(COMPLETED_FILE)
+        data = request.get_json()
+        name = data.get('name', '').strip()
+        
+        if not name:
+            return jsonify({"error": "Name is required"}), 400
         
-        if completed_data is None:
+        template = requested_template(data)
+        if template is None:
+            return jsonify({"error": "Unknown template"}), 400
+        
+        new_session = {
+            "target_website": "",
+            "start_date": "",
+            "checklist": template.checklist(),
+            "notes": [],
+            "bugs": []
+        }
+        
+        session_id = current_app.extensions['qa_checklist'].sessions.create(name, new_session)
+        if session_id is None:
+            return jsonify({"error": "Failed to save"}), 500
+        return jsonify({"success": True, "session": {"id": session_id, "name": name}}), 200
+    except Exception as e:
+        logger.exception("Error in create_session: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session():
+    """Delete a session without saving it to history"""
+    try:
+        if current_session_id() == DEFAULT_SESSION_ID:
+            return jsonify({"error": "The default session can't be deleted"}), 400
+        
+        if current_app.extensions['qa_checklist'].sessions.delete(current_session_id()):
+            return jsonify({"success": True}), 200
+        return jsonify({"error": "Failed to delete"}), 500
+    except Exception as e:
+        logger.exception("Error in delete_session: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/templates', methods=['GET'])
+def get_templates():
+    """List the checklist templates a new session can start from"""
+    try:
+        templates = current_app.extensions['qa_checklist'].templates
+        return jsonify({"default": templates.default.name, "templates": templates.summaries()}), 200
+    except Exception as e:
+        logger.exception("Error in get_templates: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history', methods=['GET'])
+def get_history():
+    """Get one page of completed project summaries, newest first"""
+    try:
+        try:
+            limit, offset = page_arguments(current_app.config['HISTORY_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        page = storage_backend.list_history(limit, offset)
+        
+        if page is None:
             return jsonify({"error": "Failed to load history"}), 500
         
-        completed_data = [entry for entry in completed_data if entry['id'] != project_id]
+        total, projects = page
+        return jsonify({"total": total, "limit": limit, "offset": offset, "projects": projects}), 200
+    except Exception as e:
+        logger.exception("Error in get_history: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/search', methods=['GET'])
+def search_history():
+    """Search completed projects' websites, checklist items, notes and bugs"""
+    try:
+        query = request.args.get('q', '')
+        limit = request.args.get('limit', current_app.config['SEARCH_PAGE_SIZE'], type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        if not tokenize(query):
+            return jsonify({"error": "Query must contain at least one word"}), 400
+        if limit < 1 or offset < 0:
+            return jsonify({"error": "limit must be >= 1 and offset >= 0"}), 400
+        
+        limit = min(limit, current_app.config['HISTORY_MAX_PAGE_SIZE'])
+        started = time.perf_counter()
+        total, results = search_index.search(query, limit, offset, storage_backend.get_history_entry)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        
+        return jsonify({
+            "query": query,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "took_ms": took_ms,
+            "results": results
+        }), 200
+    except Exception as e:
+        logger.exception("Error in search_history: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/stats', methods=['GET'])
+def get_history_stats():
+    """Totals, per-heading skip rates, bugs per target and audits per month over all completed projects"""
+    try:
+        top = request.args.get('top', 20, type=int)
+        if top < 1:
+            return jsonify({"error": "top must be >= 1"}), 400
+        
+        return jsonify(history_stats.report(min(top, current_app.config['HISTORY_MAX_PAGE_SIZE']))), 200
+    except Exception as e:
+        logger.exception("Error in get_history_stats: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/export', methods=['GET'])
+def export_history_entries():
+    """Stream completed projects (optionally completed from/to a date) as JSON Lines, CSV or Markdown"""
+    try:
+        try:
+            export_format, rows, start, end = export_arguments('jsonl')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Projects are read one at a time as the response is sent
+        projects = storage_backend.iter_history(start, end)
+        title = "QA Testing History" + (f" ({start or '…'} to {end or '…'})" if start or end else "")
+        filename = '-'.join(['qa-history'] + [value for value in (start, end) if value])
+        return export_response(export_history(projects, export_format, rows, title), export_format, filename)
+    except Exception as e:
+        logger.exception("Error in export_history_entries: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>/export', methods=['GET'])
+def export_history_entry(project_id):
+    """Download one completed project as a report (Markdown by default, or JSON Lines / CSV)"""
+    try:
+        try:
+            export_format, rows, _, _ = export_arguments('md')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        project = storage_backend.get_history_entry(project_id)
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        
+        target = project.get('target_website') or 'project'
+        slug = re.sub(r'[^A-Za-z0-9.-]+', '-', target).strip('-.')[:60] or 'project'
+        title = f"QA Testing Report: {target}"
+        return export_response(export_history([project], export_format, rows, title),
+                               export_format, f"qa-report-{project_id}-{slug}")
+    except Exception as e:
+        logger.exception("Error in export_history_entry: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/import', methods=['POST'])
+def import_history_entries():
+    """Bulk-load completed projects from JSON Lines, a JSON array or CSV (request body or a "file" upload)"""
+    try:
+        upload = request.files.get('file')
+        import_format = request.args.get('format') or detect_format(
+            upload.filename if upload else '', upload.mimetype if upload else request.mimetype)
+        
+        if import_format not in IMPORT_FORMATS:
+            return jsonify({"error": f"format must be one of {', '.join(IMPORT_FORMATS)}"}), 400
         
-        if save_json(COMPLETED_FILE, completed_data):
+        # Read as it arrives (or from the upload's temp file), never as one string
+        raw = upload.stream if upload else request.stream
+        stream = io.TextIOWrapper(io.BufferedReader(raw), encoding='utf-8-sig', newline='')
+        report = import_projects(stream, import_format, current_app.config['IMPORT_BATCH_SIZE'])
+        
+        if 'aborted' in report and not report['imported'] and not report['failed']:
+            return jsonify({"error": report['aborted'], **report}), 400
+        return jsonify(report), 200
+    except Exception as e:
+        logger.exception("Error in import_history_entries: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>', methods=['GET'])
+def get_history_entry(project_id):
+    """Get one completed project with its full checklist, notes and bugs"""
+    try:
+        project = storage_backend.get_history_entry(project_id)
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        
+        # Projects completed before stats were stored with them
+        if 'stats' not in project:
+            project['stats'] = project_stats(project)
+        
+        return jsonify(project), 200
+    except Exception as e:
+        logger.exception("Error in get_history_entry: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>/headings', methods=['GET'])
+def get_history_outline(project_id):
+    """One completed project's summary and a page of its headings, without their items"""
+    try:
+        try:
+            limit, offset = page_arguments(current_app.config['HISTORY_HEADING_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        project = storage_backend.get_history_entry(project_id)
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        
+        headings = project.get('checklist', [])
+        return jsonify({
+            "project": project_summary(project),
+            "total": len(headings),
+            "limit": limit,
+            "offset": offset,
+            "headings": [heading_summary(heading) for heading in headings[offset:offset + limit]]
+        }), 200
+    except Exception as e:
+        logger.exception("Error in get_history_outline: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>/headings/<int:heading_id>', methods=['GET'])
+def get_history_heading(project_id, heading_id):
+    """A page of the items under one heading of a completed project"""
+    try:
+        try:
+            limit, offset = page_arguments(current_app.config['HISTORY_ITEM_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        project = storage_backend.get_history_entry(project_id)
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        
+        heading = find_heading(project, heading_id)
+        if heading is None:
+            return jsonify({"error": "Heading not found"}), 404
+        
+        return jsonify({
+            "heading": heading_summary(heading),
+            "total": len(heading['items']),
+            "limit": limit,
+            "offset": offset,
+            "items": heading['items'][offset:offset + limit]
+        }), 200
+    except Exception as e:
+        logger.exception("Error in get_history_heading: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>/<any(notes, bugs):section>', methods=['GET'])
+def get_history_section(project_id, section):
+    """A page of a completed project's notes or bugs"""
+    try:
+        try:
+            limit, offset = page_arguments(current_app.config['HISTORY_ITEM_PAGE_SIZE'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        project = storage_backend.get_history_entry(project_id)
+        if project is None:
+            return jsonify({"error": "Project not found"}), 404
+        
+        entries = project.get(section) or []
+        return jsonify({
+            "total": len(entries),
+            "limit": limit,
+            "offset": offset,
+            section: entries[offset:offset + limit]
+        }), 200
+    except Exception as e:
+        logger.exception("Error in get_history_section: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/history/<int:project_id>', methods=['DELETE'])
+def delete_history_entry(project_id):
+    """Delete a history entry"""
+    try:
+        # Its counts are subtracted from the history statistics afterwards
+        project = storage_backend.get_history_entry(project_id)
+        
+        if storage_backend.delete_history_entry(project_id):
+            search_index.remove(project_id)
+            if project is not None:
+                history_stats.remove(project)
             return jsonify({"success": True}), 200
         return jsonify({"error": "Failed to delete"}), 500
     except Exception as e:
-        print(f"Error in delete_history_entry: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in delete_history_entry: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/bugs', methods=['POST'])
+@bp.route('/api/bugs', methods=['POST'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/bugs', methods=['POST'])
 def add_bug():
     """Add new bug"""
     try:
@@ -602,36 +1349,28 @@ def add_bug():
         if not description:
             return jsonify({"error": "Description is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+        with session_store.lock:
+            model = session_store.model()
         
-        # Initialize bugs array if it doesn't exist
-        if 'bugs' not in session_data:
-            session_data['bugs'] = []
-        
-        # Get max bug ID
-        max_id = max([bug['id'] for bug in session_data['bugs']], default=0)
-        
-        new_bug = {
-            "id": max_id + 1,
-            "title": title,
-            "description": description,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
+            if model is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        session_data['bugs'].append(new_bug)
+            new_bug = {
+                "id": model.next_bug_id(),
+                "title": title,
+                "description": description,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True, "bug": new_bug}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "add_bug", "bug": new_bug}):
+                return jsonify({"success": True, "bug": new_bug}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in add_bug: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in add_bug: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/bugs/<int:bug_id>', methods=['PUT'])
+@bp.route('/api/bugs/<int:bug_id>', methods=['PUT'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/bugs/<int:bug_id>', methods=['PUT'])
 def edit_bug(bug_id):
     """Edit bug"""
     try:
@@ -645,64 +1384,108 @@ def edit_bug(bug_id):
         if not description:
             return jsonify({"error": "Description is required"}), 400
         
-        session_data = load_json(CURRENT_SESSION_FILE)
-        
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if 'bugs' not in session_data:
-            session_data['bugs'] = []
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        for bug in session_data['bugs']:
-            if bug['id'] == bug_id:
-                bug['title'] = title
-                bug['description'] = description
-                break
+            operation = {
+                "op": "edit_bug",
+                "bug_id": bug_id,
+                "title": title,
+                "description": description
+            }
         
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply(operation):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in edit_bug: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in edit_bug: %s", e)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/bugs/<int:bug_id>', methods=['DELETE'])
+@bp.route('/api/bugs/<int:bug_id>', methods=['DELETE'], defaults={'session_id': DEFAULT_SESSION_ID})
+@bp.route('/api/sessions/<session_id>/bugs/<int:bug_id>', methods=['DELETE'])
 def delete_bug(bug_id):
     """Delete bug"""
     try:
-        session_data = load_json(CURRENT_SESSION_FILE)
+        with session_store.lock:
+            session_data = session_store.load()
         
-        if session_data is None:
-            return jsonify({"error": "Session data not found"}), 500
+            if session_data is None:
+                return jsonify({"error": "Session data not found"}), 500
         
-        if 'bugs' not in session_data:
-            session_data['bugs'] = []
-        
-        session_data['bugs'] = [bug for bug in session_data['bugs'] if bug['id'] != bug_id]
-        
-        if save_json(CURRENT_SESSION_FILE, session_data):
-            return jsonify({"success": True}), 200
-        return jsonify({"error": "Failed to save"}), 500
+            if session_store.apply({"op": "delete_bug", "bug_id": bug_id}):
+                return jsonify({"success": True}), 200
+            return jsonify({"error": "Failed to save"}), 500
     except Exception as e:
-        print(f"Error in delete_bug: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in delete_bug: %s", e)
         return jsonify({"error": str(e)}), 500
 
+# CLI commands
+@bp.cli.command('migrate-sqlite')
+def migrate_sqlite_command():
+    """Import current_session.json and completed.json into data/qa_checklist.db"""
+    data_dir = Path(current_app.config['DATA_DIR'])
+    sqlite_backend = create_backend('sqlite', data_dir)
+    try:
+        projects, sessions = migrate_json_to_sqlite(JsonBackend(data_dir), sqlite_backend)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    finally:
+        sqlite_backend.close()
+    print(f"✓ Migrated {projects} completed project(s) and {sessions} session(s) "
+          f"to {sqlite_backend.location}")
+    print("  Start the app with QA_STORAGE_BACKEND=sqlite to use it")
+
+@bp.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recount the history statistics (data/history_stats.json) from every completed project"""
+    if storage_backend.list_history(1, 0) is None:
+        raise click.ClickException("Failed to load history")
+    # Streamed: one project in memory at a time
+    counted = history_stats.rebuild(storage_backend.iter_history())
+    print(f"✓ Rebuilt history statistics from {counted} completed project(s)")
+
+@bp.cli.command('import-history')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(IMPORT_FORMATS),
+              help='Input format (default: from the file extension)')
+@click.option('--batch-size', type=int, default=None, help='Projects stored per write')
+def import_history_command(path, import_format, batch_size):
+    """Import past audits (JSON Lines, a JSON array or CSV) into the completed history"""
+    import_format = import_format or detect_format(path)
+    if import_format is None:
+        raise click.ClickException("Can't tell the format from the file name; pass --format")
+    
+    def progress(stored):
+        print(f"  … stored projects {stored[0]['id']}-{stored[-1]['id']}")
+    
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        report = import_projects(f, import_format, batch_size or current_app.config['IMPORT_BATCH_SIZE'], progress)
+    
+    for error in report['errors']:
+        print(f"✗ Record {error['record']}: {error['error']}")
+    if report['failed'] > len(report['errors']):
+        print(f"✗ … and {report['failed'] - len(report['errors'])} more")
+    if 'aborted' in report:
+        print(f"✗ Stopped reading: {report['aborted']}")
+    print(f"✓ Imported {report['imported']} project(s), {report['failed']} failed")
+
 # Error handlers
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
     return jsonify({"error": "Not found"}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
     # Check if default checklist file exists
-    if not DEFAULT_CHECKLIST_FILE.exists():
+    if not Path(default_config()['DEFAULT_CHECKLIST_FILE']).exists():
         print("=" * 60)
         print("⚠️  WARNING: default_checklist.json not found!")
         print("=" * 60)
@@ -710,16 +1493,16 @@ if __name__ == '__main__':
         print("The application will start but checklist will be empty.")
         print("=" * 60)
     
-    # Initialize data files
-    init_data_files()
+    # Load the default checklist and initialize data files
+    app = create_app()
     
-    # Run Flask app
+    # Run Flask development server (use wsgi.py for production)
     print("=" * 60)
     print("QA Testing Checklist Application")
     print("=" * 60)
     print("Starting Flask server...")
-    print("Access the application at: http://127.0.0.1:10101")
+    print(f"Access the application at: http://{app.config['HOST']}:{app.config['PORT']}")
     print("Press CTRL+C to quit")
     print("=" * 60)
     
-    app.run(debug=True, host='127.0.0.1', port=10101)
\ No newline at end of file
+    app.run(debug=True, host=app.config['HOST'], port=app.config['PORT'])
\ No newline at end of file
@@ -0,0 +1,349 @@
+"""
+QA Testing Checklist Application
+Benchmark suite for the storage and API hot paths: builds synthetic sessions
+(checklists of 10 to 100k items) and histories (10 to 50k completed
+projects), drives the app through its test client, first one request at a
+time and then from several threads at once, and reports throughput,
+p50/p99 latency and peak memory as JSON.
+
+    python benchmarks/bench.py                                  # quick profile
+    python benchmarks/bench.py --profile full --output baseline.json
+    python benchmarks/bench.py --baseline baseline.json         # exit 1 on a regression
+    python benchmarks/bench.py --items 10 5000 --history 100 --backend sqlite
+
+Every scenario runs in a fresh process on a throwaway data directory, with
+fixed random seeds, so two runs on the same machine are comparable. Results
+are compared with a baseline by operation, mode, backend, checklist size and
+history size.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak memory is not reported
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+RESULTS_FORMAT = 1
+
+PROFILES = {
+    'quick': {'items': [10, 1000, 10000], 'history': [10, 1000, 10000]},
+    'full': {'items': [10, 1000, 10000, 100000], 'history': [10, 1000, 10000, 50000]},
+}
+
+# Checklist size of the session in the history scenarios, and of every synthetic past project
+HISTORY_SCENARIO_ITEMS = 100
+PROJECT_ITEMS = 20
+ITEMS_PER_HEADING = 50
+
+SESSION_OPERATIONS = ('toggle_checklist_item', 'add_bug', 'complete_session')
+HISTORY_OPERATIONS = ('get_history', 'get_history_entry', 'complete_session')
+# Each completion first restores the big session, so it only runs one request at a time
+SEQUENTIAL_ONLY = ('complete_session',)
+
+
+def make_checklist(items, rng):
+    checklist = []
+    for number in range(items):
+        if number % ITEMS_PER_HEADING == 0:
+            checklist.append({"id": len(checklist) + 1, "title": f"Heading {len(checklist) + 1}", "items": []})
+        heading = checklist[-1]
+        heading['items'].append({
+            "id": len(heading['items']) + 1,
+            "text": f"Check {number + 1}: verify behaviour number {number + 1}",
+            "checked": rng.random() < 0.3
+        })
+    return checklist
+
+def make_session(items, rng):
+    return {
+        "target_website": "bench.example.com",
+        "start_date": "2025-01-06",
+        "checklist": make_checklist(items, rng),
+        "notes": [],
+        "bugs": []
+    }
+
+def make_project(number, rng):
+    from models import project_stats
+    project = {
+        "target_website": f"site-{number % 500}.example.com",
+        "start_date": "2025-01-06",
+        "end_date": "2025-01-17",
+        "completed_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 17:30:00",
+        "checklist": make_checklist(PROJECT_ITEMS, rng),
+        "notes": [{"id": 1, "text": f"Notes on site {number}", "created_at": "2025-01-07 10:00:00"}],
+        "bugs": [{"id": n, "title": f"Bug {n} on site {number}", "description": "Steps to reproduce",
+                  "created_at": "2025-01-08 11:00:00"} for n in range(1, rng.randint(0, 3) + 1)]
+    }
+    project['stats'] = project_stats(project)
+    return project
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class Scenario:
+    """One operation against one synthetic session and history, in a fresh app"""
+
+    def __init__(self, app, session, history_ids, seed):
+        self.app = app
+        self.session = session
+        # As stored: SQLite numbers history after the session's own project row
+        self.history_ids = history_ids
+        self.history_size = len(history_ids)
+        self.seed = seed
+        self.store = app.extensions['qa_checklist'].sessions.get('default')
+        self.item_ids = [(heading['id'], item['id']) for heading in session['checklist'] for item in heading['items']]
+
+    def restore_session(self):
+        self.store.save(json.loads(json.dumps(self.session)))
+
+    def request(self, operation, client, rng):
+        """Send one request; returns its status code"""
+        if operation == 'toggle_checklist_item':
+            heading_id, item_id = rng.choice(self.item_ids)
+            return client.post('/api/checklist/item', json={
+                'heading_id': heading_id, 'item_id': item_id, 'checked': rng.random() < 0.5}).status_code
+        if operation == 'add_bug':
+            return client.post('/api/bugs', json={
+                'title': f"Bug {rng.randrange(10 ** 6)}", 'description': 'Steps to reproduce: open the page'}).status_code
+        if operation == 'complete_session':
+            return client.post('/api/session/complete', json={'end_date': '2025-01-31'}).status_code
+        if operation == 'get_history':
+            offset = rng.randrange(max(self.history_size - 25, 1))
+            return client.get(f"/api/history?limit=25&offset={offset}").status_code
+        if operation == 'get_history_entry':
+            return client.get(f"/api/history/{rng.choice(self.history_ids)}").status_code
+        raise ValueError(f"Unknown operation: {operation}")
+
+    def measure(self, operation, requests, threads):
+        """Send `requests` requests from `threads` threads; returns latencies (seconds), errors and wall time"""
+        latencies = []
+        errors = []
+        prepare = self.restore_session if operation == 'complete_session' else None
+
+        def worker(number, count):
+            client = self.app.test_client()
+            rng = random.Random(self.seed * 1000 + number)
+            for _ in range(count):
+                if prepare is not None:
+                    prepare()
+                started = time.perf_counter()
+                status = self.request(operation, client, rng)
+                latencies.append(time.perf_counter() - started)
+                if status >= 400:
+                    errors.append(status)
+
+        counts = [requests // threads + (1 if number < requests % threads else 0) for number in range(threads)]
+        workers = [threading.Thread(target=worker, args=(number, count)) for number, count in enumerate(counts)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return latencies, errors, time.perf_counter() - started
+
+
+def run_scenario(spec, options):
+    """Build the data for one scenario and measure it; runs in its own process"""
+    # The app's startup messages would end up in the JSON on stdout
+    sys.stdout = sys.stderr
+    from app import create_app
+
+    data_dir = tempfile.mkdtemp(prefix='qa-bench-')
+    app = None
+    try:
+        setup_started = time.perf_counter()
+        app = create_app({'DATA_DIR': data_dir, 'STORAGE_BACKEND': options['backend']})
+        backend = app.extensions['qa_checklist'].storage_backend
+        rng = random.Random(options['seed'])
+        history_ids = []
+        for start in range(0, spec['history'], 1000):
+            stored = backend.add_history_entries([make_project(number, rng)
+                                                  for number in range(start, min(start + 1000, spec['history']))])
+            if stored is None:
+                raise RuntimeError("Storing the synthetic history failed")
+            history_ids.extend(project['id'] for project in stored)
+        session = make_session(spec['items'], rng)
+        scenario = Scenario(app, session, history_ids, options['seed'])
+        scenario.restore_session()
+        setup_seconds = time.perf_counter() - setup_started
+
+        requests = options['requests']
+        if spec['operation'] == 'complete_session':
+            requests = max(requests // 10, 5)
+        # Untimed warm-up: caches, first reads, imports
+        scenario.measure(spec['operation'], min(requests, 5), 1)
+
+        results = []
+        modes = [('sequential', 1)]
+        if spec['operation'] not in SEQUENTIAL_ONLY and options['concurrency'] > 1:
+            modes.append(('concurrent', options['concurrency']))
+        for mode, threads in modes:
+            latencies, errors, seconds = scenario.measure(spec['operation'], requests, threads)
+            latencies.sort()
+            results.append({
+                **spec,
+                "backend": options['backend'],
+                "mode": mode,
+                "threads": threads,
+                "requests": len(latencies),
+                "errors": len(errors),
+                "seconds": round(seconds, 4),
+                "throughput_rps": round(len(latencies) / seconds, 1) if seconds else None,
+                "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            })
+        backend.close()
+        for result in results:
+            result['setup_seconds'] = round(setup_seconds, 2)
+            result['peak_rss_mb'] = peak_rss_mb()
+        return results
+    finally:
+        if app is not None:
+            app.extensions['qa_checklist'].sessions.close()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def scenarios(items_sizes, history_sizes, operations):
+    """The session operations at every checklist size (smallest history), the history ones at every history size"""
+    specs = []
+    for items in items_sizes:
+        specs.extend({"operation": operation, "items": items, "history": min(history_sizes)}
+                     for operation in SESSION_OPERATIONS)
+    for history in history_sizes:
+        specs.extend({"operation": operation, "items": HISTORY_SCENARIO_ITEMS, "history": history}
+                     for operation in HISTORY_OPERATIONS)
+    unique = []
+    for spec in specs:
+        if spec not in unique and (not operations or spec['operation'] in operations):
+            unique.append(spec)
+    return unique
+
+def result_key(result):
+    return (result['operation'], result['mode'], result['backend'], result['items'], result['history'])
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Lines describing every result worse than its baseline by more than `tolerance` (a fraction)"""
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        label = "{operation} ({mode}, {backend}, {items} items, {history} projects)".format(**result)
+        for metric in ('p50_ms', 'p99_ms'):
+            if (result[metric] > before[metric] * (1 + tolerance)
+                    and result[metric] - before[metric] > min_delta_ms):
+                regressions.append(f"{label}: {metric} {before[metric]} -> {result[metric]}")
+        # Sub-millisecond requests vary too much run to run for throughput alone to count
+        if (before.get('throughput_rps') and result.get('throughput_rps')
+                and result['throughput_rps'] < before['throughput_rps'] * (1 - tolerance)
+                and result['mean_ms'] - before['mean_ms'] > min_delta_ms):
+            regressions.append(f"{label}: throughput {before['throughput_rps']} -> {result['throughput_rps']} req/s")
+    return regressions
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--items', type=int, nargs='+', help='checklist sizes (overrides the profile)')
+    parser.add_argument('--history', type=int, nargs='+', help='history sizes (overrides the profile)')
+    parser.add_argument('--operation', action='append', choices=sorted(set(SESSION_OPERATIONS + HISTORY_OPERATIONS)),
+                        help='only these operations (repeatable)')
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default='json')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario and mode')
+    parser.add_argument('--concurrency', type=int, default=8, help='threads in the concurrent mode (1 = skip it)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the results JSON here instead of to stdout')
+    parser.add_argument('--baseline', help='results JSON of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='how much worse (fraction) a result may be than the baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='latency differences below this are never regressions')
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    specs = scenarios(args.items or profile['items'], args.history or profile['history'], args.operation)
+    options = {'backend': args.backend, 'requests': args.requests, 'concurrency': args.concurrency, 'seed': args.seed}
+
+    # One fresh process per scenario: no state carried over and a per-scenario peak memory
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for number, spec in enumerate(specs, start=1):
+        print(f"[{number}/{len(specs)}] {spec['operation']}: {spec['items']} items, {spec['history']} projects",
+              file=sys.stderr, flush=True)
+        with context.Pool(1) as pool:
+            for result in pool.apply(run_scenario, (spec, options)):
+                results.append(result)
+                print(f"    {result['mode']:<11}{result['throughput_rps']:>10} req/s   p50 {result['p50_ms']:>9} ms"
+                      f"   p99 {result['p99_ms']:>9} ms   peak {result['peak_rss_mb']} MB"
+                      + (f"   {result['errors']} errors" if result['errors'] else ''),
+                      file=sys.stderr, flush=True)
+
+    report = {
+        "format": RESULTS_FORMAT,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {**options, "profile": args.profile},
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+        print(f"✓ Wrote {len(results)} result(s) to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    failed = any(result['errors'] for result in results)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"✗ Regression: {line}", file=sys.stderr)
+        if not regressions:
+            print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})", file=sys.stderr)
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
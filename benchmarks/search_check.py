@@ -0,0 +1,95 @@
+"""
+QA Testing Checklist Application
+Regression checks for history search on edge-case projects: imports them
+into a throwaway data directory, then searches, deletes and searches again.
+Every request must succeed.
+
+    python benchmarks/search_check.py
+    python benchmarks/search_check.py --backend sqlite
+
+Covers projects with nothing to index (a one-letter target and an empty
+checklist, notes and bugs), which used to make every search fail with a
+division by zero.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def project(target, checklist=(), bugs=()):
+    return {
+        "target_website": target,
+        "start_date": "2025-01-06",
+        "end_date": "2025-01-17",
+        "completed_at": "2025-01-17 17:30:00",
+        "checklist": list(checklist),
+        "notes": [],
+        "bugs": list(bugs)
+    }
+
+def check_search(client, query, expected_total):
+    """Return a list of problems with one search"""
+    response = client.get('/api/history/search', query_string={'q': query})
+    if response.status_code != 200:
+        return [f"search {query!r}: HTTP {response.status_code} {response.get_json()}"]
+    total = response.get_json()['total']
+    if total != expected_total:
+        return [f"search {query!r}: {total} result(s), expected {expected_total}"]
+    return []
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default='json')
+    args = parser.parse_args()
+
+    data_root = tempfile.mkdtemp(prefix='qa-search-check-')
+    try:
+        os.environ['QA_STORAGE_BACKEND'] = args.backend
+        os.chdir(data_root)
+        sys.path.insert(0, str(ROOT))
+        from app import create_app
+        qa_app = create_app()
+        client = qa_app.test_client()
+        problems = []
+
+        # Nothing but empty documents in the index
+        empty = [project('x'), project('y', bugs=[{"id": 1, "title": "-", "description": "a",
+                                                   "created_at": "2025-01-08 11:00:00"}])]
+        response = client.post('/api/history/import?format=jsonl', content_type='application/x-ndjson',
+                               data=''.join(json.dumps(entry) + '\n' for entry in empty))
+        if response.status_code != 200 or response.get_json()['imported'] != len(empty):
+            sys.exit(f"Importing the empty projects failed: HTTP {response.status_code} {response.get_json()}")
+        problems += check_search(client, 'anything', 0)
+
+        # An indexed project next to them, then again once it is deleted
+        heading = {"id": 1, "title": "Recon", "items": [{"id": 1, "text": "Login form", "checked": True}]}
+        response = client.post('/api/history/import?format=jsonl', content_type='application/x-ndjson',
+                               data=json.dumps(project('shop.example.com', [heading])) + '\n')
+        if response.status_code != 200 or response.get_json()['imported'] != 1:
+            sys.exit(f"Importing the project failed: HTTP {response.status_code} {response.get_json()}")
+        problems += check_search(client, 'login', 1)
+        response = client.delete(f"/api/history/{response.get_json()['last_id']}")
+        if response.status_code != 200:
+            problems.append(f"delete: HTTP {response.status_code}")
+        problems += check_search(client, 'login', 0)
+
+        qa_app.extensions['qa_checklist'].storage_backend.close()
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(data_root, ignore_errors=True)
+
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✓ Search handles projects with nothing to index ({args.backend} backend)")
+
+if __name__ == '__main__':
+    main()
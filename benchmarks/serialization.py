@@ -0,0 +1,163 @@
+"""
+QA Testing Checklist Application
+Serialization benchmark: how large the session and the completed history
+are on disk and on the wire, and how long encoding and decoding them takes,
+at several history sizes.
+
+    python benchmarks/serialization.py                  # 100, 1000 and 5000 projects
+    python benchmarks/serialization.py --sizes 10 100 --repeat 3
+
+Compares the old pretty-printed layout with compact JSON, gzip and (if the
+zstandard package is installed) zstd on disk; identity, gzip and (with the
+brotli package) br responses; and the standard library against orjson.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import codec
+from checklists import compile_checklist
+from models import project_stats
+
+
+def make_project(checklist, number, rng):
+    project = {
+        "target_website": f"site-{number}.example.com",
+        "start_date": "2025-01-06",
+        "end_date": "2025-01-17",
+        "completed_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 17:30:00",
+        "checklist": [
+            {**heading, "items": [{**item, "checked": rng.random() < 0.6} for item in heading['items']]}
+            for heading in checklist
+        ],
+        "notes": [{"id": n, "text": f"Note {n} about site-{number}", "created_at": "2025-01-07 10:00:00"}
+                  for n in range(1, rng.randint(0, 4) + 1)],
+        "bugs": [{"id": n, "title": f"Bug {n} on site-{number}", "description": "Steps to reproduce: " * 5,
+                  "created_at": "2025-01-08 11:00:00"}
+                 for n in range(1, rng.randint(0, 6) + 1)]
+    }
+    project['stats'] = project_stats(project)
+    return project
+
+def timed(function, repeat):
+    """Median seconds of `repeat` calls"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def disk_sizes(pretty_bytes, compact_bytes):
+    sizes = {"pretty": len(pretty_bytes), "compact": len(compact_bytes),
+             "gzip": len(codec.compress(compact_bytes, 'gzip'))}
+    if codec.zstandard is not None:
+        sizes['zstd'] = len(codec.compress(compact_bytes, 'zstd'))
+    return sizes
+
+def wire_sizes(client, path):
+    sizes = {}
+    for encoding in ('identity',) + codec.RESPONSE_ENCODINGS:
+        response = client.get(path, headers={'Accept-Encoding': encoding})
+        if response.status_code != 200:
+            sys.exit(f"GET {path} failed: HTTP {response.status_code}")
+        sizes[encoding] = len(response.data)
+    return sizes
+
+def codec_times(data, repeat):
+    stdlib_pretty = json.dumps(data, indent=2, ensure_ascii=False)
+    stdlib_compact = codec.dumps_stdlib(data)
+    times = {
+        "json encode (indent=2)": timed(lambda: json.dumps(data, indent=2, ensure_ascii=False), repeat),
+        "json encode (compact)": timed(lambda: codec.dumps_stdlib(data), repeat),
+        "json decode (indent=2)": timed(lambda: json.loads(stdlib_pretty), repeat),
+        "json decode (compact)": timed(lambda: json.loads(stdlib_compact), repeat),
+    }
+    if codec.orjson is not None:
+        encoded = codec.orjson.dumps(data)
+        times["orjson encode"] = timed(lambda: codec.orjson.dumps(data), repeat)
+        times["orjson decode"] = timed(lambda: codec.orjson.loads(encoded), repeat)
+    return times
+
+def print_table(title, rows, unit):
+    print(f"\n{title}")
+    columns = list(rows[0][1])
+    print(f"  {'':<28}" + ''.join(f"{column:>14}" for column in columns))
+    for label, values in rows:
+        print(f"  {label:<28}" + ''.join(f"{unit(values[column]):>14}" for column in columns))
+
+def kilobytes(size):
+    return f"{size / 1024:,.1f} KB"
+
+def milliseconds(seconds):
+    return f"{seconds * 1000:,.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000], help='history sizes (projects)')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs per measurement (the median is shown)')
+    args = parser.parse_args()
+
+    print(f"JSON library in use: {codec.JSON_LIBRARY}; response encodings: {', '.join(codec.RESPONSE_ENCODINGS)}")
+    rng = random.Random(1)
+    checklist = compile_checklist(json.loads((ROOT / 'default_checklist.json').read_text(encoding='utf-8')))
+
+    data_root = tempfile.mkdtemp(prefix='qa-serialization-')
+    try:
+        os.chdir(data_root)
+        from app import create_app
+        history = []
+        disk_rows, wire_rows, time_rows = [], [], []
+
+        session = make_project(checklist, 0, rng)
+        session_pretty = json.dumps(session, indent=2, ensure_ascii=False).encode('utf-8')
+        disk_rows.append(("session snapshot", disk_sizes(session_pretty, codec.encode(session))))
+
+        for size in sorted(args.sizes):
+            qa_app = create_app({'DATA_DIR': str(Path(data_root) / f"data-{size}")})
+            backend = qa_app.extensions['qa_checklist'].storage_backend
+            batch = [make_project(checklist, number, rng) for number in range(len(history), size)]
+            history.extend(backend.add_history_entries(batch))
+            # Same content in the session as in a project
+            qa_app.extensions['qa_checklist'].sessions.get('default').save({**session, "version": 1})
+            client = qa_app.test_client()
+            if not wire_rows:
+                # The session is the same at every history size
+                wire_rows.append(("/api/session", wire_sizes(client, '/api/session')))
+
+            pretty = json.dumps(history, indent=2, ensure_ascii=False).encode('utf-8')
+            sizes = disk_sizes(pretty, codec.encode(history))
+            sizes['compact'] = backend.completed_file.stat().st_size
+            disk_rows.append((f"completed.json, {size}", sizes))
+
+            wire_rows.append((f"/api/history page, {size}", wire_sizes(client, '/api/history?limit=200')))
+            wire_rows.append((f"/api/history/<id>, {size}", wire_sizes(client, f"/api/history/{history[-1]['id']}")))
+            time_rows.append((f"history of {size}", codec_times(history, args.repeat)))
+            backend.close()
+
+        print_table("Bytes on disk (completed.json is compact, one project per line, as stored)", disk_rows, kilobytes)
+        print_table("Bytes on the wire, by Accept-Encoding", wire_rows, kilobytes)
+        print("\nEncode/decode time of the whole history (median)")
+        for label, times in time_rows:
+            print(f"  {label}")
+            for name, seconds in times.items():
+                print(f"    {name:<26}{milliseconds(seconds):>14}")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(data_root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+QA Testing Checklist Application
+Smoke test for the production entry point: boots wsgi:app under a real server
+on a throwaway data directory, runs a concurrent load against it, then checks
+that every request succeeded and no update was lost.
+
+    python benchmarks/smoke.py                          # gunicorn, 2 workers x 8 threads
+    python benchmarks/smoke.py --server waitress
+    python benchmarks/smoke.py --server flask           # threaded development server
+    python benchmarks/smoke.py --workers 4 --clients 32 --requests 20
+
+Reports request latency (p50/p95/max) and throughput.
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from stress import check, make_http_client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def server_command(server, port, workers, threads):
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                '--bind', f"127.0.0.1:{port}", '--workers', str(workers), '--threads', str(threads),
+                '--access-logfile', '/dev/null', 'wsgi:app']
+    if server == 'waitress':
+        return [sys.executable, '-m', 'waitress', '--listen', f"127.0.0.1:{port}",
+                '--threads', str(threads), 'wsgi:app']
+    return [sys.executable, '-m', 'flask', '--app', 'wsgi:app', 'run',
+            '--port', str(port), '--with-threads', '--no-reload', '--no-debugger']
+
+def wait_until_ready(call, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            if call('GET', '/api/session')[0] == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_load(call, clients, requests, heading_id):
+    """Every client interleaves reads with note and item additions; returns (latencies, errors)"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed(method, path, payload=None):
+        started = time.perf_counter()
+        try:
+            status, _ = call(method, path, payload)
+        except OSError as e:
+            status = str(e)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors.append(f"{method} {path}: {status}")
+
+    def client(client_id):
+        for n in range(requests):
+            tag = f"w{client_id}-t0-n{n}"
+            timed('GET', '/api/session')
+            timed('POST', '/api/notes', {'text': f"note {tag}"})
+            timed('PUT', '/api/checklist/item', {'heading_id': heading_id, 'text': f"item {tag}"})
+            timed('GET', '/api/history?page=1')
+
+    pool = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('gunicorn', 'waitress', 'flask'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per worker')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=10, help='request rounds per client')
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default='json')
+    args = parser.parse_args()
+
+    port = free_port()
+    data_dir = tempfile.mkdtemp(prefix='qa-smoke-')
+    env = dict(os.environ, QA_DATA_DIR=data_dir, QA_STORAGE_BACKEND=args.backend)
+    if args.server == 'gunicorn' and args.workers > 1:
+        env['QA_MULTI_PROCESS'] = '1'
+    command = server_command(args.server, port, args.workers, args.threads)
+    print(f"Starting {args.server} on port {port} ({args.backend} backend, data in {data_dir})")
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    call = make_http_client(f"http://127.0.0.1:{port}")
+    try:
+        if not wait_until_ready(call, process):
+            process.kill()
+            sys.exit(f"✗ Server did not come up:\n{process.communicate()[1][-2000:]}")
+        print("✓ Server is up")
+
+        status, session = call('GET', '/api/session')
+        status, created = call('POST', '/api/checklist/heading', {'title': 'Smoke test'})
+        if status != 200:
+            sys.exit(f"✗ Creating the smoke heading failed: HTTP {status}")
+        heading_id = created['heading']['id']
+        start_version = session.get('version', 0) + 1
+
+        started = time.perf_counter()
+        latencies, errors = run_load(call, args.clients, args.requests, heading_id)
+        elapsed = time.perf_counter() - started
+
+        print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f}s "
+              f"({len(latencies) / elapsed:.0f} req/s)")
+        print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+        for error in errors[:10]:
+            print(f"  ✗ {error}")
+
+        expected_tags = [f"w{c}-t0-n{n}" for c in range(args.clients) for n in range(args.requests)]
+        problems = check(call('GET', '/api/session')[1], expected_tags, start_version, heading_id)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems or errors:
+            sys.exit(1)
+        print("✓ All requests succeeded, no lost or duplicated updates")
+    finally:
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT if args.server == 'flask' else signal.SIGTERM)
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""
+QA Testing Checklist Application
+Concurrency stress test: hammers the session routes from several processes
+(and threads in each), the way a multi-worker WSGI server would, then checks
+that no update was lost.
+
+    python benchmarks/stress.py                         # in-process test clients
+    python benchmarks/stress.py --backend sqlite
+    python benchmarks/stress.py --sessions 4             # workers spread over 4 sessions
+    python benchmarks/stress.py --url http://127.0.0.1:8000   # a running server
+
+Each client adds, edits, toggles and deletes notes and sub-items with unique
+texts, partly through /checklist/batch; afterwards every surviving one must
+be in the session exactly once, in its final state, with unique ids, and the
+session version must have advanced once per acknowledged change. Clients
+also complete and reset two sessions of their own: every acknowledged
+completion must be in the history exactly once, and every note added before
+one in exactly one completed project or still in the session.
+"""
+
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_local_client(qa_app):
+    client = qa_app.test_client()
+
+    def call(method, path, payload=None):
+        response = client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json()
+    return call
+
+def make_http_client(base_url):
+    def call(method, path, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, json.loads(response.read() or b'null')
+        except urllib.error.HTTPError as e:
+            return e.code, None
+    return call
+
+def empty_counts():
+    """Acknowledged changes: to the worker's session, to the lifecycle and reset
+    sessions, completions, and the tags of the notes added before a completion"""
+    return {"session": 0, "lifecycle": 0, "completed": 0, "reset": 0, "life_notes": []}
+
+def merge_counts(total, counts):
+    for key, value in counts.items():
+        total[key] += value
+
+def hammer(call, worker_id, threads, requests, heading_id, prefix='/api', lifecycle=None):
+    """Run `threads` clients doing `requests` rounds of changes each; returns (errors, counts).
+
+    ``prefix`` selects the session: '/api' for the default one,
+    '/api/sessions/<id>' for another. ``lifecycle`` is the (prefix, prefix)
+    of the sessions to complete and to reset, or None to leave those out.
+    """
+    errors = []
+    counts = empty_counts()
+    lock = threading.Lock()
+
+    def send(kind, what, method, path, payload=None, allowed=()):
+        """One request; counts it under ``kind`` if it succeeded. Returns the body, or None"""
+        status, body = call(method, path, payload)
+        with lock:
+            if status == 200:
+                counts[kind] += 1
+                return body
+            if status not in allowed:
+                errors.append(f"{what}: HTTP {status}")
+        return None
+
+    def run(thread_id):
+        for n in range(requests):
+            tag = f"w{worker_id}-t{thread_id}-n{n}"
+            # Note: add a draft and edit it; add another and delete it
+            added = send('session', f"add note {tag}", 'POST', f"{prefix}/notes", {'text': f"draft {tag}"})
+            if added:
+                send('session', f"edit note {tag}", 'PUT', f"{prefix}/notes/{added['note']['id']}",
+                     {'text': f"note {tag}"})
+            added = send('session', f"add scratch note {tag}", 'POST', f"{prefix}/notes", {'text': f"scratch {tag}"})
+            if added:
+                send('session', f"delete note {tag}", 'DELETE', f"{prefix}/notes/{added['note']['id']}")
+
+            # Item: add a draft, tick it, then rename it and add another in one batch
+            added = send('session', f"add item {tag}", 'PUT', f"{prefix}/checklist/item",
+                         {'heading_id': heading_id, 'text': f"draft {tag}"})
+            if added:
+                item_id = added['item']['id']
+                send('session', f"toggle item {tag}", 'POST', f"{prefix}/checklist/item",
+                     {'heading_id': heading_id, 'item_id': item_id, 'checked': True})
+                send('session', f"batch {tag}", 'POST', f"{prefix}/checklist/batch", {'operations': [
+                    {'op': 'edit_item', 'heading_id': heading_id, 'item_id': item_id, 'text': f"item {tag}"},
+                    {'op': 'add_item', 'heading_id': heading_id, 'text': f"batch {tag}"}
+                ]})
+            added = send('session', f"add scratch item {tag}", 'PUT', f"{prefix}/checklist/item",
+                         {'heading_id': heading_id, 'text': f"scratch {tag}"})
+            if added:
+                send('session', f"delete item {tag}", 'DELETE',
+                     f"{prefix}/checklist/item/{heading_id}/{added['item']['id']}")
+
+            if lifecycle is None:
+                continue
+            life_prefix, reset_prefix = lifecycle
+            send('lifecycle', f"set target {tag}", 'POST', f"{life_prefix}/info", {'target_website': f"site-{tag}"})
+            if send('lifecycle', f"add life note {tag}", 'POST', f"{life_prefix}/notes", {'text': f"life {tag}"}):
+                with lock:
+                    counts['life_notes'].append(tag)
+            # 400: another client completed the session (clearing the target) in between
+            if send('lifecycle', f"complete {tag}", 'POST', f"{life_prefix}/complete",
+                    {'end_date': '2025-01-31'}, allowed=(400,)):
+                with lock:
+                    counts['completed'] += 1
+            send('reset', f"add reset note {tag}", 'POST', f"{reset_prefix}/notes", {'text': f"reset {tag}"})
+            send('reset', f"reset {tag}", 'POST', f"{reset_prefix}/reset", {})
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return errors, counts
+
+def local_worker(data_root, worker_id, threads, requests, heading_id, prefix, lifecycle, results):
+    # A fresh interpreter per worker, like a WSGI server's worker processes
+    os.chdir(data_root)
+    sys.path.insert(0, str(ROOT))
+    from app import create_app
+    errors, counts = hammer(make_local_client(create_app()), worker_id, threads, requests, heading_id,
+                            prefix, lifecycle)
+    results.put((worker_id, errors, counts))
+
+def check(session, expected_tags, start_version, heading_id, changes=None):
+    """Return a list of problems with the final session.
+
+    Every tag's "note <tag>" and "item <tag>" must be there exactly once, and
+    the version must have advanced by ``changes`` (two per tag by default).
+    """
+    problems = []
+    heading = next((h for h in session['checklist'] if h['id'] == heading_id), None)
+    if heading is None:
+        return [f"heading {heading_id} disappeared"]
+
+    for kind, entries, prefix in (('note', session['notes'], 'note '), ('item', heading['items'], 'item ')):
+        texts = [entry['text'] for entry in entries if entry['text'].startswith(prefix)]
+        ids = [entry['id'] for entry in entries]
+        missing = {prefix + tag for tag in expected_tags} - set(texts)
+        if missing:
+            problems.append(f"{len(missing)} {kind}(s) lost, e.g. {sorted(missing)[:3]}")
+        if len(texts) != len(set(texts)):
+            problems.append(f"duplicate {kind}s")
+        if len(ids) != len(set(ids)):
+            problems.append(f"duplicate {kind} ids")
+
+    if changes is None:
+        changes = 2 * len(expected_tags)
+    if session.get('version', 0) - start_version != changes:
+        problems.append(f"version advanced by {session.get('version', 0) - start_version}, expected {changes}")
+    return problems
+
+def check_edits(session, expected_tags, heading_id):
+    """Return a list of problems with the edits, toggles, deletes and batches in the final session"""
+    problems = []
+    heading = next((h for h in session['checklist'] if h['id'] == heading_id), None)
+    if heading is None:
+        return [f"heading {heading_id} disappeared"]
+
+    items = {}
+    for item in heading['items']:
+        items.setdefault(item['text'], []).append(item)
+    unchecked = [tag for tag in expected_tags if not all(item['checked'] for item in items.get(f"item {tag}", []))]
+    if unchecked:
+        problems.append(f"{len(unchecked)} toggle(s) lost, e.g. {unchecked[:3]}")
+    batched = [tag for tag in expected_tags if len(items.get(f"batch {tag}", [])) != 1]
+    if batched:
+        problems.append(f"{len(batched)} batch-added item(s) missing or duplicated, e.g. {batched[:3]}")
+    for kind, entries in (('note', session['notes']), ('item', heading['items'])):
+        stale = [entry['text'] for entry in entries if entry['text'].startswith(('draft ', 'scratch '))]
+        if stale:
+            problems.append(f"{len(stale)} {kind} edit(s) or delete(s) lost, e.g. {stale[:3]}")
+    return problems
+
+def history_total(call):
+    status, page = call('GET', '/api/history?limit=1')
+    if status != 200:
+        sys.exit(f"GET /api/history failed: HTTP {status}")
+    return page['total']
+
+def check_lifecycle(call, read_session, counts, history_before, starts):
+    """Return a list of problems with the completed and reset sessions and the history"""
+    problems = []
+    (life_id, life_version), (reset_id, reset_version) = starts
+    added = history_total(call) - history_before
+    if added != counts['completed']:
+        problems.append(f"history grew by {added}, expected {counts['completed']} completion(s)")
+
+    # The newest projects are the ones completed during the run
+    found = []
+    for offset in range(0, max(added, 0), 200):
+        status, page = call('GET', f"/api/history?limit=200&offset={offset}")
+        for summary in page['projects'][:added - offset]:
+            status, project = call('GET', f"/api/history/{summary['id']}")
+            if status != 200:
+                problems.append(f"completed project {summary['id']}: HTTP {status}")
+                continue
+            if not project['target_website'].startswith('site-'):
+                problems.append(f"completed project {summary['id']} has target {project['target_website']!r}")
+            found.extend(note['text'] for note in project['notes'])
+    life = read_session(life_id)
+    found.extend(note['text'] for note in life['notes'])
+
+    wanted = [f"life {tag}" for tag in counts['life_notes']]
+    missing = set(wanted) - set(found)
+    if missing:
+        problems.append(f"{len(missing)} note(s) added before a completion lost, e.g. {sorted(missing)[:3]}")
+    if len(found) != len(set(found)):
+        problems.append("notes completed more than once")
+
+    for name, session, start_version, changes in (('lifecycle', life, life_version, counts['lifecycle']),
+                                                  ('reset', read_session(reset_id), reset_version, counts['reset'])):
+        if session.get('version', 0) - start_version != changes:
+            problems.append(f"{name} session version advanced by {session.get('version', 0) - start_version}, "
+                            f"expected {changes}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=25, help='rounds of changes per thread')
+    parser.add_argument('--sessions', type=int, default=1, help='spread the workers over this many sessions')
+    parser.add_argument('--backend', choices=('json', 'sqlite'), default='json')
+    parser.add_argument('--url', help='hammer a running server instead of in-process test clients')
+    args = parser.parse_args()
+
+    expected_tags = [f"w{w}-t{t}-n{n}" for w in range(args.processes)
+                     for t in range(args.threads) for n in range(args.requests)]
+
+    if args.url:
+        call = make_http_client(args.url.rstrip('/'))
+        status, _ = call('GET', '/api/session')
+        if status != 200:
+            sys.exit(f"GET /api/session failed: HTTP {status}")
+    else:
+        # A throwaway data directory shared by all worker processes
+        data_root = tempfile.mkdtemp(prefix='qa-stress-')
+        os.environ['QA_MULTI_PROCESS'] = '1'
+        os.environ['QA_STORAGE_BACKEND'] = args.backend
+        os.chdir(data_root)
+        # Registered first so it runs last, after the app has flushed on exit
+        atexit.register(shutil.rmtree, data_root, True)
+        sys.path.insert(0, str(ROOT))
+        from app import create_app
+        qa_app = create_app()
+        call = make_local_client(qa_app)
+
+    # Worker w works on session w % --sessions; the first one is the default session
+    targets = []
+    for n in range(args.sessions):
+        if n == 0:
+            session_id, prefix = 'default', '/api'
+        else:
+            status, created = call('POST', '/api/sessions', {'name': f"Stress {n}"})
+            if status != 200:
+                sys.exit(f"Creating a stress session failed: HTTP {status}")
+            session_id = created['session']['id']
+            prefix = f"/api/sessions/{session_id}"
+        start_version = call('GET', f"/api/sessions/{session_id}")[1].get('version', 0)
+        status, created = call('POST', f"{prefix}/checklist/heading", {'title': 'Stress test'})
+        if status != 200:
+            sys.exit(f"Creating the stress heading failed: HTTP {status}")
+        targets.append((session_id, prefix, created['heading']['id'], start_version + 1))
+
+    # Sessions every worker completes and resets, next to the ones above
+    lifecycle, lifecycle_starts = [], []
+    for name in ('Stress lifecycle', 'Stress reset'):
+        status, created = call('POST', '/api/sessions', {'name': name})
+        if status != 200:
+            sys.exit(f"Creating a stress session failed: HTTP {status}")
+        session_id = created['session']['id']
+        lifecycle.append(f"/api/sessions/{session_id}")
+        lifecycle_starts.append((session_id, call('GET', f"/api/sessions/{session_id}")[1].get('version', 0)))
+    lifecycle = tuple(lifecycle)
+    history_before = history_total(call)
+
+    print(f"{args.processes} process(es) x {args.threads} thread(s) x {args.requests} round(s) "
+          f"on {args.sessions} session(s), {'server ' + args.url if args.url else args.backend + ' backend'}")
+    started = time.perf_counter()
+    errors = []
+    # Acknowledged changes per worker
+    worker_counts = {}
+    if args.url:
+        # Processes only matter for in-process clients; over HTTP threads suffice
+        pool = []
+        lock = threading.Lock()
+
+        def run_worker(worker_id):
+            _, prefix, heading_id, _ = targets[worker_id % len(targets)]
+            found, counts = hammer(call, worker_id, args.threads, args.requests, heading_id, prefix, lifecycle)
+            with lock:
+                errors.extend(found)
+                worker_counts[worker_id] = counts
+        for worker_id in range(args.processes):
+            pool.append(threading.Thread(target=run_worker, args=(worker_id,)))
+            pool[-1].start()
+        for thread in pool:
+            thread.join()
+    else:
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        workers = [context.Process(target=local_worker,
+                                   args=(data_root, w, args.threads, args.requests,
+                                         targets[w % len(targets)][2], targets[w % len(targets)][1],
+                                         lifecycle, results))
+                   for w in range(args.processes)]
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            worker_id, found, counts = results.get()
+            errors.extend(found)
+            worker_counts[worker_id] = counts
+        for worker in workers:
+            worker.join()
+    elapsed = time.perf_counter() - started
+
+    totals = empty_counts()
+    for counts in worker_counts.values():
+        merge_counts(totals, counts)
+    total = totals['session'] + totals['lifecycle'] + totals['reset']
+    print(f"{total} changes ({totals['completed']} completion(s)) "
+          f"in {elapsed:.2f}s ({total / elapsed:.0f} changes/s), {len(errors)} failed request(s)")
+    for error in errors[:10]:
+        print(f"  ✗ {error}")
+
+    def read_session(session_id):
+        if args.url:
+            return call('GET', f"/api/sessions/{session_id}")[1]
+        # Read what is on disk, not any process's in-memory copy
+        return qa_app.extensions['qa_checklist'].storage_backend.session(session_id).load_session()
+
+    problems = []
+    for n, (session_id, _, heading_id, start_version) in enumerate(targets):
+        session = read_session(session_id)
+        session_tags = [tag for tag in expected_tags if int(tag.split('-')[0][1:]) % len(targets) == n]
+        changes = sum(counts['session'] for worker_id, counts in worker_counts.items() if worker_id % len(targets) == n)
+        problems.extend(f"session {session_id}: {problem}"
+                        for problem in check(session, session_tags, start_version, heading_id, changes)
+                        + check_edits(session, session_tags, heading_id))
+    problems.extend(check_lifecycle(call, read_session, totals, history_before, lifecycle_starts))
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems or errors:
+        sys.exit(1)
+    print("✓ No lost or duplicated updates, completions or resets")
+
+if __name__ == '__main__':
+    main()
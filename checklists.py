@@ -0,0 +1,189 @@
+"""
+QA Testing Checklist Application
+Checklist templates: each template file is validated and compiled once,
+kept frozen in memory and handed to new sessions as a fresh copy
+"""
+
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+import metrics
+from logs import logger
+
+# Signature of a template that was never read (a missing file's signature is None)
+_UNLOADED = object()
+
+
+def compile_checklist(checklist):
+    """Validate a parsed checklist and number its headings and items; raises ValueError.
+
+    Ids are renumbered 1..n (items per heading) so a hand-edited template
+    with duplicate or missing ids still produces a consistent session.
+    """
+    if not isinstance(checklist, list):
+        raise ValueError("expected a list of headings")
+
+    headings = []
+    for heading_index, heading in enumerate(checklist, start=1):
+        if not isinstance(heading, dict) or not isinstance(heading.get('title'), str) or not heading['title'].strip():
+            raise ValueError(f"heading {heading_index} needs a non-empty title")
+        items = heading.get('items', [])
+        if not isinstance(items, list):
+            raise ValueError(f"heading {heading_index}: items must be a list")
+
+        compiled_items = []
+        for item_index, item in enumerate(items, start=1):
+            if not isinstance(item, dict) or not isinstance(item.get('text'), str) or not item['text'].strip():
+                raise ValueError(f"heading {heading_index}, item {item_index} needs a non-empty text")
+            compiled_items.append({**item, 'id': item_index, 'checked': bool(item.get('checked', False))})
+        headings.append({**heading, 'id': heading_index, 'items': compiled_items})
+    return headings
+
+def freeze_checklist(checklist):
+    """Read-only version of a parsed checklist (tuples and mapping proxies)"""
+    return tuple(
+        MappingProxyType({
+            **heading,
+            'items': tuple(MappingProxyType(dict(item)) for item in heading.get('items', []))
+        })
+        for heading in checklist
+    )
+
+def copy_checklist(checklist):
+    """New heading and item dicts for a session; the strings are shared, they are immutable"""
+    return [
+        {**heading, 'items': [dict(item) for item in heading['items']]}
+        for heading in checklist
+    ]
+
+
+class ChecklistTemplate:
+    """One checklist template file, cached until the file changes.
+
+    The file is either a list of headings or an object with ``title``,
+    ``description`` and ``checklist``. Every call to ``checklist()`` stats
+    the file (cheap) and only re-reads and re-compiles it when its mtime or
+    size changed. Sessions get a copy of the frozen cached tree, so nothing
+    a session does can leak into the template or into another session. If
+    the file becomes unreadable the last good version keeps being served.
+    """
+
+    def __init__(self, path, name='default'):
+        self.path = Path(path)
+        self.name = name
+        self.title = 'Default Checklist' if name == 'default' else name.replace('-', ' ').replace('_', ' ').title()
+        self.description = ''
+        self.item_count = 0
+        # True once a valid version of the file has been compiled
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._signature = _UNLOADED
+        self._checklist = ()
+
+    @property
+    def label(self):
+        return "default checklist" if self.name == 'default' else f"checklist template '{self.name}'"
+
+    def _file_signature(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        if signature is None:
+            logger.warning("%s file not found: %s", self.label.capitalize(), self.path)
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                checklist = compile_checklist(data.get('checklist'))
+                self.title = str(data.get('title') or self.title)
+                self.description = str(data.get('description') or '')
+            else:
+                checklist = compile_checklist(data)
+            self._checklist = freeze_checklist(checklist)
+            self.item_count = sum(len(heading['items']) for heading in checklist)
+            self.loaded = True
+            logger.info("Loaded %s from %s", self.label, self.path)
+        except json.JSONDecodeError as e:
+            logger.error("Error parsing %s: %s", self.path.name, e)
+        except ValueError as e:
+            logger.error("Invalid %s in %s: %s", self.label, self.path.name, e)
+        except Exception as e:
+            logger.exception("Error loading %s: %s", self.label, e)
+
+    def frozen(self):
+        """The cached checklist (read-only), re-read first if the file changed"""
+        signature = self._file_signature()
+        metrics.record_cache('templates', signature == self._signature)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._load(signature)
+                    # Remember failures too, so a broken file isn't re-parsed on every call
+                    self._signature = signature
+        return self._checklist
+
+    def checklist(self):
+        """A fresh, mutable copy of the checklist for a new session"""
+        return copy_checklist(self.frozen())
+
+    def summary(self):
+        """What /api/templates lists for this template"""
+        return {
+            "name": self.name,
+            "title": self.title,
+            "description": self.description,
+            "heading_count": len(self._checklist),
+            "item_count": self.item_count
+        }
+
+
+class TemplateRegistry:
+    """All checklist templates, compiled at startup.
+
+    ``default`` is default_checklist.json; every ``<name>.json`` in the
+    templates directory adds a template called ``<name>``. Templates that
+    fail validation at startup are reported and left out. Edits to a
+    registered template's file are picked up like the default checklist's;
+    new files need a restart.
+    """
+
+    def __init__(self, default_path, directory=None):
+        self.default = ChecklistTemplate(default_path)
+        self.directory = Path(directory) if directory else None
+        self._templates = {}
+
+    def load(self):
+        """Compile every template; returns the number registered"""
+        # The default is always there, even if empty, as before templates existed
+        self.default.frozen()
+        templates = {'default': self.default}
+
+        if self.directory is not None and self.directory.is_dir():
+            for path in sorted(self.directory.glob('*.json')):
+                name = path.stem
+                if name in templates:
+                    logger.warning("Skipping %s: a template named '%s' already exists", path, name)
+                    continue
+                template = ChecklistTemplate(path, name)
+                template.frozen()
+                if template.loaded:
+                    templates[name] = template
+
+        self._templates = templates
+        return len(templates)
+
+    def get(self, name=None):
+        """The named template (the default when name is empty); None if unknown"""
+        if not name:
+            return self.default
+        return self._templates.get(name)
+
+    def summaries(self):
+        return [template.summary() for template in self._templates.values()]
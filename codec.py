@@ -0,0 +1,108 @@
+"""
+QA Testing Checklist Application
+JSON encoding and compression: orjson when it is installed (falling back
+to the standard library), optional gzip/zstd compression of stored
+snapshots, and gzip/brotli encoding of responses
+"""
+
+import gzip
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_LIBRARY = 'orjson' if orjson is not None else 'json'
+
+# How stored snapshots may be compressed; zstd needs the zstandard package
+STORAGE_COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+# Content-Encodings the server can produce, most preferred first; br needs the brotli package
+RESPONSE_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def encode(data, pretty=False, sort_keys=False, default=None):
+    """Serialize to UTF-8 JSON bytes: indented by 2 when pretty, with no spaces otherwise"""
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, default=default, option=options)
+        except TypeError:
+            # Integers past 64 bits and the like: the standard library copes
+            pass
+    return dumps_stdlib(data, pretty, sort_keys, default).encode('utf-8')
+
+def dumps(data, pretty=False, sort_keys=False, default=None):
+    """Like encode, as a string"""
+    if orjson is None:
+        return dumps_stdlib(data, pretty, sort_keys, default)
+    return encode(data, pretty, sort_keys, default).decode('utf-8')
+
+def dumps_stdlib(data, pretty=False, sort_keys=False, default=None):
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False, sort_keys=sort_keys, default=default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys, default=default)
+
+def decode(payload):
+    """Parse JSON from bytes or a string; raises ValueError (json.JSONDecodeError) if it isn't JSON"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def check_compression(compression):
+    """Raise ValueError unless snapshots can be compressed this way here"""
+    if compression not in STORAGE_COMPRESSIONS:
+        raise ValueError(f"Unknown storage compression: {compression} (expected one of {', '.join(STORAGE_COMPRESSIONS)})")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd storage compression needs the zstandard package (pip install zstandard)")
+
+def compress(payload, compression):
+    """Compress bytes for storage ('none' returns them unchanged)"""
+    if compression == 'gzip':
+        # mtime=0: the same data always gives the same bytes
+        return gzip.compress(payload, compresslevel=6, mtime=0)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    return payload
+
+def decompress(payload):
+    """Undo compress(), recognizing the format by its magic bytes; plain JSON is returned as is"""
+    if payload[:2] == GZIP_MAGIC:
+        return gzip.decompress(payload)
+    if payload[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ValueError("data is zstd-compressed but the zstandard package is not installed")
+        # The frame records its size, as ZstdCompressor.compress writes it
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return payload
+
+def negotiate_encoding(accept_encodings):
+    """The Content-Encoding to answer with, given the request's Accept-Encoding; None for identity"""
+    return accept_encodings.best_match(RESPONSE_ENCODINGS)
+
+def encode_body(body, encoding, level=6):
+    """Compress a response body with a Content-Encoding from negotiate_encoding()"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(level, 11))
+    # A zlib stream in a gzip wrapper, without gzip.compress's header timestamp
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
@@ -0,0 +1,85 @@
+"""
+QA Testing Checklist Application
+Live session updates: fans session changes out to the open
+/api/session/stream (Server-Sent Events) connections
+"""
+
+import json
+import queue
+import threading
+
+
+def format_event(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscriber:
+    """One open stream: a bounded queue of encoded messages"""
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Set when the queue overflowed; the stream then tells the client to resync
+        self.overflowed = False
+
+    def drain(self):
+        """Drop everything queued (after an overflow the client refetches anyway)"""
+        self.overflowed = False
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class ChangeBroadcaster:
+    """Publishes session events to every subscriber without ever blocking the publisher.
+
+    Publishing happens inside the request that changed the session (with the
+    session lock held), so each message is encoded once and handed to the
+    subscriber queues with ``put_nowait``. A subscriber that falls behind
+    (a stalled connection) loses its queued messages and gets a ``resync``
+    event instead of slowing everybody else down.
+    """
+
+    def __init__(self, max_subscribers=20, queue_size=256):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        """Register a new stream; None when the subscriber limit is reached"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(self.queue_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data, event_id=None):
+        """Queue one event for every subscriber"""
+        with self._lock:
+            if not self._subscribers:
+                return
+            message = format_event(event, data, event_id)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                subscriber.overflowed = True
@@ -0,0 +1,142 @@
+"""
+QA Testing Checklist Application
+History export: completed projects as JSON Lines, CSV or a Markdown report,
+produced chunk by chunk so a response never holds the whole history
+"""
+
+import csv
+import io
+import json
+
+from models import project_stats
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+    'md': ('text/markdown', 'md'),
+}
+
+# What one CSV row is, and its columns
+CSV_COLUMNS = {
+    'projects': ['id', 'target_website', 'start_date', 'end_date', 'completed_at', 'item_count',
+                 'checked_count', 'completion_percentage', 'note_count', 'bug_count'],
+    'bugs': ['project_id', 'target_website', 'completed_at', 'bug_id', 'title', 'description', 'created_at'],
+    'items': ['project_id', 'target_website', 'completed_at', 'heading', 'item_id', 'text', 'checked'],
+}
+
+# Spreadsheets run cells starting with these as formulas; bug reports often
+# contain exactly such payloads
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _stats(project):
+    return project.get('stats') or project_stats(project)
+
+def export_jsonl(projects):
+    """One project per line"""
+    for project in projects:
+        yield json.dumps(project, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def _csv_rows(project, rows):
+    if rows == 'projects':
+        stats = _stats(project)
+        yield [project['id'], project.get('target_website', ''), project.get('start_date', ''),
+               project.get('end_date', ''), project.get('completed_at', ''), stats['item_count'],
+               stats['checked_count'], stats['completion_percentage'], stats['note_count'], stats['bug_count']]
+    elif rows == 'bugs':
+        for bug in project.get('bugs') or []:
+            yield [project['id'], project.get('target_website', ''), project.get('completed_at', ''),
+                   bug.get('id'), bug.get('title', ''), bug.get('description', ''), bug.get('created_at', '')]
+    else:
+        for heading in project.get('checklist') or []:
+            for item in heading.get('items') or []:
+                yield [project['id'], project.get('target_website', ''), project.get('completed_at', ''),
+                       heading.get('title', ''), item.get('id'), item.get('text', ''),
+                       'yes' if item.get('checked') else 'no']
+
+def export_csv(projects, rows='projects'):
+    """A header, then one chunk of rows per project (one row per project, bug or checklist item)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS[rows])
+    for project in projects:
+        for row in _csv_rows(project, rows):
+            writer.writerow([_cell(value) for value in row])
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    # Header only, when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _markdown_lines(text):
+    # Keeps multi-line notes inside their list item
+    return (text or '').strip().replace('\n', '\n  ')
+
+def markdown_project(project, level=2):
+    """One project's report: summary, checklist and notes (bugs come separately)"""
+    stats = _stats(project)
+    heading = '#' * level
+    lines = [
+        f"{heading} {project.get('target_website') or 'Untitled project'}",
+        "",
+        f"- **Start date:** {project.get('start_date') or 'N/A'}",
+        f"- **End date:** {project.get('end_date') or 'N/A'}",
+        f"- **Completed at:** {project.get('completed_at') or 'N/A'}",
+        f"- **Completion:** {stats['checked_count']}/{stats['item_count']} items ({stats['completion_percentage']}%)",
+        f"- **Bugs:** {stats['bug_count']}",
+        "",
+        f"{heading}# Checklist",
+        ""
+    ]
+    for checklist_heading in project.get('checklist') or []:
+        lines.append(f"{heading}## {checklist_heading.get('title', '')}")
+        lines.append("")
+        for item in checklist_heading.get('items') or []:
+            lines.append(f"- [{'x' if item.get('checked') else ' '}] {_markdown_lines(item.get('text'))}")
+        lines.append("")
+
+    if project.get('notes'):
+        lines.extend([f"{heading}# Notes", ""])
+        for note in project['notes']:
+            lines.append(f"- {_markdown_lines(note.get('text'))} _({note.get('created_at') or 'N/A'})_")
+        lines.append("")
+
+    if project.get('bugs'):
+        lines.extend([f"{heading}# Bugs", ""])
+    return '\n'.join(lines) + '\n'
+
+def markdown_bug(bug, number, level=2):
+    heading = '#' * (level + 2)
+    return '\n'.join([
+        f"{heading} {number}. {bug.get('title', '')}",
+        "",
+        f"_Reported {bug.get('created_at') or 'N/A'}_",
+        "",
+        (bug.get('description') or '').strip(),
+        "",
+        ""
+    ])
+
+def export_markdown(projects, title):
+    """A report: a title, then one chunk per project and one per bug"""
+    yield f"# {title}\n\n"
+    for project in projects:
+        yield markdown_project(project)
+        for number, bug in enumerate(project.get('bugs') or [], start=1):
+            yield markdown_bug(bug, number)
+
+def export_history(projects, export_format, rows='projects', title='QA Testing History'):
+    """Chunks of the export of an iterable of projects in the given format"""
+    if export_format == 'jsonl':
+        return export_jsonl(projects)
+    if export_format == 'csv':
+        return export_csv(projects, rows)
+    return export_markdown(projects, title)
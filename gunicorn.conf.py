@@ -0,0 +1,32 @@
+"""
+QA Testing Checklist Application
+gunicorn settings:  gunicorn -c gunicorn.conf.py wsgi:app
+
+    QA_BIND      address to listen on (default 127.0.0.1:8000)
+    QA_WORKERS   worker processes (default 2)
+    QA_THREADS   threads per worker (default 8)
+    QA_ACCESS_LOG  1 to log every request to stdout (default off)
+"""
+
+import os
+
+bind = os.environ.get('QA_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('QA_WORKERS', '2'))
+# Threaded workers: open /api/session/stream connections each hold a thread
+worker_class = 'gthread'
+threads = int(os.environ.get('QA_THREADS', '8'))
+# gthread workers keep heartbeating while streams are open, so this only
+# catches a worker that is truly stuck
+timeout = 30
+graceful_timeout = 10
+
+# Workers share data/: every request must lock and re-read the session
+if workers > 1:
+    os.environ.setdefault('QA_MULTI_PROCESS', '1')
+# Keep half of each worker's threads free for ordinary requests
+os.environ.setdefault('QA_SESSION_STREAM_MAX', str(max(1, threads // 2)))
+
+# No preload_app: each worker builds its own app (and session store) after the fork
+preload_app = False
+# One synchronous line per request; the app itself logs only errors and slow requests
+accesslog = '-' if os.environ.get('QA_ACCESS_LOG') == '1' else None
@@ -0,0 +1,324 @@
+"""
+QA Testing Checklist Application
+Cross-project history statistics: running totals per heading, per target
+website and per month, updated as projects are completed or deleted so
+reports never scan the whole history
+"""
+
+import threading
+import time
+
+import codec
+import metrics
+from logs import logger
+from models import project_stats
+from storage import FileLock, load_json, save_json
+
+STATS_FORMAT = 1
+
+# Signature of a stats file that was never read (a missing file's signature is None)
+_UNLOADED = object()
+
+
+def empty_stats():
+    return {
+        "format": STATS_FORMAT,
+        # project id (as a string) -> completed_at of every project counted
+        "projects": {},
+        "totals": {"projects": 0, "item_count": 0, "checked_count": 0, "note_count": 0, "bug_count": 0},
+        # heading title -> counts over every project that had the heading
+        "headings": {},
+        # target website -> counts over every project for that target
+        "targets": {},
+        # "YYYY-MM" of completion -> counts over the projects completed that month
+        "months": {}
+    }
+
+def completion_percentage(checked_count, item_count):
+    return round(checked_count / item_count * 100, 1) if item_count else 0
+
+def _add_counts(table, key, sign, **counts):
+    entry = table.setdefault(key, {name: 0 for name in counts})
+    for name, value in counts.items():
+        entry[name] = entry.get(name, 0) + sign * value
+    if entry['projects'] <= 0:
+        # The last project behind it is gone
+        del table[key]
+
+def stats_record(project):
+    """What one project contributes to the stats, as written to the journal"""
+    counts = project.get('stats') or project_stats(project)
+    return {
+        "id": project['id'],
+        "completed_at": project.get('completed_at') or '',
+        "target_website": (project.get('target_website') or '').strip(),
+        "counts": {name: counts[name] for name in ('item_count', 'checked_count', 'note_count', 'bug_count')},
+        # [title, item_count, checked_count] per heading
+        "headings": [[(heading.get('title') or '').strip(), len(heading.get('items') or []),
+                      sum(1 for item in heading.get('items') or [] if item.get('checked'))]
+                     for heading in project.get('checklist') or []]
+    }
+
+def apply_record(stats, record, sign):
+    """Add (sign=1) or subtract (sign=-1) one stats_record()"""
+    counts = record['counts']
+    totals = stats['totals']
+    totals['projects'] += sign
+    for name, value in counts.items():
+        totals[name] += sign * value
+
+    for title, item_count, checked_count in record['headings']:
+        _add_counts(stats['headings'], title, sign,
+                    projects=1, item_count=item_count, checked_count=checked_count)
+
+    _add_counts(stats['targets'], record['target_website'], sign,
+                projects=1, bug_count=counts['bug_count'],
+                item_count=counts['item_count'], checked_count=counts['checked_count'])
+
+    _add_counts(stats['months'], record['completed_at'][:7] or 'unknown', sign,
+                projects=1, bug_count=counts['bug_count'],
+                item_count=counts['item_count'], checked_count=counts['checked_count'])
+
+    if sign > 0:
+        stats['projects'][str(record['id'])] = record['completed_at']
+    else:
+        stats['projects'].pop(str(record['id']), None)
+
+def apply_project(stats, project, sign):
+    """Add (sign=1) or subtract (sign=-1) one project's contribution"""
+    apply_record(stats, stats_record(project), sign)
+
+
+class HistoryStats:
+    """Aggregates over the completed history: a snapshot in ``history_stats.json``
+    plus ``history_stats.journal``.
+
+    Completing a project appends its counts to the journal, deleting one
+    appends them to be subtracted, so an update costs the size of that one
+    project rather than a rewrite of the snapshot (whose list of counted
+    projects grows with the history). The journal is folded into the
+    snapshot once it grows past half the snapshot's size (and at least
+    ``compact_bytes``). /api/history/stats reads the totals from memory;
+    other processes' journal lines are picked up first. On startup the
+    stats are checked against the history and rebuilt if the two disagree.
+    """
+
+    def __init__(self, stats_file, compact_bytes=256 * 1024):
+        self.stats_file = stats_file
+        self.journal_path = stats_file.with_suffix('.journal')
+        self.compact_bytes = compact_bytes
+        self._file_lock = FileLock(stats_file)
+        # Always taken after the file lock, never before
+        self._lock = threading.RLock()
+        self._signature = _UNLOADED
+        self._journal_offset = 0
+        self._stats = empty_stats()
+        self._compacting = False
+
+    def _file_signature(self):
+        try:
+            stat = self.stats_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _journal_size(self):
+        try:
+            return self.journal_path.stat().st_size
+        except OSError:
+            return 0
+
+    def _load_snapshot(self, signature):
+        stats = load_json(self.stats_file) if signature is not None else None
+        if not isinstance(stats, dict) or stats.get('format') != STATS_FORMAT:
+            stats = empty_stats()
+        self._stats = stats
+        self._signature = signature
+        self._journal_offset = 0
+
+    def _replay_journal(self):
+        """Apply journal lines past what this process has already read"""
+        if self._journal_size() <= self._journal_offset:
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    entry = codec.decode(line)
+                except ValueError:
+                    # A crash mid-append; the next writer cuts it off
+                    break
+                self._apply(entry)
+                self._journal_offset += len(line)
+
+    def _apply(self, entry):
+        if 'add' in entry:
+            if str(entry['add']['id']) not in self._stats['projects']:
+                apply_record(self._stats, entry['add'], 1)
+        elif str(entry['remove']['id']) in self._stats['projects']:
+            apply_record(self._stats, entry['remove'], -1)
+
+    def _refresh(self):
+        """Catch up with what other processes wrote (caller holds the file lock and self._lock)"""
+        signature = self._file_signature()
+        metrics.record_cache('history_stats', signature == self._signature
+                             and self._journal_size() == self._journal_offset)
+        if signature != self._signature:
+            self._load_snapshot(signature)
+        self._replay_journal()
+        return self._stats
+
+    def _write_snapshot(self):
+        if not save_json(self.stats_file, self._stats):
+            return False
+        # Snapshot first: if we crash before truncating, replaying the journal
+        # over it again is harmless (counted projects are skipped)
+        with open(self.journal_path, 'wb'):
+            pass
+        self._signature = self._file_signature()
+        self._journal_offset = 0
+        return True
+
+    def _update(self, projects, sign):
+        try:
+            with self._file_lock.exclusive(), self._lock:
+                stats = self._refresh()
+                # Skip what is already counted (or already gone)
+                key = 'add' if sign > 0 else 'remove'
+                entries = [{key: stats_record(project)} for project in projects
+                           if (str(project['id']) in stats['projects']) != (sign > 0)]
+                if not entries:
+                    return True
+
+                if self._journal_size() != self._journal_offset:
+                    # Drop a torn last line left by a crash
+                    with open(self.journal_path, 'r+b') as f:
+                        f.truncate(self._journal_offset)
+                started = time.perf_counter()
+                lines = b''.join(codec.encode(entry) + b'\n' for entry in entries)
+                with open(self.journal_path, 'ab') as f:
+                    f.write(lines)
+                    f.flush()
+                metrics.record_storage('append', self.journal_path, started, len(lines))
+                self._journal_offset += len(lines)
+                for entry in entries:
+                    self._apply(entry)
+
+                snapshot_size = (self._signature or (0, 0))[1]
+                if self._journal_offset >= max(self.compact_bytes, snapshot_size // 2) and not self._compacting:
+                    # Fold the journal in the background so this request doesn't pay for it
+                    self._compacting = True
+                    threading.Thread(target=self.compact, daemon=True).start()
+                return True
+        except Exception as e:
+            # Not fatal: sync() rebuilds the stats on the next start if they drifted
+            logger.exception("Error updating %s: %s", self.journal_path, e)
+            return False
+
+    def add(self, project):
+        """Count a newly completed project"""
+        return self._update([project], 1)
+
+    def add_many(self, projects):
+        """Count several projects with one journal write (bulk import)"""
+        return self._update(projects, 1)
+
+    def remove(self, project):
+        """Stop counting a deleted project (the project as it was stored)"""
+        return self._update([project], -1)
+
+    def compact(self):
+        """Write a fresh snapshot and empty the journal"""
+        with self._file_lock.exclusive(), self._lock:
+            self._compacting = False
+            self._refresh()
+            return self._write_snapshot()
+
+    def rebuild(self, history):
+        """Recount from scratch over an iterable of completed projects; returns the number counted"""
+        stats = empty_stats()
+        for project in history:
+            apply_project(stats, project, 1)
+        with self._file_lock.exclusive(), self._lock:
+            self._stats = stats
+            self._write_snapshot()
+        return stats['totals']['projects']
+
+    def sync(self, backend):
+        """Make the stats match the history store; returns the number of projects newly counted.
+
+        Projects missing from the stats are added one by one; if the stats
+        count a project the history no longer has (or has with another
+        completion time), they are rebuilt from the whole history.
+        """
+        with self._file_lock.exclusive(), self._lock:
+            stats = self._refresh()
+            page = backend.list_history(1, 0)
+            if page is None:
+                return 0
+            total = page[0]
+            summaries = backend.list_history(total, 0)[1] if total else []
+            wanted = {str(summary['id']): summary.get('completed_at') or '' for summary in summaries}
+
+            if any(wanted.get(project_id) != completed_at for project_id, completed_at in stats['projects'].items()):
+                logger.warning("%s doesn't match the history; rebuilding it", self.stats_file.name)
+                return self.rebuild(backend.iter_history())
+
+            missing = [int(project_id) for project_id in wanted if project_id not in stats['projects']]
+            if not missing:
+                return 0
+            if len(missing) > 50:
+                # One pass over the whole history beats thousands of single reads
+                missing_ids = set(missing)
+                projects = (project for project in backend.iter_history() if project['id'] in missing_ids)
+            else:
+                projects = (backend.get_history_entry(project_id) for project_id in missing)
+            for project in projects:
+                if project is not None:
+                    apply_project(stats, project, 1)
+            # Startup only: fold everything into a fresh snapshot
+            self._write_snapshot()
+            return len(missing)
+
+    def report(self, top=20):
+        """What /api/history/stats returns: totals, then the ``top`` entries of each breakdown"""
+        # The totals are changed in place, so they are read under the lock
+        with self._file_lock.shared(), self._lock:
+            return self._report(self._refresh(), top)
+
+    def _report(self, stats, top):
+        totals = dict(stats['totals'])
+        totals['completion_percentage'] = completion_percentage(totals['checked_count'], totals['item_count'])
+
+        headings = []
+        for title, entry in stats['headings'].items():
+            skipped = entry['item_count'] - entry['checked_count']
+            headings.append({
+                "title": title,
+                **entry,
+                "skipped_count": skipped,
+                "skip_rate": round(skipped / entry['item_count'] * 100, 1) if entry['item_count'] else 0
+            })
+        # Most skipped first
+        headings.sort(key=lambda heading: (-heading['skip_rate'], -heading['projects'], heading['title']))
+
+        targets = [{"target_website": target, **entry,
+                    "completion_percentage": completion_percentage(entry['checked_count'], entry['item_count'])}
+                   for target, entry in stats['targets'].items()]
+        targets.sort(key=lambda target: (-target['bug_count'], -target['projects'], target['target_website']))
+
+        # Every month, oldest first, for trend charts
+        months = [{"month": month, **entry,
+                   "completion_percentage": completion_percentage(entry['checked_count'], entry['item_count'])}
+                  for month, entry in sorted(stats['months'].items())]
+
+        return {
+            "totals": totals,
+            "heading_count": len(headings),
+            "headings": headings[:top],
+            "target_count": len(targets),
+            "targets": targets[:top],
+            "months": months
+        }
@@ -0,0 +1,253 @@
+"""
+QA Testing Checklist Application
+Bulk import of past audits into the completed history: records are read
+one at a time from JSON Lines, a JSON array or CSV, validated, and stored
+in batches with one write per batch
+"""
+
+import csv
+import json
+from datetime import datetime
+
+from checklists import compile_checklist
+from models import project_stats
+
+IMPORT_FORMATS = ('jsonl', 'json', 'csv')
+
+# Request content types that name a format
+IMPORT_MIMETYPES = {
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/json': 'json',
+    'text/csv': 'csv',
+}
+
+# Per-record errors kept for the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# A JSON array element still unparsed after this many characters is malformed
+MAX_JSON_RECORD = 16 * 1024 * 1024
+
+CHECKED_VALUES = ('1', 'true', 'yes', 'y', 'x', 'checked')
+
+# What CSV exports put a ' in front of, so spreadsheets don't run it as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _optional_string(record, key, default=''):
+    value = record.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    return value
+
+def validate_project(record):
+    """A completed-history entry from an imported record (ids assigned later); raises ValueError.
+
+    Checked like a session: a target website, a valid checklist, and notes
+    and bugs with their text. Heading, item, note and bug ids are renumbered.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    target_website = record.get('target_website')
+    if not isinstance(target_website, str) or not target_website.strip():
+        raise ValueError("target_website is required")
+
+    notes = record.get('notes') or []
+    bugs = record.get('bugs') or []
+    if not isinstance(notes, list) or not isinstance(bugs, list):
+        raise ValueError("notes and bugs must be lists")
+
+    entry = {
+        "target_website": target_website.strip(),
+        "start_date": _optional_string(record, 'start_date'),
+        "end_date": _optional_string(record, 'end_date'),
+        "completed_at": _optional_string(record, 'completed_at') or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "checklist": compile_checklist(record.get('checklist') or []),
+        "notes": [],
+        "bugs": []
+    }
+    for number, note in enumerate(notes, start=1):
+        if not isinstance(note, dict) or not isinstance(note.get('text'), str) or not note['text'].strip():
+            raise ValueError(f"note {number} needs a non-empty text")
+        entry['notes'].append({"id": number, "text": note['text'], "created_at": _optional_string(note, 'created_at')})
+    for number, bug in enumerate(bugs, start=1):
+        if not isinstance(bug, dict) or not isinstance(bug.get('title'), str) or not bug['title'].strip():
+            raise ValueError(f"bug {number} needs a non-empty title")
+        entry['bugs'].append({
+            "id": number,
+            "title": bug['title'],
+            "description": _optional_string(bug, 'description'),
+            "created_at": _optional_string(bug, 'created_at')
+        })
+    entry['stats'] = project_stats(entry)
+    return entry
+
+# Readers yield (record number, record, error): a record, or the reason one
+# could not be read. Unrecoverable input raises ValueError instead.
+
+def read_jsonl(stream):
+    """One project object per line; blank lines are skipped"""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {str(e)}"
+
+def read_json_array(stream, chunk_size=64 * 1024):
+    """The elements of one top-level JSON array, parsed one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    started = False
+    number = 0
+
+    while True:
+        buffer = buffer.lstrip()
+        if buffer and not started:
+            if buffer[0] != '[':
+                raise ValueError("expected a JSON array")
+            buffer = buffer[1:]
+            started = True
+            continue
+        if started and buffer[:1] == ',':
+            buffer = buffer[1:]
+            continue
+        if started and buffer[:1] == ']':
+            return
+        if buffer:
+            try:
+                value, end = decoder.raw_decode(buffer)
+            except ValueError as e:
+                if eof or len(buffer) > MAX_JSON_RECORD:
+                    raise ValueError(f"record {number + 1}: invalid JSON ({str(e)}); nothing after it was read")
+                value = end = None
+            if end is not None:
+                number += 1
+                buffer = buffer[end:]
+                yield number, value, None
+                continue
+        if eof:
+            raise ValueError("unterminated JSON array" if started else "empty input")
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+def read_csv(stream):
+    """Checklist rows, as exported with ?format=csv&rows=items: consecutive rows of one project make a project.
+
+    Rows belong to the same project while ``project_id`` (or, without that
+    column, ``target_website`` and ``completed_at``) stays the same; items
+    are grouped under their ``heading``. ``checked`` is yes/no, true/false
+    or 1/0. ``start_date`` and ``end_date`` columns are optional.
+    """
+    reader = csv.DictReader(stream)
+    missing = {'target_website', 'heading', 'text'} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+
+    project = None
+    key = None
+    first_line = None
+    for row in reader:
+        row_key = row.get('project_id') or (row.get('target_website'), row.get('completed_at'))
+        if project is not None and row_key != key:
+            yield first_line, project, None
+            project = None
+        if project is None:
+            key = row_key
+            first_line = reader.line_num
+            project = {
+                "target_website": _csv_text(row.get('target_website')),
+                "start_date": row.get('start_date') or '',
+                "end_date": row.get('end_date') or '',
+                "completed_at": row.get('completed_at') or '',
+                "checklist": []
+            }
+        headings = project['checklist']
+        title = _csv_text(row.get('heading'))
+        if not headings or headings[-1]['title'] != title:
+            headings.append({"title": title, "items": []})
+        headings[-1]['items'].append({
+            "text": _csv_text(row.get('text')),
+            "checked": (row.get('checked') or '').strip().lower() in CHECKED_VALUES
+        })
+    if project is not None:
+        yield first_line, project, None
+
+def _csv_text(value):
+    value = value or ''
+    if value[:1] == "'" and value[1:2].startswith(_FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+READERS = {'jsonl': read_jsonl, 'json': read_json_array, 'csv': read_csv}
+
+def detect_format(filename, mimetype=None):
+    """The import format a file name's extension (or else a content type) implies; None if neither does"""
+    extension = (filename or '').rsplit('.', 1)[-1].lower() if '.' in (filename or '') else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension in ('json', 'csv'):
+        return extension
+    return IMPORT_MIMETYPES.get(mimetype)
+
+
+def import_history(stream, import_format, store_batch, batch_size=500, on_batch=None):
+    """Validate and store every record of a text stream; returns a report dict.
+
+    ``store_batch(entries)`` stores a list of entries with one write and
+    returns them with their ids (or None if the write failed). Valid
+    records are stored ``batch_size`` at a time, so memory stays bounded
+    however long the input is; invalid ones are reported by record number
+    (the line number for JSON Lines and CSV, the position in a JSON array)
+    and skipped. ``on_batch(stored)`` runs after every stored batch.
+    """
+    report = {"imported": 0, "failed": 0, "errors": [], "first_id": None, "last_id": None}
+
+    def fail(number, error):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({"record": number, "error": error})
+
+    batch = []
+    numbers = []
+
+    def flush():
+        stored = store_batch(batch)
+        if stored is None:
+            for number in numbers:
+                fail(number, "could not be saved")
+        else:
+            report['imported'] += len(stored)
+            if report['first_id'] is None:
+                report['first_id'] = stored[0]['id']
+            report['last_id'] = stored[-1]['id']
+            if on_batch is not None:
+                on_batch(stored)
+        batch.clear()
+        numbers.clear()
+
+    try:
+        for number, record, error in READERS[import_format](stream):
+            if error is None:
+                try:
+                    batch.append(validate_project(record))
+                    numbers.append(number)
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                fail(number, error)
+            if len(batch) >= batch_size:
+                flush()
+    except UnicodeDecodeError as e:
+        report['aborted'] = f"input is not UTF-8 ({str(e)})"
+    except ValueError as e:
+        # Unreadable input: keep what was read before it
+        report['aborted'] = str(e)
+    if batch:
+        flush()
+    return report
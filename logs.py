@@ -0,0 +1,141 @@
+"""
+QA Testing Checklist Application
+Application logging: levels, a request id on every line, text or JSON
+output, and a queue in front of the output so request threads never wait
+on log I/O
+"""
+
+import atexit
+import copy
+import logging
+import queue
+import re
+import sys
+import traceback
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context
+
+import codec
+
+LOGGER_NAME = 'qa_checklist'
+LOG_FORMATS = ('text', 'json')
+
+# What a client-supplied X-Request-ID may look like (anything else gets a fresh id)
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# The one listener of this process, started by the first configure_logging()
+_listener = None
+
+
+def new_request_id(supplied=None):
+    """The client's X-Request-ID if it is a sane token, else a new random id"""
+    if supplied and REQUEST_ID_PATTERN.fullmatch(supplied):
+        return supplied
+    return uuid.uuid4().hex[:16]
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the id of the request being handled ('-' outside requests)"""
+
+    def filter(self, record):
+        # Code running outside the request (a streamed response) passes it in extra=
+        if getattr(record, 'request_id', None) is None:
+            record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class BufferedHandler(QueueHandler):
+    """Puts records on a queue; a QueueListener thread formats and writes them.
+
+    The message and any traceback are rendered here, on the thread that logged,
+    so the record no longer refers to request objects once it is queued.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """``2025-01-06 10:00:00 ERROR [request id] message``, then the traceback if any"""
+
+    def format(self, record):
+        line = (f"{datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')} "
+                f"{record.levelname} [{getattr(record, 'request_id', '-')}] {record.getMessage()}")
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request id, message, extra fields, traceback"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, 'request_id', '-'),
+            "message": record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return codec.dumps(entry, default=str)
+
+
+def configure_logging(level='INFO', log_format='text', stream=None):
+    """Send the application's log records through a queue to ``stream`` (stderr by default).
+
+    Raises ValueError for an unknown level or format. Calling it again (a
+    second app in the same process) replaces the previous setup.
+    """
+    global _listener
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format} (expected one of {', '.join(LOG_FORMATS)})")
+    numeric_level = logging.getLevelName(str(level).upper())
+    if not isinstance(numeric_level, int):
+        raise ValueError(f"Unknown log level: {level}")
+
+    if _listener is not None:
+        _listener.stop()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter())
+    records = queue.SimpleQueue()
+    handler = BufferedHandler(records)
+    handler.addFilter(RequestIdFilter())
+    logger.addHandler(handler)
+    logger.setLevel(numeric_level)
+    # Records stop here rather than also reaching the root logger's handlers
+    logger.propagate = False
+
+    _listener = QueueListener(records, output)
+    _listener.start()
+    return logger
+
+def stop_logging():
+    """Write out whatever is still queued (at exit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,208 @@
+"""
+QA Testing Checklist Application
+Performance metrics exposed at /metrics in Prometheus text format: request
+latency, storage reads and writes, JSON encoding of responses, cache hits
+and data file sizes. Recording a sample takes one small lock, so it is
+cheap enough to leave on in production
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A running total per combination of label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for label_values, value in sorted(values):
+            yield f"{self.name}{_labels(self.label_names, label_values)} {_number(value)}"
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum, per combination of label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [count per bucket (the last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bucket] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(label_values, list(counts), total) for label_values, (counts, total) in self._values.items()]
+        for label_values, counts, total in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, label_values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, label_values)} {cumulative}"
+
+
+class Gauge:
+    """Values read when /metrics is scraped: ``collect()`` returns [(label values, value)]"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, label_names=(), collect=None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.collect = collect
+
+    def samples(self):
+        for label_values, value in sorted(self.collect() if self.collect else []):
+            yield f"{self.name}{_labels(self.label_names, label_values)} {_number(value)}"
+
+
+class Registry:
+    """The metrics of this process, rendered for /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        # Re-registering (a second app in the same process) replaces the old one
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'qa_http_request_duration_seconds', 'Time to handle a request (to the first byte of a streamed response)',
+    ('method', 'route')))
+REQUESTS = REGISTRY.register(Counter(
+    'qa_http_requests_total', 'Requests handled, by status code', ('method', 'route', 'status')))
+SLOW_REQUESTS = REGISTRY.register(Counter(
+    'qa_http_slow_requests_total', 'Requests slower than QA_SLOW_REQUEST_SECONDS', ('method', 'route')))
+RESPONSE_ENCODE_SECONDS = REGISTRY.register(Histogram(
+    'qa_response_json_encode_seconds', 'Time spent serializing JSON responses', ('route',)))
+RESPONSE_BYTES = REGISTRY.register(Counter(
+    'qa_response_bytes_total', 'Response body bytes sent (after compression), by Content-Encoding',
+    ('route', 'encoding')))
+STORAGE_SECONDS = REGISTRY.register(Histogram(
+    'qa_storage_operation_seconds',
+    'Time spent reading, parsing, serializing and writing data files', ('operation', 'file')))
+STORAGE_BYTES = REGISTRY.register(Counter(
+    'qa_storage_bytes_total', 'Bytes read from or written to data files', ('operation', 'file')))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'qa_cache_lookups_total', 'In-memory cache lookups: hit, or miss (read from disk again)', ('cache', 'result')))
+
+# What the current request has spent so far, by kind, for the slow-request log
+_request = threading.local()
+
+
+def file_label(filepath):
+    """A data file's name, with per-session files folded into one label"""
+    if filepath.parent.name == 'sessions':
+        return 'sessions/*.json'
+    return filepath.name
+
+def start_request():
+    _request.times = {}
+
+def finish_request():
+    """What the request spent per kind (storage operation, JSON encoding), then forget it"""
+    times = getattr(_request, 'times', None)
+    _request.times = None
+    return times or {}
+
+def _account(kind, seconds):
+    times = getattr(_request, 'times', None)
+    if times is not None:
+        times[kind] = times.get(kind, 0.0) + seconds
+
+def record_storage(operation, filepath, started, size=None):
+    """One storage operation on a data file that began at ``started`` (time.perf_counter())"""
+    seconds = time.perf_counter() - started
+    label = (operation, file_label(filepath))
+    STORAGE_SECONDS.observe(label, seconds)
+    if size is not None:
+        STORAGE_BYTES.inc(label, size)
+    _account(f"storage {operation}", seconds)
+
+def record_cache(cache, hit):
+    CACHE_LOOKUPS.inc((cache, 'hit' if hit else 'miss'))
+
+def record_response_encode(route, started):
+    seconds = time.perf_counter() - started
+    RESPONSE_ENCODE_SECONDS.observe((route,), seconds)
+    _account('json encode', seconds)
+
+def record_request(method, route, status, seconds, size, encoding):
+    REQUEST_SECONDS.observe((method, route), seconds)
+    REQUESTS.inc((method, route, str(status)))
+    if size is not None:
+        RESPONSE_BYTES.inc((route, encoding or 'identity'), size)
+
+def file_size_gauge(name, help_text, files):
+    """A gauge of the current size of each file ``files()`` returns (missing files are left out)"""
+    def collect():
+        sizes = []
+        for filepath in files():
+            try:
+                sizes.append(((file_label(filepath),), filepath.stat().st_size))
+            except OSError:
+                pass
+        return sizes
+    return REGISTRY.register(Gauge(name, help_text, ('file',), collect))
@@ -0,0 +1,299 @@
+"""
+QA Testing Checklist Application
+Session and project data helpers. Every change to the current session is
+described as a small JSON-serializable operation so it can be journaled and
+replayed.
+"""
+
+
+def _remove_entry(entries, entry):
+    """Remove this very object from a list; O(n), but no dict comparisons"""
+    for position, candidate in enumerate(entries):
+        if candidate is entry:
+            del entries[position]
+            return
+
+
+class SessionModel:
+    """A session dict plus id indexes over its headings, items, notes and bugs.
+
+    Lookups by id are dict hits instead of list scans, and the next id for
+    each collection is kept as a counter (seeded from the highest id present
+    when the session is loaded) instead of recomputing ``max()`` on every
+    insert. ``data`` stays the plain JSON-serializable session dict.
+
+    Deletes still scan the list the entry sits in (lists keep their order),
+    comparing by identity so an equal-looking duplicate is never removed
+    instead.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        # Initialize bugs array if it doesn't exist (older sessions)
+        data.setdefault('bugs', [])
+        self.headings = {}
+        self.items = {}
+        self._next_item_ids = {}
+        for heading in data['checklist']:
+            self._index_heading(heading)
+        self.notes = {note['id']: note for note in data['notes']}
+        self.bugs = {bug['id']: bug for bug in data['bugs']}
+        self._next_heading_id = max(self.headings, default=0) + 1
+        self._next_note_id = max(self.notes, default=0) + 1
+        self._next_bug_id = max(self.bugs, default=0) + 1
+
+    def _index_heading(self, heading):
+        self.headings[heading['id']] = heading
+        for item in heading['items']:
+            self.items[(heading['id'], item['id'])] = item
+        self._next_item_ids[heading['id']] = max((item['id'] for item in heading['items']), default=0) + 1
+
+    def heading(self, heading_id):
+        return self.headings.get(heading_id)
+
+    def item(self, heading_id, item_id):
+        return self.items.get((heading_id, item_id))
+
+    def note(self, note_id):
+        return self.notes.get(note_id)
+
+    def bug(self, bug_id):
+        return self.bugs.get(bug_id)
+
+    def next_heading_id(self):
+        return self._next_heading_id
+
+    def next_item_id(self, heading_id):
+        return self._next_item_ids.get(heading_id, 1)
+
+    def next_note_id(self):
+        return self._next_note_id
+
+    def next_bug_id(self):
+        return self._next_bug_id
+
+    def apply(self, operation):
+        """Apply a single operation to the session in place.
+
+        Operations that target a heading, item, note or bug that no longer
+        exists are ignored, matching how the API has always behaved.
+        """
+        op = operation['op']
+        data = self.data
+
+        if op == 'update_info':
+            for key in ('target_website', 'start_date'):
+                if key in operation:
+                    data[key] = operation[key]
+
+        elif op == 'toggle_item':
+            item = self.item(operation['heading_id'], operation['item_id'])
+            if item is not None:
+                item['checked'] = operation['checked']
+
+        elif op == 'add_heading':
+            heading = operation['heading']
+            # Copy so later edits never reach back into the operation record
+            heading = {**heading, "items": [dict(item) for item in heading['items']]}
+            data['checklist'].append(heading)
+            self._index_heading(heading)
+            self._next_heading_id = max(self._next_heading_id, heading['id'] + 1)
+
+        elif op == 'edit_heading':
+            heading = self.heading(operation['heading_id'])
+            if heading is not None:
+                heading['title'] = operation['title']
+
+        elif op == 'delete_heading':
+            heading = self.headings.pop(operation['heading_id'], None)
+            if heading is not None:
+                _remove_entry(data['checklist'], heading)
+                for item in heading['items']:
+                    del self.items[(heading['id'], item['id'])]
+                del self._next_item_ids[heading['id']]
+
+        elif op == 'add_item':
+            heading = self.heading(operation['heading_id'])
+            if heading is not None:
+                item = dict(operation['item'])
+                heading['items'].append(item)
+                self.items[(heading['id'], item['id'])] = item
+                self._next_item_ids[heading['id']] = max(self._next_item_ids[heading['id']], item['id'] + 1)
+
+        elif op == 'edit_item':
+            item = self.item(operation['heading_id'], operation['item_id'])
+            if item is not None:
+                item['text'] = operation['text']
+
+        elif op == 'delete_item':
+            item = self.items.pop((operation['heading_id'], operation['item_id']), None)
+            if item is not None:
+                _remove_entry(self.headings[operation['heading_id']]['items'], item)
+
+        elif op == 'set_heading_checked':
+            heading = self.heading(operation['heading_id'])
+            if heading is not None:
+                for item in heading['items']:
+                    item['checked'] = operation['checked']
+
+        elif op == 'batch':
+            for child in operation['operations']:
+                self.apply(child)
+
+        elif op == 'add_note':
+            note = dict(operation['note'])
+            data['notes'].append(note)
+            self.notes[note['id']] = note
+            self._next_note_id = max(self._next_note_id, note['id'] + 1)
+
+        elif op == 'edit_note':
+            note = self.note(operation['note_id'])
+            if note is not None:
+                note['text'] = operation['text']
+
+        elif op == 'delete_note':
+            note = self.notes.pop(operation['note_id'], None)
+            if note is not None:
+                _remove_entry(data['notes'], note)
+
+        elif op == 'add_bug':
+            bug = dict(operation['bug'])
+            data['bugs'].append(bug)
+            self.bugs[bug['id']] = bug
+            self._next_bug_id = max(self._next_bug_id, bug['id'] + 1)
+
+        elif op == 'edit_bug':
+            bug = self.bug(operation['bug_id'])
+            if bug is not None:
+                bug['title'] = operation['title']
+                bug['description'] = operation['description']
+
+        elif op == 'delete_bug':
+            bug = self.bugs.pop(operation['bug_id'], None)
+            if bug is not None:
+                _remove_entry(data['bugs'], bug)
+
+        else:
+            raise ValueError(f"Unknown operation: {op}")
+
+        return data
+
+
+def _is_id(value):
+    # bool is an int subclass, but true is not heading 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def build_batch_operations(model, requested):
+    """Validate client batch operations and turn them into session operations.
+
+    Returns (operations, results, error). Validation happens against the
+    session plus the effect of earlier operations in the same batch, so the
+    batch is either applied whole or rejected with the first error.
+    """
+    # Items added / deleted by the operations seen so far
+    added = set()
+    deleted = set()
+    next_item_ids = {}
+    operations = []
+    results = []
+
+    def item_exists(heading_id, item_id):
+        key = (heading_id, item_id)
+        return key in added or (key not in deleted and model.item(heading_id, item_id) is not None)
+
+    for index, requested_op in enumerate(requested):
+        if not isinstance(requested_op, dict):
+            return None, None, f"Operation {index}: must be an object"
+        op = requested_op.get('op')
+        heading_id = requested_op.get('heading_id')
+        item_id = requested_op.get('item_id')
+
+        # Ids are dict keys below: a list or object would not even hash
+        if not _is_id(heading_id):
+            return None, None, f"Operation {index}: heading_id must be an integer"
+        if op in ('toggle', 'edit_item', 'delete_item') and not _is_id(item_id):
+            return None, None, f"Operation {index}: item_id must be an integer"
+
+        if model.heading(heading_id) is None:
+            return None, None, f"Operation {index}: heading {heading_id} not found"
+
+        if op in ('toggle', 'edit_item', 'delete_item') and not item_exists(heading_id, item_id):
+            return None, None, f"Operation {index}: item {item_id} not found in heading {heading_id}"
+
+        if op == 'toggle':
+            checked = requested_op.get('checked')
+            if not isinstance(checked, bool):
+                return None, None, f"Operation {index}: checked must be true or false"
+            operations.append({"op": "toggle_item", "heading_id": heading_id, "item_id": item_id, "checked": checked})
+            results.append({})
+
+        elif op in ('add_item', 'edit_item'):
+            text = requested_op.get('text')
+            text = text.strip() if isinstance(text, str) else ''
+            if not text:
+                return None, None, f"Operation {index}: text is required"
+            if op == 'add_item':
+                new_id = next_item_ids.get(heading_id) or model.next_item_id(heading_id)
+                next_item_ids[heading_id] = new_id + 1
+                new_item = {"id": new_id, "text": text, "checked": False}
+                added.add((heading_id, new_id))
+                operations.append({"op": "add_item", "heading_id": heading_id, "item": new_item})
+                results.append({"item": new_item})
+            else:
+                operations.append({"op": "edit_item", "heading_id": heading_id, "item_id": item_id, "text": text})
+                results.append({})
+
+        elif op == 'delete_item':
+            added.discard((heading_id, item_id))
+            deleted.add((heading_id, item_id))
+            operations.append({"op": "delete_item", "heading_id": heading_id, "item_id": item_id})
+            results.append({})
+
+        elif op in ('check_all', 'uncheck_all'):
+            operations.append({"op": "set_heading_checked", "heading_id": heading_id, "checked": op == 'check_all'})
+            results.append({})
+
+        else:
+            return None, None, f"Operation {index}: unknown op '{op}'"
+
+    return operations, results, None
+
+def project_stats(project):
+    """Completion statistics for a project; stored with it when it is completed"""
+    item_count = 0
+    checked_count = 0
+    for heading in project.get('checklist', []):
+        item_count += len(heading['items'])
+        checked_count += sum(1 for item in heading['items'] if item.get('checked'))
+    return {
+        "item_count": item_count,
+        "checked_count": checked_count,
+        "note_count": len(project.get('notes', [])),
+        "bug_count": len(project.get('bugs', [])),
+        "completion_percentage": round(checked_count / item_count * 100, 1) if item_count else 0
+    }
+
+def project_summary(project):
+    """Listing view of a completed project: metadata plus item/bug/note counts"""
+    return {
+        "id": project['id'],
+        "target_website": project.get('target_website', ''),
+        "start_date": project.get('start_date', ''),
+        "end_date": project.get('end_date', ''),
+        "completed_at": project.get('completed_at', ''),
+        # Projects completed before stats were stored get them computed here
+        **(project.get('stats') or project_stats(project))
+    }
+
+def heading_summary(heading):
+    """A checklist heading without its items: id, title and how many are checked"""
+    return {
+        "id": heading['id'],
+        "title": heading.get('title', ''),
+        "item_count": len(heading['items']),
+        "checked_count": sum(1 for item in heading['items'] if item.get('checked'))
+    }
+
+def find_heading(project, heading_id):
+    """The heading of a project's checklist with this id, or None"""
+    return next((heading for heading in project.get('checklist', []) if heading['id'] == heading_id), None)
@@ -0,0 +1,483 @@
+"""
+QA Testing Checklist Application
+Full-text search over completed history: an inverted index of target
+websites, checklist items, notes and bugs, kept in memory, updated as
+projects are completed or deleted and persisted next to the data
+"""
+
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+import codec
+import metrics
+from logs import logger
+from storage import FileLock, compress_snapshot, read_snapshot, save_text
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# How much one occurrence of a word counts, by where it occurs
+FIELD_WEIGHTS = {
+    'target_website': 5,
+    'bug_title': 4,
+    'note': 2,
+    'bug_description': 2,
+    'item': 1,
+}
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A query word also matches longer words starting with it ("idor" -> "idors"),
+# at a discount and up to this many of them
+PREFIX_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+
+SNIPPET_BEFORE = 40
+SNIPPET_AFTER = 120
+
+INDEX_FORMAT = 1
+
+
+def tokenize(text):
+    """Lowercased words of a text; single characters are left out"""
+    if not isinstance(text, str):
+        return []
+    return [token for token in (match.casefold() for match in TOKEN_PATTERN.findall(text)) if len(token) > 1]
+
+def index_record(project):
+    """What the index keeps of a completed project: its weighted words, and each bug's.
+
+    The project itself is one document (target website, checklist items and
+    notes); every bug is a document of its own, so a search can point at the
+    bug rather than the whole project.
+    """
+    terms = Counter()
+    for token in tokenize(project.get('target_website', '')):
+        terms[token] += FIELD_WEIGHTS['target_website']
+    for heading in project.get('checklist') or []:
+        for item in heading.get('items') or []:
+            for token in tokenize(item.get('text', '')):
+                terms[token] += FIELD_WEIGHTS['item']
+    for note in project.get('notes') or []:
+        for token in tokenize(note.get('text', '')):
+            terms[token] += FIELD_WEIGHTS['note']
+
+    bugs = []
+    for bug in project.get('bugs') or []:
+        bug_terms = Counter()
+        for token in tokenize(bug.get('title', '')):
+            bug_terms[token] += FIELD_WEIGHTS['bug_title']
+        for token in tokenize(bug.get('description', '')):
+            bug_terms[token] += FIELD_WEIGHTS['bug_description']
+        if bug_terms:
+            bugs.append({"id": bug.get('id'), "title": bug.get('title', ''), "terms": dict(bug_terms)})
+
+    return {
+        "id": project['id'],
+        "target_website": project.get('target_website', ''),
+        "completed_at": project.get('completed_at', ''),
+        "terms": dict(terms),
+        "bugs": bugs
+    }
+
+def document_project(document):
+    """Project id of an index document (a project id, or a (project id, bug id) pair)"""
+    return document[0] if isinstance(document, tuple) else document
+
+def make_snippet(text, pattern):
+    """(snippet, [[start, end], ...]) around the first match of pattern in text; None if no match"""
+    match = pattern.search(text)
+    if match is None:
+        return None
+    start = max(match.start() - SNIPPET_BEFORE, 0)
+    end = min(match.start() + SNIPPET_AFTER, len(text))
+    # Don't cut words in half
+    if start > 0:
+        space = text.find(' ', start, match.start())
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(' ', match.end(), end)
+        end = space if space != -1 else end
+
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    highlights = [[m.start() - start + len(prefix), m.end() - start + len(prefix)]
+                  for m in pattern.finditer(text, start, end)]
+    return prefix + text[start:end] + suffix, highlights
+
+
+class SearchIndex:
+    """Inverted index over completed projects, persisted as a snapshot plus a journal.
+
+    ``search_index.json`` holds every project's indexed words; each project
+    completed or deleted since is one line of ``search_index.journal``, which
+    is folded into the snapshot once it grows past half the snapshot (or
+    ``compact_bytes``). The in-memory index maps each word to the documents
+    containing it, so a search only touches the documents that match. Worker
+    processes sharing the data directory pick up each other's journal lines
+    before every search or update.
+    """
+
+    def __init__(self, index_file, compact_bytes=256 * 1024):
+        self.index_file = index_file
+        self.journal_path = index_file.with_suffix('.journal')
+        self.compact_bytes = compact_bytes
+        self._file_lock = FileLock(index_file)
+        # Always taken after the file lock, never before
+        self._lock = threading.RLock()
+        # project id -> index_record()
+        self._projects = {}
+        # word -> {document: weight}; a document is a project id or (project id, bug id)
+        self._postings = {}
+        # document -> sum of its weights, for length normalization
+        self._lengths = {}
+        self._total_length = 0
+        # Sorted words, for prefix matching; rebuilt after words come or go
+        self._vocabulary = None
+        self._snapshot_signature = None
+        self._journal_offset = 0
+        self._compacting = False
+
+    def _add_document(self, document, terms):
+        # Nothing to find it by (e.g. a one-letter target and an empty checklist)
+        if not terms:
+            return
+        for token, weight in terms.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary = None
+            postings[document] = weight
+        length = sum(terms.values())
+        self._lengths[document] = length
+        self._total_length += length
+
+    def _remove_document(self, document, terms):
+        for token in terms:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(document, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+        self._total_length -= self._lengths.pop(document, 0)
+
+    def _apply_add(self, record):
+        if record['id'] in self._projects:
+            self._apply_remove(record['id'])
+        self._projects[record['id']] = record
+        self._add_document(record['id'], record['terms'])
+        for bug in record['bugs']:
+            self._add_document((record['id'], bug['id']), bug['terms'])
+
+    def _apply_remove(self, project_id):
+        record = self._projects.pop(project_id, None)
+        if record is None:
+            return
+        self._remove_document(project_id, record['terms'])
+        for bug in record['bugs']:
+            self._remove_document((project_id, bug['id']), bug['terms'])
+
+    def _clear(self):
+        self._projects = {}
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._vocabulary = None
+
+    def _file_signature(self):
+        try:
+            stat = self.index_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _journal_size(self):
+        try:
+            return self.journal_path.stat().st_size
+        except OSError:
+            return 0
+
+    def _load_snapshot(self):
+        self._clear()
+        self._journal_offset = 0
+        self._snapshot_signature = self._file_signature()
+        if self._snapshot_signature is None:
+            return False
+        try:
+            snapshot = codec.decode(read_snapshot(self.index_file))
+            if snapshot.get('format') != INDEX_FORMAT:
+                logger.warning("Ignoring %s: unknown format, it will be rebuilt", self.index_file)
+                return False
+            for record in snapshot.get('projects', []):
+                self._apply_add(record)
+            return True
+        except Exception as e:
+            logger.exception("Error loading search index %s: %s", self.index_file, e)
+            self._clear()
+            return False
+
+    def _replay_journal(self):
+        """Apply journal lines past what this process has already read"""
+        if self._journal_size() <= self._journal_offset:
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    entry = codec.decode(line)
+                except ValueError:
+                    # A crash mid-append; the next writer cuts it off
+                    break
+                if 'add' in entry:
+                    self._apply_add(entry['add'])
+                elif 'remove' in entry:
+                    self._apply_remove(entry['remove'])
+                self._journal_offset += len(line)
+
+    def _refresh(self):
+        """Catch up with what other processes wrote (caller holds the file lock)"""
+        current = self._file_signature() == self._snapshot_signature
+        metrics.record_cache('search_index', current and self._journal_size() == self._journal_offset)
+        if not current:
+            self._load_snapshot()
+        self._replay_journal()
+
+    def load(self):
+        """Read the snapshot and journal; returns False if there was no usable snapshot"""
+        with self._file_lock.shared(), self._lock:
+            loaded = self._load_snapshot()
+            self._replay_journal()
+            return loaded
+
+    def _append(self, entries):
+        """Write journal lines and apply them (caller holds the file lock exclusively)"""
+        if self._journal_size() != self._journal_offset:
+            # Drop a torn last line left by a crash
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(self._journal_offset)
+        lines = b''.join(codec.encode(entry) + b'\n' for entry in entries)
+        with open(self.journal_path, 'ab') as f:
+            f.write(lines)
+            f.flush()
+        self._journal_offset += len(lines)
+
+        for entry in entries:
+            if 'add' in entry:
+                self._apply_add(entry['add'])
+            else:
+                self._apply_remove(entry['remove'])
+
+        snapshot_size = (self._snapshot_signature or (0, 0))[1]
+        if self._journal_offset >= max(self.compact_bytes, snapshot_size // 2) and not self._compacting:
+            # Fold the journal in the background so this request doesn't pay for it
+            self._compacting = True
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def _update(self, entries):
+        try:
+            with self._file_lock.exclusive(), self._lock:
+                self._refresh()
+                self._append(entries)
+            return True
+        except Exception as e:
+            # Not fatal: sync() reconciles the index with the history on the next start
+            logger.exception("Error updating search index %s: %s", self.journal_path, e)
+            return False
+
+    def add(self, project):
+        """Index a newly completed project (replacing any project with the same id)"""
+        return self._update([{"add": index_record(project)}])
+
+    def add_many(self, projects):
+        """Index several projects with one journal write (bulk import)"""
+        return self._update([{"add": index_record(project)} for project in projects])
+
+    def remove(self, project_id):
+        """Drop a deleted project and its bugs from the index"""
+        return self._update([{"remove": project_id}])
+
+    def compact(self):
+        """Write a fresh snapshot and empty the journal"""
+        with self._file_lock.exclusive(), self._lock:
+            self._compacting = False
+            self._refresh()
+            return self._write_snapshot()
+
+    def _write_snapshot(self):
+        lines = [codec.encode(record) for record in self._projects.values()]
+        text = f'{{"format":{INDEX_FORMAT},"projects":[\n'.encode('utf-8') + b',\n'.join(lines) + b'\n]}'
+        if not save_text(self.index_file, compress_snapshot(text), atomic=True):
+            return False
+        # Snapshot first: if we crash before truncating, replaying the journal
+        # over it again is harmless (adds replace, removes are idempotent)
+        with open(self.journal_path, 'wb'):
+            pass
+        self._snapshot_signature = self._file_signature()
+        self._journal_offset = 0
+        return True
+
+    def sync(self, backend):
+        """Bring the index in line with the history store; returns the number of projects (re)indexed or dropped.
+
+        Builds the index from scratch the first time, and repairs it after a
+        crash or after the data files were changed behind the app's back.
+        Projects are matched by id and completion time.
+        """
+        with self._file_lock.exclusive(), self._lock:
+            self._refresh()
+            page = backend.list_history(1, 0)
+            if page is None:
+                return 0
+            total = page[0]
+            summaries = backend.list_history(total, 0)[1] if total else []
+            wanted = {summary['id']: summary.get('completed_at', '') for summary in summaries}
+
+            stale = [project_id for project_id, record in self._projects.items()
+                     if wanted.get(project_id, record['completed_at']) != record['completed_at']
+                     or project_id not in wanted]
+            missing = [project_id for project_id, completed_at in wanted.items()
+                       if project_id not in self._projects or project_id in stale]
+            if not stale and not missing:
+                return 0
+
+            for project_id in stale:
+                self._apply_remove(project_id)
+            if len(missing) > 50:
+                # One pass over the whole history beats thousands of single reads
+                missing = set(missing)
+                for project in backend.load_history() or []:
+                    if project['id'] in missing:
+                        self._apply_add(index_record(project))
+            else:
+                for project_id in missing:
+                    project = backend.get_history_entry(project_id)
+                    if project is not None:
+                        self._apply_add(index_record(project))
+            self._write_snapshot()
+            return len(set(stale) | set(missing))
+
+    def _expand(self, term):
+        """(word, factor) pairs a query word matches: itself, and words it is a prefix of"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        matches = []
+        if term in self._postings:
+            matches.append((term, 1.0))
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and len(matches) <= MAX_PREFIX_EXPANSIONS:
+            word = self._vocabulary[position]
+            if not word.startswith(term):
+                break
+            if word != term:
+                matches.append((word, PREFIX_WEIGHT))
+            position += 1
+        return matches
+
+    def _rank(self, terms, count):
+        """(number of documents containing every query word, [(score, document)] for the best ``count``)"""
+        document_count = len(self._lengths)
+        if not document_count:
+            return 0, []
+        lengths = self._lengths
+        base = BM25_K1 * (1 - BM25_B)
+        # No length normalization if every document somehow weighs nothing
+        per_length = BM25_K1 * BM25_B * document_count / self._total_length if self._total_length > 0 else 0.0
+
+        # Rarest word first, so the later ones only score documents still in the running
+        expansions = sorted((self._expand(term) for term in terms),
+                            key=lambda words: sum(len(self._postings[word]) for word, _ in words))
+        scores = None
+        for words in expansions:
+            term_scores = {}
+            for word, factor in words:
+                postings = self._postings[word]
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                boost = factor * idf * (BM25_K1 + 1)
+                if scores is not None and len(scores) < len(postings):
+                    matches = ((document, postings[document]) for document in scores if document in postings)
+                else:
+                    matches = postings.items()
+                for document, weight in matches:
+                    score = boost * weight / (weight + base + per_length * lengths[document])
+                    term_scores[document] = term_scores.get(document, 0) + score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {document: score + term_scores[document]
+                          for document, score in scores.items() if document in term_scores}
+            if not scores:
+                return 0, []
+
+        # Newer projects first among equal scores
+        best = heapq.nlargest(count, scores.items(), key=lambda hit: (hit[1], document_project(hit[0])))
+        return len(scores), [(score, document) for document, score in best]
+
+    def search(self, query, limit, offset, load_project):
+        """Return (total, hits) for one page of results, best first.
+
+        ``load_project(id)`` fetches a completed project; only the projects on
+        the requested page are read, to cut their snippets.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._file_lock.shared(), self._lock:
+            self._refresh()
+            total, ranked = self._rank(terms, offset + limit)
+            page = ranked[offset:]
+            records = {document_project(document): self._projects[document_project(document)] for _, document in page}
+
+        # Word starts, so "idor" highlights "IDOR" and "IDORs" but not "vidor"
+        pattern = re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+        projects = {project_id: load_project(project_id) for project_id in records}
+
+        hits = []
+        for score, document in page:
+            if isinstance(document, tuple):
+                project_id, bug_id = document
+            else:
+                project_id, bug_id = document, None
+            record = records[project_id]
+            hit = {
+                "type": "bug" if isinstance(document, tuple) else "project",
+                "project_id": project_id,
+                "target_website": record['target_website'],
+                "completed_at": record['completed_at'],
+                "score": round(score, 3)
+            }
+            if bug_id is not None:
+                hit['bug_id'] = bug_id
+                hit['title'] = next((bug['title'] for bug in record['bugs'] if bug['id'] == bug_id), '')
+            hit.update(self._snippet(projects[project_id], bug_id, pattern))
+            hits.append(hit)
+        return total, hits
+
+    def _snippet(self, project, bug_id, pattern):
+        """The field a hit matched in, with a snippet of its text"""
+        if project is None:
+            return {"field": None, "snippet": "", "highlights": []}
+
+        if bug_id is not None:
+            bug = next((bug for bug in project.get('bugs') or [] if bug.get('id') == bug_id), {})
+            fields = [('bug_title', bug.get('title', ''), None), ('bug_description', bug.get('description', ''), None)]
+        else:
+            fields = [('target_website', project.get('target_website', ''), None)]
+            fields.extend(('note', note.get('text', ''), None) for note in project.get('notes') or [])
+            fields.extend(('item', item.get('text', ''), heading.get('title'))
+                          for heading in project.get('checklist') or [] for item in heading.get('items') or [])
+
+        for field, text, heading in fields:
+            found = make_snippet(text, pattern) if isinstance(text, str) else None
+            if found is not None:
+                snippet = {"field": field, "snippet": found[0], "highlights": found[1]}
+                if heading is not None:
+                    snippet['heading'] = heading
+                return snippet
+        return {"field": None, "snippet": "", "highlights": []}
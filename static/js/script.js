@@ -12,12 +12,44 @@ let editingItemHeadingId = null;
 let editingNoteId = null;
 let editingBugId = null;
 
+// Checkbox changes waiting to be sent as one batch once the clicks settle
+const TOGGLE_DEBOUNCE_MS = 300;
+const pendingToggles = new Map();
+let toggleTimer = null;
+
+// Delta sync: the server epoch our session version belongs to, and how often
+// to ask the server for changes made by other testers
+const SESSION_POLL_MS = 5000;
+let sessionEpoch = null;
+let sessionETag = null;
+let syncQueue = Promise.resolve();
+
+// The session this page works on: ?session=<id>, else the last one used here
+const currentSessionId = new URLSearchParams(location.search).get('session')
+    || localStorage.getItem('qaSession') || 'default';
+
+// URL of one of the current session's API routes
+function sessionApi(path = '') {
+    return `/api/sessions/${encodeURIComponent(currentSessionId)}${path}`;
+}
+
+// Live updates pushed by the server; polling only runs while this is down
+let sessionStream = null;
+let streamConnected = false;
+let completingLocally = false;
+
 // Initialize app on page load
 document.addEventListener('DOMContentLoaded', () => {
+    // The render benchmark page (/bench) loads this file for its renderers only
+    if (window.QA_BENCHMARK) return;
     console.log('QA Testing Checklist App initialized');
     initTheme();
     loadSession();
+    loadSessions();
+    loadTemplates();
     initializeEventListeners();
+    connectSessionStream();
+    setInterval(pollSession, SESSION_POLL_MS);
 });
 
 // Theme Management
@@ -78,6 +110,12 @@ function initializeEventListeners() {
     // Action buttons
     document.getElementById('complete-btn').addEventListener('click', completeSession);
     document.getElementById('reset-btn').addEventListener('click', resetSession);
+    document.getElementById('session-select').addEventListener('change', (e) => switchSession(e.target.value));
+    document.getElementById('new-session-btn').addEventListener('click', createSession);
+    document.getElementById('delete-session-btn').addEventListener('click', deleteSession);
+    document.getElementById('template-select').addEventListener('change', (e) => {
+        localStorage.setItem('checklistTemplate', e.target.value);
+    });
     
     // Close modals when clicking outside
     window.addEventListener('click', (e) => {
@@ -94,30 +132,327 @@ function initializeEventListeners() {
     document.getElementById('item-input').addEventListener('keypress', (e) => {
         if (e.key === 'Enter') saveItem();
     });
+    
+    // Don't lose debounced checkbox changes when the page is closed
+    window.addEventListener('beforeunload', () => {
+        if (pendingToggles.size === 0) return;
+        const body = JSON.stringify({ operations: Array.from(pendingToggles.values()) });
+        navigator.sendBeacon(sessionApi('/checklist/batch'), new Blob([body], { type: 'application/json' }));
+        pendingToggles.clear();
+    });
+}
+
+// In-progress sessions: several audits can run side by side
+async function loadSessions() {
+    try {
+        const response = await fetch('/api/sessions', { cache: 'no-store' });
+        if (!response.ok) throw new Error('Failed to load sessions');
+        
+        const data = await response.json();
+        const select = document.getElementById('session-select');
+        select.innerHTML = data.sessions.map(session => {
+            const label = session.target_website ? `${session.name} - ${session.target_website}` : session.name;
+            return `<option value="${escapeHtml(session.id)}">${escapeHtml(label)}</option>`;
+        }).join('');
+        select.value = currentSessionId;
+        document.getElementById('delete-session-btn').hidden = currentSessionId === data.default;
+    } catch (error) {
+        console.error('Error loading sessions:', error);
+    }
+}
+
+function switchSession(sessionId) {
+    localStorage.setItem('qaSession', sessionId);
+    location.href = sessionId === 'default' ? '/' : `/?session=${encodeURIComponent(sessionId)}`;
+}
+
+async function createSession() {
+    const name = prompt('Name of the new session:');
+    if (!name || !name.trim()) return;
+    
+    try {
+        const response = await fetch('/api/sessions', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ name: name.trim(), template: selectedTemplate() })
+        });
+        
+        if (!response.ok) throw new Error('Failed to create session');
+        
+        const data = await response.json();
+        await flushPendingToggles();
+        switchSession(data.session.id);
+    } catch (error) {
+        console.error('Error creating session:', error);
+        showError('Failed to create session. Please try again.');
+    }
+}
+
+async function deleteSession() {
+    if (!confirm('Delete this session? Its checklist, notes and bugs are lost unless you complete it first.')) {
+        return;
+    }
+    
+    try {
+        clearTimeout(toggleTimer);
+        pendingToggles.clear();
+        
+        const response = await fetch(sessionApi(), { method: 'DELETE' });
+        if (!response.ok) throw new Error('Failed to delete session');
+        
+        switchSession('default');
+    } catch (error) {
+        console.error('Error deleting session:', error);
+        showError('Failed to delete session. Please try again.');
+    }
+}
+
+// Checklist templates the next session can start from
+async function loadTemplates() {
+    try {
+        const response = await fetch('/api/templates');
+        if (!response.ok) throw new Error('Failed to load templates');
+        
+        const data = await response.json();
+        const select = document.getElementById('template-select');
+        const saved = localStorage.getItem('checklistTemplate');
+        
+        select.innerHTML = data.templates.map(template => `
+            <option value="${escapeHtml(template.name)}" title="${escapeHtml(template.description)}">
+                ${escapeHtml(template.title)} (${template.item_count} items)
+            </option>
+        `).join('');
+        select.value = data.templates.some(template => template.name === saved) ? saved : data.default;
+        select.hidden = data.templates.length < 2;
+    } catch (error) {
+        // Without the list, reset and complete simply use the default checklist
+        console.error('Error loading templates:', error);
+    }
+}
+
+function selectedTemplate() {
+    return document.getElementById('template-select').value || undefined;
 }
 
 // Load session data from server
 async function loadSession() {
     try {
-        const response = await fetch('/api/session');
+        // Send queued checkbox changes first so the reload includes them
+        await flushPendingToggles();
+        
+        // Revalidate our copy: a 304 means nothing changed since we loaded it
+        const headers = currentSession && sessionETag ? { 'If-None-Match': sessionETag } : {};
+        const response = await fetch(sessionApi(), { headers, cache: 'no-store' });
+        if (response.status === 304) return;
+        if (response.status === 404 && currentSessionId !== 'default') {
+            // Deleted (possibly by another tester): go back to the default session
+            localStorage.removeItem('qaSession');
+            location.href = '/';
+            return;
+        }
         if (!response.ok) throw new Error('Failed to load session');
         
         currentSession = await response.json();
+        sessionETag = response.headers.get('ETag');
+        // The ETag is "<epoch>-<version>"
+        sessionEpoch = sessionETag ? sessionETag.replace(/"/g, '').split('-')[0] : null;
         console.log('Session loaded:', currentSession);
         
-        // Update UI
-        document.getElementById('target-website').value = currentSession.target_website || '';
-        document.getElementById('start-date').value = currentSession.start_date || '';
-        
-        renderChecklist();
-        renderNotes();
-        renderBugs();
+        renderSession();
     } catch (error) {
         console.error('Error loading session:', error);
         showError('Failed to load session. Please refresh the page.');
     }
 }
 
+// Bring the local session up to date by applying only the server's new operations
+function syncSession() {
+    // Chained so overlapping syncs never apply the same operations twice
+    syncQueue = syncQueue.then(fetchSessionChanges);
+    return syncQueue;
+}
+
+async function fetchSessionChanges() {
+    if (!currentSession || !sessionEpoch) return loadSession();
+    
+    try {
+        const response = await fetch(sessionApi(`/changes?since=${currentSession.version}&epoch=${sessionEpoch}`), { cache: 'no-store' });
+        if (!response.ok) throw new Error('Failed to sync session');
+        
+        const data = await response.json();
+        sessionEpoch = data.epoch;
+        sessionETag = `"${data.epoch}-${data.version}"`;
+        
+        if (data.full) {
+            currentSession = data.session;
+            renderSession();
+            return;
+        }
+        // The stream may already have delivered some of these
+        const operations = data.operations.filter(operation => operation.version > currentSession.version);
+        if (operations.length === 0) return;
+        
+        operations.forEach(operation => applyOperation(currentSession, operation));
+        currentSession.version = data.version;
+        renderSession(operations.some(operation => operation.op === 'update_info'));
+    } catch (error) {
+        console.error('Error syncing session:', error);
+    }
+}
+
+function pollSession() {
+    // Skip while the stream is delivering changes, the tab is hidden or
+    // checkbox clicks are still queued locally
+    if (streamConnected || document.hidden || pendingToggles.size > 0 || !currentSession) return;
+    syncSession();
+}
+
+// Subscribe to /api/session/stream; the browser reconnects on its own and
+// resumes from the last event id, so only a refused stream ends up polling
+function connectSessionStream() {
+    if (!window.EventSource) return;
+    
+    sessionStream = new EventSource(sessionApi('/stream'));
+    sessionStream.addEventListener('open', () => { streamConnected = true; });
+    sessionStream.addEventListener('error', () => {
+        streamConnected = false;
+        if (sessionStream.readyState === EventSource.CLOSED) {
+            console.warn('Live updates unavailable, falling back to polling');
+            sessionStream = null;
+        }
+    });
+    sessionStream.addEventListener('hello', (e) => {
+        // A different epoch means the server restarted since we loaded
+        const data = JSON.parse(e.data);
+        if (sessionEpoch && data.epoch !== sessionEpoch) syncSession();
+    });
+    sessionStream.addEventListener('operation', (e) => applyStreamOperation(JSON.parse(e.data)));
+    sessionStream.addEventListener('replace', () => syncSession());
+    sessionStream.addEventListener('resync', () => syncSession());
+    sessionStream.addEventListener('completed', (e) => {
+        const data = JSON.parse(e.data);
+        if (!completingLocally) showSuccess(`"${data.target_website}" was completed by another tester.`);
+    });
+}
+
+function applyStreamOperation(operation) {
+    if (!currentSession || operation.version <= currentSession.version) return;
+    
+    // Missed something in between (e.g. events sent before our stream opened)
+    if (operation.version !== currentSession.version + 1) {
+        syncSession();
+        return;
+    }
+    
+    applyOperation(currentSession, operation);
+    currentSession.version = operation.version;
+    sessionETag = `"${sessionEpoch}-${operation.version}"`;
+    renderSession(operation.op === 'update_info');
+}
+
+// Mirror of the server's SessionModel.apply. Every operation is idempotent,
+// because our own changes come back from the server as well.
+function applyOperation(session, operation) {
+    const findHeading = id => session.checklist.find(h => h.id === id);
+    const findItem = (headingId, itemId) => {
+        const heading = findHeading(headingId);
+        return heading ? heading.items.find(i => i.id === itemId) : undefined;
+    };
+    session.bugs = session.bugs || [];
+    
+    switch (operation.op) {
+        case 'update_info':
+            if ('target_website' in operation) session.target_website = operation.target_website;
+            if ('start_date' in operation) session.start_date = operation.start_date;
+            break;
+        case 'toggle_item': {
+            const item = findItem(operation.heading_id, operation.item_id);
+            if (item) item.checked = operation.checked;
+            break;
+        }
+        case 'add_heading':
+            if (!findHeading(operation.heading.id)) {
+                session.checklist.push({ ...operation.heading, items: operation.heading.items.map(item => ({ ...item })) });
+            }
+            break;
+        case 'edit_heading': {
+            const heading = findHeading(operation.heading_id);
+            if (heading) heading.title = operation.title;
+            break;
+        }
+        case 'delete_heading':
+            session.checklist = session.checklist.filter(h => h.id !== operation.heading_id);
+            break;
+        case 'add_item': {
+            const heading = findHeading(operation.heading_id);
+            if (heading && !heading.items.some(i => i.id === operation.item.id)) {
+                heading.items.push({ ...operation.item });
+            }
+            break;
+        }
+        case 'edit_item': {
+            const item = findItem(operation.heading_id, operation.item_id);
+            if (item) item.text = operation.text;
+            break;
+        }
+        case 'delete_item': {
+            const heading = findHeading(operation.heading_id);
+            if (heading) heading.items = heading.items.filter(i => i.id !== operation.item_id);
+            break;
+        }
+        case 'set_heading_checked': {
+            const heading = findHeading(operation.heading_id);
+            if (heading) heading.items.forEach(item => { item.checked = operation.checked; });
+            break;
+        }
+        case 'batch':
+            operation.operations.forEach(child => applyOperation(session, child));
+            break;
+        case 'add_note':
+            if (!session.notes.some(n => n.id === operation.note.id)) session.notes.push({ ...operation.note });
+            break;
+        case 'edit_note': {
+            const note = session.notes.find(n => n.id === operation.note_id);
+            if (note) note.text = operation.text;
+            break;
+        }
+        case 'delete_note':
+            session.notes = session.notes.filter(n => n.id !== operation.note_id);
+            break;
+        case 'add_bug':
+            if (!session.bugs.some(b => b.id === operation.bug.id)) session.bugs.push({ ...operation.bug });
+            break;
+        case 'edit_bug': {
+            const bug = session.bugs.find(b => b.id === operation.bug_id);
+            if (bug) {
+                bug.title = operation.title;
+                bug.description = operation.description;
+            }
+            break;
+        }
+        case 'delete_bug':
+            session.bugs = session.bugs.filter(b => b.id !== operation.bug_id);
+            break;
+        default:
+            console.warn('Unknown session operation:', operation.op);
+    }
+}
+
+// Render the whole session; the info fields are left alone unless asked
+// (or while being edited) so a background sync never overwrites typing
+function renderSession(updateInfo = true) {
+    if (updateInfo) {
+        const website = document.getElementById('target-website');
+        const startDate = document.getElementById('start-date');
+        if (document.activeElement !== website) website.value = currentSession.target_website || '';
+        if (document.activeElement !== startDate) startDate.value = currentSession.start_date || '';
+    }
+    
+    renderChecklist();
+    renderNotes();
+    renderBugs();
+}
+
 // Save session info (target website and start date)
 async function saveSessionInfo() {
     const targetWebsite = document.getElementById('target-website').value.trim();
@@ -134,7 +469,7 @@ async function saveSessionInfo() {
     }
     
     try {
-        const response = await fetch('/api/session/info', {
+        const response = await fetch(sessionApi('/info'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ target_website: targetWebsite, start_date: startDate })
@@ -144,6 +479,8 @@ async function saveSessionInfo() {
         
         const data = await response.json();
         currentSession = data.data;
+        // The session picker shows the target website
+        loadSessions();
         
         showSuccess('Session info saved!');
     } catch (error) {
@@ -152,45 +489,222 @@ async function saveSessionInfo() {
     }
 }
 
+// Rendering is keyed and incremental: each container remembers the node it
+// built for every heading/item/note/bug plus a signature of what it showed,
+// so a render only touches nodes whose data actually changed.
+const VIRTUAL_ROW_HEIGHT = 48;  // .checklist-item.virtual-row height + gap
+const VIRTUAL_OVERSCAN = 10;
+// Headings with more items than this only render the rows in view
+const renderOptions = { virtualThreshold: 200 };
+
+function htmlToElement(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html.trim();
+    return template.content.firstElementChild;
+}
+
+// Make container's children match entries, in order, reusing keyed nodes.
+// patchNode may update a node in place and return true; otherwise the
+// node is rebuilt with createNode.
+function reconcileList(container, entries, keyOf, signatureOf, createNode, patchNode) {
+    if (!container._keyed) {
+        // First keyed render (or coming back from an empty state)
+        container.innerHTML = '';
+        container._keyed = new Map();
+    }
+    const cache = container._keyed;
+    const seen = new Set();
+    let cursor = container.firstChild;
+    
+    entries.forEach((entry, index) => {
+        const key = keyOf(entry);
+        const signature = signatureOf(entry, index);
+        let cached = cache.get(key);
+        seen.add(key);
+        
+        if (!cached) {
+            cached = { node: createNode(entry, index), signature };
+            cache.set(key, cached);
+        } else if (cached.signature !== signature) {
+            if (!patchNode || !patchNode(cached.node, entry, index)) {
+                const node = createNode(entry, index);
+                if (cursor === cached.node) cursor = node;
+                cached.node.replaceWith(node);
+                cached.node = node;
+            }
+            cached.signature = signature;
+        }
+        
+        if (cached.node === cursor) {
+            cursor = cursor.nextSibling;
+        } else {
+            container.insertBefore(cached.node, cursor);
+        }
+    });
+    
+    cache.forEach((cached, key) => {
+        if (!seen.has(key)) {
+            cached.node.remove();
+            cache.delete(key);
+        }
+    });
+}
+
+function renderEmptyState(container, html) {
+    container._keyed = null;
+    container.innerHTML = html;
+}
+
 // Render checklist
 function renderChecklist() {
     const container = document.getElementById('checklist-container');
     
     if (!currentSession.checklist || currentSession.checklist.length === 0) {
-        container.innerHTML = '<div class="empty-state"><p>No checklist items yet. Add a heading to get started.</p></div>';
+        renderEmptyState(container, '<div class="empty-state"><p>No checklist items yet. Add a heading to get started.</p></div>');
         return;
     }
     
-    container.innerHTML = currentSession.checklist.map((heading, index) => `
+    reconcileList(
+        container,
+        currentSession.checklist,
+        heading => heading.id,
+        (heading, index) => `${index}|${heading.title}`,
+        createHeadingNode,
+        (node, heading, index) => {
+            node.querySelector('.heading-header').innerHTML = headingHeaderHtml(heading, index);
+            return true;
+        }
+    );
+    
+    // Items are reconciled per heading; unchanged ones cost a signature compare
+    currentSession.checklist.forEach(heading => {
+        renderHeadingItems(container._keyed.get(heading.id).node.querySelector('.heading-items'), heading);
+    });
+}
+
+function headingHeaderHtml(heading, index) {
+    return `
+        <div class="heading-title">
+            <span class="heading-number">${index + 1}.</span> ${escapeHtml(heading.title)}
+        </div>
+        <div class="heading-actions">
+            <button class="btn-icon" onclick="toggleHeadingItems(${heading.id})" title="Check/Uncheck All">☑️</button>
+            <button class="btn-icon" onclick="openItemModal(${heading.id})" title="Add Sub-item">➕</button>
+            <button class="btn-icon" onclick="openHeadingModal(${heading.id})" title="Edit Heading">✏️</button>
+            <button class="btn-icon btn-delete" onclick="deleteHeading(${heading.id})" title="Delete Heading">🗑️</button>
+        </div>
+    `;
+}
+
+function createHeadingNode(heading, index) {
+    return htmlToElement(`
         <div class="checklist-heading" data-heading-id="${heading.id}">
-            <div class="heading-header">
-                <div class="heading-title">
-                    <span class="heading-number">${index + 1}.</span> ${escapeHtml(heading.title)}
-                </div>
-                <div class="heading-actions">
-                    <button class="btn-icon" onclick="openItemModal(${heading.id})" title="Add Sub-item">➕</button>
-                    <button class="btn-icon" onclick="openHeadingModal(${heading.id})" title="Edit Heading">✏️</button>
-                    <button class="btn-icon btn-delete" onclick="deleteHeading(${heading.id})" title="Delete Heading">🗑️</button>
-                </div>
-            </div>
-            <div class="heading-items">
-                ${heading.items.length > 0 ? heading.items.map(item => `
-                    <div class="checklist-item">
-                        <input 
-                            type="checkbox" 
-                            ${item.checked ? 'checked' : ''}
-                            onchange="toggleItem(${heading.id}, ${item.id}, this.checked)"
-                        >
-                        <span class="item-text ${item.checked ? 'checked' : ''}">${escapeHtml(item.text)}</span>
-                        <div class="item-actions">
-                            <button class="btn-icon" onclick="openItemModal(${heading.id}, ${item.id})" title="Edit">✏️</button>
-                            <button class="btn-icon btn-delete" onclick="deleteItem(${heading.id}, ${item.id})" title="Delete">🗑️</button>
-                        </div>
-                    </div>
-                `).join('') : '<p style="color: var(--text-secondary); padding: 10px;">No items yet. Click ➕ to add sub-items.</p>'}
+            <div class="heading-header">${headingHeaderHtml(heading, index)}</div>
+            <div class="heading-items"></div>
+        </div>
+    `);
+}
+
+function createItemNode(heading, item) {
+    return htmlToElement(`
+        <div class="checklist-item">
+            <input 
+                type="checkbox" 
+                ${item.checked ? 'checked' : ''}
+                onchange="toggleItem(${heading.id}, ${item.id}, this.checked)"
+            >
+            <span class="item-text ${item.checked ? 'checked' : ''}">${escapeHtml(item.text)}</span>
+            <div class="item-actions">
+                <button class="btn-icon" onclick="openItemModal(${heading.id}, ${item.id})" title="Edit">✏️</button>
+                <button class="btn-icon btn-delete" onclick="deleteItem(${heading.id}, ${item.id})" title="Delete">🗑️</button>
             </div>
         </div>
-    `).join('');
+    `);
+}
+
+// Flip checkbox / text in place instead of rebuilding the row
+function patchItemNode(node, item) {
+    const text = node.querySelector('.item-text');
+    node.querySelector('input[type="checkbox"]').checked = item.checked;
+    text.classList.toggle('checked', item.checked);
+    text.textContent = item.text;
+    return true;
+}
+
+function renderHeadingItems(container, heading) {
+    container._heading = heading;
+    const virtual = heading.items.length > renderOptions.virtualThreshold;
+    
+    if (container._virtual !== virtual) {
+        // Switching modes: start from an empty container
+        container._virtual = virtual;
+        container._keyed = null;
+        container.innerHTML = '';
+        container.classList.toggle('virtual', virtual);
+        container.onscroll = virtual ? () => scheduleVirtualRender(container) : null;
+    }
+    
+    if (virtual) {
+        renderVirtualItems(container);
+        return;
+    }
+    
+    if (heading.items.length === 0) {
+        renderEmptyState(container, '<p style="color: var(--text-secondary); padding: 10px;">No items yet. Click ➕ to add sub-items.</p>');
+        return;
+    }
+    
+    reconcileList(
+        container,
+        heading.items,
+        item => item.id,
+        item => `${item.checked}|${item.text}`,
+        item => createItemNode(heading, item),
+        (node, item) => patchItemNode(node, item)
+    );
+}
+
+// Virtualized mode: a spacer as tall as all rows, with only the rows in
+// (or near) the scrolled viewport actually in the DOM
+function renderVirtualItems(container) {
+    const heading = container._heading;
+    let spacer = container.firstElementChild;
+    if (!spacer) {
+        spacer = document.createElement('div');
+        spacer.className = 'virtual-spacer';
+        container.appendChild(spacer);
+    }
+    spacer.style.height = `${heading.items.length * VIRTUAL_ROW_HEIGHT}px`;
+    
+    const viewport = container.clientHeight || 600;
+    const first = Math.max(Math.floor(container.scrollTop / VIRTUAL_ROW_HEIGHT) - VIRTUAL_OVERSCAN, 0);
+    const last = Math.min(Math.ceil((container.scrollTop + viewport) / VIRTUAL_ROW_HEIGHT) + VIRTUAL_OVERSCAN, heading.items.length);
+    const rows = heading.items.slice(first, last).map((item, offset) => ({ item, position: first + offset }));
+    
+    reconcileList(
+        spacer,
+        rows,
+        row => row.item.id,
+        row => `${row.position}|${row.item.checked}|${row.item.text}`,
+        row => {
+            const node = createItemNode(heading, row.item);
+            node.classList.add('virtual-row');
+            node.style.top = `${row.position * VIRTUAL_ROW_HEIGHT}px`;
+            return node;
+        },
+        (node, row) => {
+            node.style.top = `${row.position * VIRTUAL_ROW_HEIGHT}px`;
+            return patchItemNode(node, row.item);
+        }
+    );
+}
+
+function scheduleVirtualRender(container) {
+    if (container._frame) return;
+    container._frame = requestAnimationFrame(() => {
+        container._frame = null;
+        if (container._virtual) renderVirtualItems(container);
+    });
 }
 
 // Render notes
@@ -198,50 +712,96 @@ function renderNotes() {
     const container = document.getElementById('notes-container');
     
     if (!currentSession.notes || currentSession.notes.length === 0) {
-        container.innerHTML = '<div class="empty-state"><p>No notes yet. Click "Add Note" to create one.</p></div>';
+        renderEmptyState(container, '<div class="empty-state"><p>No notes yet. Click "Add Note" to create one.</p></div>');
         return;
     }
     
-    container.innerHTML = currentSession.notes.map(note => `
-        <div class="note-item">
-            <div class="note-text">${escapeHtml(note.text)}</div>
-            <div class="note-footer">
-                <span class="note-time">${note.created_at || ''}</span>
-                <div class="note-actions">
-                    <button class="btn-icon" onclick="openNoteModal(${note.id})" title="Edit">✏️</button>
-                    <button class="btn-icon btn-delete" onclick="deleteNote(${note.id})" title="Delete">🗑️</button>
+    reconcileList(
+        container,
+        currentSession.notes,
+        note => note.id,
+        note => `${note.text}|${note.created_at}`,
+        note => htmlToElement(`
+            <div class="note-item">
+                <div class="note-text">${escapeHtml(note.text)}</div>
+                <div class="note-footer">
+                    <span class="note-time">${note.created_at || ''}</span>
+                    <div class="note-actions">
+                        <button class="btn-icon" onclick="openNoteModal(${note.id})" title="Edit">✏️</button>
+                        <button class="btn-icon btn-delete" onclick="deleteNote(${note.id})" title="Delete">🗑️</button>
+                    </div>
                 </div>
             </div>
-        </div>
-    `).join('');
+        `)
+    );
 }
 
 // Toggle checklist item
-async function toggleItem(headingId, itemId, checked) {
-    try {
-        const response = await fetch('/api/checklist/item', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ heading_id: headingId, item_id: itemId, checked })
-        });
-        
-        if (!response.ok) throw new Error('Failed to toggle item');
-        
-        // Update local state
-        const heading = currentSession.checklist.find(h => h.id === headingId);
-        if (heading) {
-            const item = heading.items.find(i => i.id === itemId);
-            if (item) {
-                item.checked = checked;
-                renderChecklist();
-            }
+function toggleItem(headingId, itemId, checked) {
+    // Update local state right away; the server gets one batch once clicking stops
+    const heading = currentSession.checklist.find(h => h.id === headingId);
+    if (heading) {
+        const item = heading.items.find(i => i.id === itemId);
+        if (item) {
+            item.checked = checked;
+            renderChecklist();
         }
+    }
+    
+    pendingToggles.set(`${headingId}:${itemId}`, { op: 'toggle', heading_id: headingId, item_id: itemId, checked });
+    clearTimeout(toggleTimer);
+    toggleTimer = setTimeout(flushPendingToggles, TOGGLE_DEBOUNCE_MS);
+}
+
+// Check or uncheck every item under a heading
+async function toggleHeadingItems(headingId) {
+    const heading = currentSession.checklist.find(h => h.id === headingId);
+    if (!heading || heading.items.length === 0) return;
+    
+    const checked = !heading.items.every(item => item.checked);
+    heading.items.forEach(item => { item.checked = checked; });
+    renderChecklist();
+    
+    try {
+        // Keep ordering with any individual clicks still queued
+        await flushPendingToggles();
+        await sendBatch([{ op: checked ? 'check_all' : 'uncheck_all', heading_id: headingId }]);
+    } catch (error) {
+        console.error('Error updating heading items:', error);
+        showError('Failed to update items. Please try again.');
+        await loadSession();
+    }
+}
+
+async function flushPendingToggles() {
+    clearTimeout(toggleTimer);
+    toggleTimer = null;
+    if (pendingToggles.size === 0) return;
+    
+    const operations = Array.from(pendingToggles.values());
+    pendingToggles.clear();
+    
+    try {
+        await sendBatch(operations);
     } catch (error) {
-        console.error('Error toggling item:', error);
-        showError('Failed to update item. Please try again.');
+        console.error('Error toggling items:', error);
+        showError('Failed to update items. Please try again.');
+        await loadSession();
     }
 }
 
+// Apply several checklist operations in one request
+async function sendBatch(operations) {
+    const response = await fetch(sessionApi('/checklist/batch'), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ operations })
+    });
+    
+    if (!response.ok) throw new Error('Failed to apply checklist changes');
+    return response.json();
+}
+
 // Heading Modal
 function openHeadingModal(headingId = null) {
     editingHeadingId = headingId;
@@ -283,14 +843,14 @@ async function saveHeading() {
         
         if (editingHeadingId) {
             // Edit existing heading
-            response = await fetch(`/api/checklist/heading/${editingHeadingId}`, {
+            response = await fetch(sessionApi(`/checklist/heading/${editingHeadingId}`), {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ title })
             });
         } else {
             // Add new heading
-            response = await fetch('/api/checklist/heading', {
+            response = await fetch(sessionApi('/checklist/heading'), {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ title })
@@ -300,7 +860,7 @@ async function saveHeading() {
         if (!response.ok) throw new Error('Failed to save heading');
         
         closeHeadingModal();
-        await loadSession();
+        await syncSession();
         showSuccess(editingHeadingId ? 'Heading updated!' : 'Heading added!');
     } catch (error) {
         console.error('Error saving heading:', error);
@@ -314,13 +874,13 @@ async function deleteHeading(headingId) {
     }
     
     try {
-        const response = await fetch(`/api/checklist/heading/${headingId}`, {
+        const response = await fetch(sessionApi(`/checklist/heading/${headingId}`), {
             method: 'DELETE'
         });
         
         if (!response.ok) throw new Error('Failed to delete heading');
         
-        await loadSession();
+        await syncSession();
         showSuccess('Heading deleted!');
     } catch (error) {
         console.error('Error deleting heading:', error);
@@ -377,14 +937,14 @@ async function saveItem() {
         
         if (editingItemId) {
             // Edit existing item
-            response = await fetch(`/api/checklist/item/${editingItemHeadingId}/${editingItemId}`, {
+            response = await fetch(sessionApi(`/checklist/item/${editingItemHeadingId}/${editingItemId}`), {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ text })
             });
         } else {
             // Add new item
-            response = await fetch('/api/checklist/item', {
+            response = await fetch(sessionApi('/checklist/item'), {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ heading_id: currentHeadingId, text })
@@ -394,7 +954,7 @@ async function saveItem() {
         if (!response.ok) throw new Error('Failed to save item');
         
         closeItemModal();
-        await loadSession();
+        await syncSession();
         showSuccess(editingItemId ? 'Item updated!' : 'Item added!');
     } catch (error) {
         console.error('Error saving item:', error);
@@ -408,13 +968,13 @@ async function deleteItem(headingId, itemId) {
     }
     
     try {
-        const response = await fetch(`/api/checklist/item/${headingId}/${itemId}`, {
+        const response = await fetch(sessionApi(`/checklist/item/${headingId}/${itemId}`), {
             method: 'DELETE'
         });
         
         if (!response.ok) throw new Error('Failed to delete item');
         
-        await loadSession();
+        await syncSession();
         showSuccess('Item deleted!');
     } catch (error) {
         console.error('Error deleting item:', error);
@@ -463,14 +1023,14 @@ async function saveNote() {
         
         if (editingNoteId) {
             // Edit existing note
-            response = await fetch(`/api/notes/${editingNoteId}`, {
+            response = await fetch(sessionApi(`/notes/${editingNoteId}`), {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ text })
             });
         } else {
             // Add new note
-            response = await fetch('/api/notes', {
+            response = await fetch(sessionApi('/notes'), {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ text })
@@ -480,7 +1040,7 @@ async function saveNote() {
         if (!response.ok) throw new Error('Failed to save note');
         
         closeNoteModal();
-        await loadSession();
+        await syncSession();
         showSuccess(editingNoteId ? 'Note updated!' : 'Note added!');
     } catch (error) {
         console.error('Error saving note:', error);
@@ -494,13 +1054,13 @@ async function deleteNote(noteId) {
     }
     
     try {
-        const response = await fetch(`/api/notes/${noteId}`, {
+        const response = await fetch(sessionApi(`/notes/${noteId}`), {
             method: 'DELETE'
         });
         
         if (!response.ok) throw new Error('Failed to delete note');
         
-        await loadSession();
+        await syncSession();
         showSuccess('Note deleted!');
     } catch (error) {
         console.error('Error deleting note:', error);
@@ -527,19 +1087,25 @@ async function completeSession() {
     }
     
     try {
-        const response = await fetch('/api/session/complete', {
+        // Queued checkbox changes belong to the session being completed
+        await flushPendingToggles();
+        
+        completingLocally = true;
+        const response = await fetch(sessionApi('/complete'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ end_date: endDate })
+            body: JSON.stringify({ end_date: endDate, template: selectedTemplate() })
         });
         
         if (!response.ok) throw new Error('Failed to complete session');
         
         showSuccess('Session completed! View it in the History page.');
-        await loadSession();
+        await syncSession();
     } catch (error) {
         console.error('Error completing session:', error);
         showError('Failed to complete session. Please try again.');
+    } finally {
+        completingLocally = false;
     }
 }
 
@@ -550,14 +1116,20 @@ async function resetSession() {
     }
     
     try {
-        const response = await fetch('/api/session/reset', {
-            method: 'POST'
+        // The session is being thrown away, so are its queued checkbox changes
+        clearTimeout(toggleTimer);
+        pendingToggles.clear();
+        
+        const response = await fetch(sessionApi('/reset'), {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ template: selectedTemplate() })
         });
         
         if (!response.ok) throw new Error('Failed to reset session');
         
         showSuccess('Session reset successfully!');
-        await loadSession();
+        await syncSession();
     } catch (error) {
         console.error('Error resetting session:', error);
         showError('Failed to reset session. Please try again.');
@@ -590,28 +1162,34 @@ function renderBugs() {
     const container = document.getElementById('bugs-container');
     
     if (!currentSession.bugs || currentSession.bugs.length === 0) {
-        container.innerHTML = '<div class="empty-state"><p>No bugs reported yet.</p></div>';
+        renderEmptyState(container, '<div class="empty-state"><p>No bugs reported yet.</p></div>');
         return;
     }
     
-    container.innerHTML = currentSession.bugs.map(bug => `
-        <div class="bug-item" data-bug-id="${bug.id}">
-            <div class="bug-date-badge">${formatDate(bug.created_at)}</div>
-            <div class="bug-title">
-                <span>${escapeHtml(bug.title)}</span>
-            </div>
-            <div class="bug-description">${escapeHtml(bug.description)}</div>
-            <div class="bug-footer">
-                <span class="bug-timestamp" title="${bug.created_at}">
-                    ${formatDateTime(bug.created_at)}
-                </span>
-                <div class="bug-actions">
-                    <button class="btn-icon" onclick="openBugModal(${bug.id})" title="Edit">✏️</button>
-                    <button class="btn-icon btn-delete" onclick="deleteBug(${bug.id})" title="Delete">🗑️</button>
+    reconcileList(
+        container,
+        currentSession.bugs,
+        bug => bug.id,
+        bug => `${bug.title}|${bug.description}|${bug.created_at}`,
+        bug => htmlToElement(`
+            <div class="bug-item" data-bug-id="${bug.id}">
+                <div class="bug-date-badge">${formatDate(bug.created_at)}</div>
+                <div class="bug-title">
+                    <span>${escapeHtml(bug.title)}</span>
+                </div>
+                <div class="bug-description">${escapeHtml(bug.description)}</div>
+                <div class="bug-footer">
+                    <span class="bug-timestamp" title="${bug.created_at}">
+                        ${formatDateTime(bug.created_at)}
+                    </span>
+                    <div class="bug-actions">
+                        <button class="btn-icon" onclick="openBugModal(${bug.id})" title="Edit">✏️</button>
+                        <button class="btn-icon btn-delete" onclick="deleteBug(${bug.id})" title="Delete">🗑️</button>
+                    </div>
                 </div>
             </div>
-        </div>
-    `).join('');
+        `)
+    );
 }
 
 // Bug Modal
@@ -665,14 +1243,14 @@ async function saveBug() {
         
         if (editingBugId) {
             // Edit existing bug
-            response = await fetch(`/api/bugs/${editingBugId}`, {
+            response = await fetch(sessionApi(`/bugs/${editingBugId}`), {
                 method: 'PUT',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ title, description })
             });
         } else {
             // Add new bug
-            response = await fetch('/api/bugs', {
+            response = await fetch(sessionApi('/bugs'), {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ title, description })
@@ -682,7 +1260,7 @@ async function saveBug() {
         if (!response.ok) throw new Error('Failed to save bug');
         
         closeBugModal();
-        await loadSession();
+        await syncSession();
         showSuccess(editingBugId ? 'Bug updated!' : 'Bug added!');
     } catch (error) {
         console.error('Error saving bug:', error);
@@ -696,13 +1274,13 @@ async function deleteBug(bugId) {
     }
     
     try {
-        const response = await fetch(`/api/bugs/${bugId}`, {
+        const response = await fetch(sessionApi(`/bugs/${bugId}`), {
             method: 'DELETE'
         });
         
         if (!response.ok) throw new Error('Failed to delete bug');
         
-        await loadSession();
+        await syncSession();
         showSuccess('Bug deleted!');
     } catch (error) {
         console.error('Error deleting bug:', error);
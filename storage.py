@@ -0,0 +1,1710 @@
+"""
+QA Testing Checklist Application
+Storage layer: JSON file helpers, pluggable backends (JSON files or SQLite)
+and the in-memory session store
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: locks only coordinate threads within this process
+    fcntl = None
+
+import codec
+import metrics
+from logs import logger
+from models import SessionModel, project_stats, project_summary
+
+
+class FileLock:
+    """Reader/writer lock for one data file, shared by threads and processes.
+
+    Inside the process it is a readers/writer lock that doesn't let a stream
+    of readers starve writers; the thread holding it exclusively may re-enter
+    it (but a reader must not ask for the exclusive lock). Across processes
+    the outermost acquisition also takes a ``flock`` on ``<file>.lock``,
+    shared or exclusive, where fcntl is available.
+    """
+
+    def __init__(self, path):
+        self.lock_path = path.with_name(path.name + '.lock')
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._writers_waiting = 0
+        self._depth = 0
+        # One lock file handle per thread: flock on separate handles is what
+        # makes readers and writers in different processes exclude each other
+        self._local = threading.local()
+
+    def _flock(self, operation):
+        if fcntl is None:
+            return
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            handle = open(self.lock_path, 'a+b')
+            self._local.handle = handle
+        fcntl.flock(handle.fileno(), getattr(fcntl, operation))
+
+    @contextmanager
+    def shared(self):
+        """Hold the lock for reading"""
+        with self._cond:
+            nested = self._writer == threading.get_ident()
+            if nested:
+                self._depth += 1
+            else:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        try:
+            if not nested:
+                self._flock('LOCK_SH')
+            try:
+                yield
+            finally:
+                if not nested:
+                    self._flock('LOCK_UN')
+        finally:
+            with self._cond:
+                if nested:
+                    self._depth -= 1
+                else:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock for writing"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self):
+        """Take the lock exclusively; pair with release()"""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+        try:
+            self._flock('LOCK_EX')
+        except BaseException:
+            self._release_writer()
+            raise
+
+    def release(self):
+        with self._cond:
+            if self._depth:
+                self._depth -= 1
+                return
+        self._flock('LOCK_UN')
+        self._release_writer()
+
+    def _release_writer(self):
+        with self._cond:
+            self._writer = None
+            self._cond.notify_all()
+
+
+# How snapshots (session files, sessions.json, history_stats.json, the search
+# index) are written: 'compact' or 'pretty' JSON, then optionally compressed.
+# Reading recognizes every combination, so changing it needs no migration.
+# completed.json is always one compact project per line, as it is read by
+# byte offset.
+STORAGE_FORMATS = ('compact', 'pretty')
+_storage_format = {'format': 'compact', 'compression': 'none'}
+
+def set_storage_format(storage_format='compact', compression='none'):
+    """Choose how snapshots are written from now on (for the whole process); raises ValueError"""
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format: {storage_format} (expected one of {', '.join(STORAGE_FORMATS)})")
+    codec.check_compression(compression)
+    _storage_format.update(format=storage_format, compression=compression)
+
+def compress_snapshot(payload):
+    """Compress serialized bytes the way snapshots are configured to be"""
+    return codec.compress(payload, _storage_format['compression'])
+
+def read_snapshot(filepath):
+    """Read a snapshot file's JSON bytes, decompressing them if needed"""
+    started = time.perf_counter()
+    with open(filepath, 'rb') as f:
+        payload = codec.decompress(f.read())
+    metrics.record_storage('read', filepath, started, len(payload))
+    return payload
+
+def decode_json(payload):
+    """Parse a serialized (possibly compressed) snapshot"""
+    if isinstance(payload, bytes):
+        payload = codec.decompress(payload)
+    return codec.decode(payload)
+
+def load_json(filepath):
+    """Load JSON data from file"""
+    try:
+        if not filepath.exists():
+            logger.info("File not found: %s", filepath)
+            return None
+
+        content = read_snapshot(filepath).strip()
+
+        # Check if file is empty
+        if not content:
+            logger.warning("File is empty: %s", filepath)
+            return None
+
+        started = time.perf_counter()
+        data = codec.decode(content)
+        metrics.record_storage('parse', filepath, started)
+        return data
+
+    except json.JSONDecodeError as e:
+        logger.error("JSON decode error in %s (%s bytes): %s", filepath,
+                     len(content) if 'content' in locals() else 'N/A', e)
+        return None
+    except Exception as e:
+        logger.exception("Error loading %s: %s", filepath, e)
+        return None
+
+def dump_json(data):
+    """Serialize data the way it is stored on disk (bytes, compressed if so configured)"""
+    return compress_snapshot(codec.encode(data, pretty=_storage_format['format'] == 'pretty'))
+
+def _dump_record(data):
+    """Serialize one record onto a single line (bytes)"""
+    return codec.encode(data)
+
+def save_json(filepath, data, fsync=False):
+    """Save JSON data to file (atomically: readers see the old or the new file, never half of one)"""
+    try:
+        started = time.perf_counter()
+        payload = dump_json(data)
+        metrics.record_storage('serialize', filepath, started)
+        return save_text(filepath, payload, fsync=fsync, atomic=True)
+    except Exception as e:
+        logger.exception("Error serializing %s: %s", filepath, e)
+        return False
+
+def save_text(filepath, text, fsync=False, atomic=False):
+    """Write already-serialized data (a string or bytes) to file, optionally forcing it to disk.
+
+    With atomic=True the data goes to a temp file that then replaces the
+    target, so a crash mid-write can never leave a truncated file behind and
+    concurrent readers never see a partial file.
+    """
+    # Unique per writer so two processes never share a temp file
+    target = filepath.with_name(f"{filepath.name}.{os.getpid()}-{threading.get_ident()}.tmp") if atomic else filepath
+    started = time.perf_counter()
+    try:
+        payload = text.encode('utf-8') if isinstance(text, str) else text
+        with open(target, 'wb') as f:
+            f.write(payload)
+            if fsync or atomic:
+                f.flush()
+                os.fsync(f.fileno())
+        if atomic:
+            os.replace(target, filepath)
+        metrics.record_storage('write', filepath, started, len(payload))
+        return True
+    except Exception as e:
+        logger.exception("Error saving %s: %s", filepath, e)
+        if atomic and target.exists():
+            target.unlink()
+        return False
+
+def now_timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def default_session_meta():
+    return {"name": "Default session", "created_at": None, "target_website": "", "start_date": ""}
+
+def completed_between(completed_at, start=None, end=None):
+    """True if a completion timestamp falls on or between two YYYY-MM-DD dates (either may be None)"""
+    day = (completed_at or '')[:10]
+    return (not start or day >= start) and (not end or day <= end)
+
+def backup_file(filepath):
+    """Move an unreadable data file aside (never delete it); returns the backup path"""
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    backup = filepath.with_name(f"{filepath.name}.corrupt-{stamp}")
+    os.replace(filepath, backup)
+    return backup
+
+
+# The session that existed before there could be several: current_session.json
+# (or the unnamed active row in SQLite), served by the /api/session... routes
+DEFAULT_SESSION_ID = 'default'
+# Ids of other sessions are generated (uuid hex) but checked before use in paths
+SESSION_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,39}$')
+
+
+class JsonSessionFile:
+    """One session stored as a JSON file (what a SessionStore reads and writes)"""
+
+    def __init__(self, session_file):
+        self.session_file = session_file
+        self.location = session_file
+        # Reader/writer lock on the file, honoured by other processes too
+        self.session_lock = FileLock(session_file)
+
+    def exists(self):
+        return self.session_file.exists()
+
+    def load_session(self):
+        """Return the session dict, or None if missing/corrupt"""
+        with self.session_lock.shared():
+            return load_json(self.session_file)
+
+    def save_session(self, payload, fsync=False, atomic=True):
+        """Persist an already-serialized session (atomically unless told otherwise)"""
+        with self.session_lock.exclusive():
+            return save_text(self.session_file, payload, fsync=fsync, atomic=atomic)
+
+    def session_signature(self):
+        """Changes whenever the session file is rewritten (by any process)"""
+        try:
+            stat = self.session_file.stat()
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def backup_corrupt_session(self):
+        """Move an unreadable session file aside; returns the backup path or None"""
+        with self.session_lock.exclusive():
+            if not self.session_file.exists() or load_json(self.session_file) is not None:
+                return None
+            return backup_file(self.session_file)
+
+    def delete(self):
+        with self.session_lock.exclusive():
+            if self.session_file.exists():
+                self.session_file.unlink()
+        self.session_lock.lock_path.unlink(missing_ok=True)
+
+
+# A compaction runs once deleted projects and their tombstones make up this
+# many lines of completed.json, and at least a quarter of them
+HISTORY_COMPACT_MIN_DEAD = 32
+
+
+class HistoryIndex:
+    """Where each live project of completed.json is, plus its listing summary"""
+
+    def __init__(self):
+        self.signature = None
+        # id -> (byte offset, length) of each live project's line
+        self.offsets = {}
+        # id -> listing summary, in file order (oldest first)
+        self.summaries = {}
+        # One past the highest id ever used
+        self.next_id = 1
+        # Lines in the array, and how many of them are tombstones or deleted projects
+        self.records = 0
+        self.dead_records = 0
+        # Some id appears on more than one live line (files from before the id counter)
+        self.duplicates = False
+
+
+class JsonBackend:
+    """Sessions and history as plain JSON files (the default backend).
+
+    The default session is current_session.json; other sessions are
+    sessions/<id>.json, listed with their name and info in sessions.json so
+    the listing never opens a session file.
+    """
+
+    name = 'json'
+
+    def __init__(self, data_dir):
+        self.completed_file = data_dir / 'completed.json'
+        self.sessions_dir = data_dir / 'sessions'
+        self.sessions_dir.mkdir(exist_ok=True)
+        self.sessions_index_file = data_dir / 'sessions.json'
+        self.location = data_dir
+        self.default_session = JsonSessionFile(data_dir / 'current_session.json')
+        self._sessions_index_lock = FileLock(self.sessions_index_file)
+        self._history_file_lock = FileLock(self.completed_file)
+        # id -> (byte offset, length) of each project in completed.json, plus
+        # listing summaries; rebuilt only when the file changes on disk.
+        # Always taken after the file lock, never before.
+        self._history_lock = threading.RLock()
+        self._history_index = None
+        self._history_torn = False
+        self.history_meta_file = data_dir / 'completed.meta.json'
+        # Background thread rewriting completed.json without deleted projects
+        self._compactor = None
+
+    def load_session(self):
+        """Return the default session dict, or None if missing/corrupt"""
+        return self.default_session.load_session()
+
+    def data_files(self):
+        """The files whose size /metrics reports"""
+        return [self.default_session.session_file, self.completed_file, self.sessions_index_file]
+
+    def session(self, session_id):
+        """Storage for one session"""
+        if session_id == DEFAULT_SESSION_ID:
+            return self.default_session
+        return JsonSessionFile(self.sessions_dir / f"{session_id}.json")
+
+    def _load_sessions_index(self):
+        return load_json(self.sessions_index_file) if self.sessions_index_file.exists() else {}
+
+    def list_sessions(self):
+        """Metadata of every session (default first), without reading their bodies"""
+        with self._sessions_index_lock.shared():
+            index = self._load_sessions_index() or {}
+        sessions = [dict(index.get(DEFAULT_SESSION_ID) or default_session_meta(), id=DEFAULT_SESSION_ID)]
+        sessions.extend(dict(meta, id=session_id) for session_id, meta in index.items()
+                        if session_id != DEFAULT_SESSION_ID)
+        return sessions
+
+    def update_session_meta(self, session_id, **fields):
+        """Create or update one session's entry in sessions.json"""
+        with self._sessions_index_lock.exclusive():
+            index = self._load_sessions_index() or {}
+            meta = index.get(session_id) or (default_session_meta() if session_id == DEFAULT_SESSION_ID else {})
+            if all(meta.get(key) == value for key, value in fields.items()):
+                return True
+            meta.update(fields)
+            index[session_id] = meta
+            return save_json(self.sessions_index_file, index)
+
+    def create_session(self, session_id, name):
+        return self.update_session_meta(session_id, name=name, created_at=now_timestamp(),
+                                        target_website='', start_date='')
+
+    def delete_session(self, session_id):
+        """Remove a (non-default) session's file and listing entry"""
+        self.session(session_id).delete()
+        with self._sessions_index_lock.exclusive():
+            index = self._load_sessions_index() or {}
+            if index.pop(session_id, None) is not None:
+                return save_json(self.sessions_index_file, index)
+        return True
+
+    def ensure_history(self):
+        """Create (or repair) the history store; returns True if it had to"""
+        with self._history_file_lock.exclusive(), self._history_lock:
+            index = self._index(exclusive=True)
+            if index is not None:
+                if self._should_compact(index):
+                    self._compact_history(index)
+                return False
+            self._write_history([])
+            return True
+
+    # completed.json is kept as a JSON array with exactly one record per line:
+    #
+    #   [
+    #   {"id":1,...},
+    #   {"id":2,...},
+    #   {"id":1,"deleted":true,"deleted_at":"..."}
+    #   ]
+    #
+    # It is still a plain JSON array for anyone reading it, but a project can be
+    # read by seeking to its line, and a new project is appended by rewriting
+    # only the closing "\n]" instead of the whole file. Deleting a project
+    # appends a tombstone line for its id the same way; once tombstones and the
+    # projects they delete make up a good share of the file, a background
+    # compaction rewrites it without them. Ids come from a counter (one past
+    # the highest id ever used, remembered in completed.meta.json across
+    # compactions), so an id is never handed out twice.
+
+    def _file_signature(self):
+        try:
+            stat = self.completed_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _write_history(self, history, fsync=False):
+        lines = [_dump_record(project) for project in history]
+        text = b'[\n' + b',\n'.join(lines) + b'\n]' if lines else b'[\n]'
+        self._history_index = None
+        return save_text(self.completed_file, text, fsync=fsync, atomic=True)
+
+    def _saved_next_id(self):
+        meta = load_json(self.history_meta_file) if self.history_meta_file.exists() else None
+        return meta.get('next_id', 1) if isinstance(meta, dict) else 1
+
+    def _index(self, exclusive=False):
+        """Return the HistoryIndex of completed.json, scanning it again if it changed.
+
+        Repairs and format conversions rewrite the file, so they only happen
+        when the caller holds the history file lock exclusively.
+        """
+        with self._history_lock:
+            signature = self._file_signature()
+            if signature is None:
+                return None
+            stale = self._history_index is None or self._history_index.signature != signature
+            metrics.record_cache('history_index', not stale)
+            if stale or (exclusive and (self._history_torn or self._history_index.duplicates)):
+                scanned = self._scan_history(repair=exclusive)
+                if scanned is None:
+                    if not exclusive:
+                        # ensure_history (run at startup) converts it
+                        logger.warning("%s is not in one-project-per-line layout", self.completed_file)
+                        return None
+                    # Not in one-project-per-line layout (older pretty-printed file): convert once
+                    history = load_json(self.completed_file)
+                    if not isinstance(history, list) or not self._write_history(history):
+                        return None
+                    logger.info("Converted %s to one project per line", self.completed_file)
+                    scanned = self._scan_history(repair=True)
+                    if scanned is None:
+                        return None
+                if scanned.duplicates and exclusive:
+                    scanned = self._renumber_duplicates()
+                    if scanned is None:
+                        return None
+                scanned.signature = self._file_signature()
+                self._history_index = scanned
+            return self._history_index
+
+    def _scan_history(self, repair=True):
+        started = time.perf_counter()
+        index = HistoryIndex()
+        max_id = 0
+        with open(self.completed_file, 'rb') as f:
+            first = f.readline()
+            if first.rstrip(b'\r\n') != b'[':
+                return None
+            position = len(first)
+            good_end = 1
+            closed = False
+            for line in f:
+                stripped = line.rstrip(b'\r\n')
+                if stripped == b']':
+                    closed = True
+                    break
+                record = stripped[:-1] if stripped.endswith(b',') else stripped
+                try:
+                    project = codec.decode(record)
+                except ValueError:
+                    if f.read(1):
+                        return None
+                    # Torn final line from a crash during append
+                    break
+                if not isinstance(project, dict) or not isinstance(project.get('id'), int):
+                    return None
+                project_id = project['id']
+                max_id = max(max_id, project_id)
+                index.records += 1
+                if project.get('deleted'):
+                    index.dead_records += 1
+                    if index.offsets.pop(project_id, None) is not None:
+                        del index.summaries[project_id]
+                        index.dead_records += 1
+                else:
+                    # Files written before ids came from a counter can repeat an id
+                    index.duplicates = index.duplicates or project_id in index.offsets
+                    index.offsets[project_id] = (position, len(record))
+                    index.summaries[project_id] = project_summary(project)
+                good_end = position + len(record)
+                position += len(line)
+
+        self._history_torn = not closed and not repair
+        if not closed and repair:
+            # Drop whatever was half-written and close the array again
+            logger.warning("Repairing unterminated %s after %d record(s)", self.completed_file, index.records)
+            with open(self.completed_file, 'r+b') as f:
+                f.truncate(good_end)
+                f.seek(good_end)
+                f.write(b'\n]')
+                f.flush()
+                os.fsync(f.fileno())
+        index.next_id = max(max_id + 1, self._saved_next_id())
+        metrics.record_storage('scan', self.completed_file, started, position)
+        return index
+
+    def _renumber_duplicates(self):
+        """Give projects that share an id with an earlier one fresh ids, rewriting the file"""
+        history = load_json(self.completed_file)
+        if not isinstance(history, list):
+            return None
+        next_id = max((record['id'] for record in history), default=0) + 1
+        live = {}
+        used = set()
+        renumbered = 0
+        for record in history:
+            if record.get('deleted'):
+                live.pop(record['id'], None)
+                continue
+            if record['id'] in used:
+                record = {**record, 'id': next_id}
+                next_id += 1
+                renumbered += 1
+            used.add(record['id'])
+            live[record['id']] = record
+        if not save_json(self.history_meta_file, {"next_id": next_id}) or not self._write_history(list(live.values())):
+            return None
+        logger.info("Renumbered %d project(s) with a duplicate id in %s", renumbered, self.completed_file)
+        return self._scan_history(repair=True)
+
+    def _read_record(self, offset, length):
+        started = time.perf_counter()
+        with open(self.completed_file, 'rb') as f:
+            f.seek(offset)
+            record = f.read(length)
+        metrics.record_storage('read', self.completed_file, started, length)
+        started = time.perf_counter()
+        project = codec.decode(record)
+        metrics.record_storage('parse', self.completed_file, started)
+        return project
+
+    def _append_records(self, index, records):
+        """Append serialized records before the closing bracket with one write and fsync; returns their positions"""
+        started = time.perf_counter()
+        with open(self.completed_file, 'r+b') as f:
+            f.seek(-2, os.SEEK_END)
+            if f.read(2) != b'\n]':
+                raise ValueError("completed.json does not end with a closing bracket line")
+            f.seek(-2, os.SEEK_END)
+            position = f.tell()
+            chunk = bytearray()
+            positions = []
+            for record in records:
+                chunk += b',\n' if index.records or positions else b'\n'
+                positions.append((position + len(chunk), len(record)))
+                chunk += record
+            f.write(bytes(chunk) + b'\n]')
+            f.flush()
+            os.fsync(f.fileno())
+        metrics.record_storage('append', self.completed_file, started, len(chunk))
+        index.records += len(records)
+        return positions
+
+    def load_history(self):
+        """Return every completed project, oldest first"""
+        with self._history_file_lock.shared(), self._history_lock:
+            index = self._index()
+            if index is None:
+                return None
+            if not self._history_torn and not index.dead_records:
+                return load_json(self.completed_file)
+            # Skip tombstones and what they deleted (or a partial last line left by a crashed append)
+            started = time.perf_counter()
+            with open(self.completed_file, 'rb') as f:
+                history = []
+                for offset, length in (index.offsets[project_id] for project_id in index.summaries):
+                    f.seek(offset)
+                    history.append(codec.decode(f.read(length)))
+            metrics.record_storage('read', self.completed_file, started)
+            return history
+
+    def iter_history(self, start=None, end=None):
+        """Yield completed projects oldest first, one at a time, optionally only those completed from start to end"""
+        with self._history_file_lock.shared(), self._history_lock:
+            index = self._index()
+            if index is None:
+                return
+            positions = [index.offsets[project_id] for project_id, summary in index.summaries.items()
+                         if completed_between(summary['completed_at'], start, end)]
+            history_file = open(self.completed_file, 'rb')
+        # Read without the lock: the handle keeps seeing this version of the
+        # file even if a compaction replaces it, and appends leave existing lines alone
+        with history_file:
+            for offset, length in positions:
+                started = time.perf_counter()
+                history_file.seek(offset)
+                record = history_file.read(length)
+                metrics.record_storage('read', self.completed_file, started, length)
+                yield codec.decode(record)
+
+    def list_history(self, limit, offset):
+        """Return (total, summaries) for one page of history, newest first"""
+        with self._history_file_lock.shared(), self._history_lock:
+            index = self._index()
+            if index is None:
+                return None
+            return len(index.summaries), list(islice(reversed(index.summaries.values()), offset, offset + limit))
+
+    def get_history_entry(self, project_id):
+        """Return one completed project by seeking straight to its line, or None"""
+        with self._history_file_lock.shared(), self._history_lock:
+            index = self._index()
+            if index is None or project_id not in index.offsets:
+                return None
+            return self._read_record(*index.offsets[project_id])
+
+    def add_history_entry(self, entry):
+        """Append a completed project in place, assigning its id; returns the stored entry"""
+        stored = self.add_history_entries([entry])
+        return stored[0] if stored else None
+
+    def add_history_entries(self, entries):
+        """Append several completed projects with one write and one fsync; returns them with their ids"""
+        with self._history_file_lock.exclusive(), self._history_lock:
+            index = self._index(exclusive=True)
+            if index is None:
+                return None
+            projects = [{"id": index.next_id + number, **entry} for number, entry in enumerate(entries)]
+            records = [_dump_record(project) for project in projects]
+            try:
+                positions = self._append_records(index, records)
+            except Exception as e:
+                logger.exception("Error appending to %s: %s", self.completed_file, e)
+                self._history_index = None
+                return None
+
+            for project, record_position in zip(projects, positions):
+                index.offsets[project['id']] = record_position
+                index.summaries[project['id']] = project_summary(project)
+            index.next_id += len(projects)
+            index.signature = self._file_signature()
+            return projects
+
+    def delete_history_entry(self, project_id):
+        """Remove a completed project by appending a tombstone (the file is compacted later)"""
+        with self._history_file_lock.exclusive(), self._history_lock:
+            index = self._index(exclusive=True)
+            if index is None:
+                return False
+            if project_id not in index.offsets:
+                return True
+            tombstone = _dump_record({"id": project_id, "deleted": True, "deleted_at": now_timestamp()})
+            try:
+                self._append_records(index, [tombstone])
+            except Exception as e:
+                logger.exception("Error appending to %s: %s", self.completed_file, e)
+                self._history_index = None
+                return False
+
+            del index.offsets[project_id]
+            del index.summaries[project_id]
+            index.dead_records += 2
+            index.signature = self._file_signature()
+            if self._should_compact(index) and self._compactor is None:
+                # Rewrite the file without the dead lines, off the request path
+                self._compactor = threading.Thread(target=self.compact_history, daemon=True)
+                self._compactor.start()
+            return True
+
+    def _should_compact(self, index):
+        return index.dead_records >= max(HISTORY_COMPACT_MIN_DEAD, index.records // 4)
+
+    def compact_history(self):
+        """Rewrite completed.json without tombstones and deleted projects"""
+        try:
+            with self._history_file_lock.exclusive(), self._history_lock:
+                index = self._index(exclusive=True)
+                if index is None or not index.dead_records:
+                    return True
+                return self._compact_history(index)
+        finally:
+            self._compactor = None
+
+    def _compact_history(self, index):
+        # The counter first: once the tombstones are gone the file alone can't tell
+        if not save_json(self.history_meta_file, {"next_id": index.next_id}):
+            return False
+        # Copies the live lines as they are, without parsing them
+        target = self.completed_file.with_name(f"{self.completed_file.name}.{os.getpid()}-compact.tmp")
+        try:
+            with open(self.completed_file, 'rb') as source, open(target, 'wb') as f:
+                f.write(b'[')
+                for number, project_id in enumerate(index.summaries):
+                    offset, length = index.offsets[project_id]
+                    source.seek(offset)
+                    f.write((b',\n' if number else b'\n') + source.read(length))
+                f.write(b'\n]')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(target, self.completed_file)
+        except Exception as e:
+            logger.exception("Error compacting %s: %s", self.completed_file, e)
+            if target.exists():
+                target.unlink()
+            return False
+        logger.info("Compacted %s: dropped %d deleted record(s)", self.completed_file, index.dead_records)
+        self._history_index = None
+        self._index()
+        return True
+
+    def close(self):
+        """Wait for a background compaction to finish (called on shutdown)"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    target_website TEXT NOT NULL DEFAULT '',
+    start_date TEXT NOT NULL DEFAULT '',
+    end_date TEXT,
+    completed_at TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    item_count INTEGER,
+    checked_count INTEGER,
+    note_count INTEGER,
+    bug_count INTEGER,
+    session_id TEXT,
+    session_name TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_projects_status_completed ON projects (status, completed_at);
+
+CREATE TABLE IF NOT EXISTS headings (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    heading_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_headings_project ON headings (project_id, position);
+
+CREATE TABLE IF NOT EXISTS items (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    heading_row INTEGER NOT NULL REFERENCES headings (id) ON DELETE CASCADE,
+    item_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    checked INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_items_project ON items (project_id, heading_row, position);
+CREATE INDEX IF NOT EXISTS idx_items_heading ON items (heading_row);
+
+CREATE TABLE IF NOT EXISTS notes (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    note_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notes_project ON notes (project_id, position);
+
+CREATE TABLE IF NOT EXISTS bugs (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    bug_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bugs_project ON bugs (project_id, position);
+"""
+
+
+class SqliteBackend:
+    """Current session and history in a SQLite database (WAL mode).
+
+    Projects are rows in ``projects``; each in-progress session is a row with
+    status 'active' and its ``session_id``, completed audits have status
+    'completed'. Headings,
+    items, notes and bugs live in their own tables keyed by project, so
+    completing or deleting a project only touches that project's rows.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.location = db_path
+        self._local = threading.local()
+        # SQLite serializes the writes themselves; this covers a whole
+        # load -> modify -> save of the default session across worker processes
+        self.session_lock = FileLock(db_path)
+        with self._connect() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+            # Databases created before completion stats or several sessions were stored
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(projects)')}
+            for column, column_type in (('item_count', 'INTEGER'), ('checked_count', 'INTEGER'),
+                                        ('note_count', 'INTEGER'), ('bug_count', 'INTEGER'),
+                                        ('session_id', 'TEXT'), ('session_name', 'TEXT'),
+                                        ('created_at', 'TEXT')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE projects ADD COLUMN {column} {column_type}')
+            conn.execute("UPDATE projects SET session_id = ? WHERE status = 'active' AND session_id IS NULL",
+                         (DEFAULT_SESSION_ID,))
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_projects_session ON projects (status, session_id)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def _write_children(self, conn, project_id, project):
+        for h_pos, heading in enumerate(project.get('checklist', [])):
+            cursor = conn.execute(
+                'INSERT INTO headings (project_id, heading_id, position, title) VALUES (?, ?, ?, ?)',
+                (project_id, heading['id'], h_pos, heading['title'])
+            )
+            heading_row = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO items (project_id, heading_row, item_id, position, text, checked) VALUES (?, ?, ?, ?, ?, ?)',
+                [(project_id, heading_row, item['id'], i_pos, item['text'], int(bool(item.get('checked'))))
+                 for i_pos, item in enumerate(heading.get('items', []))]
+            )
+        conn.executemany(
+            'INSERT INTO notes (project_id, note_id, position, text, created_at) VALUES (?, ?, ?, ?, ?)',
+            [(project_id, note['id'], pos, note['text'], note.get('created_at'))
+             for pos, note in enumerate(project.get('notes', []))]
+        )
+        conn.executemany(
+            'INSERT INTO bugs (project_id, bug_id, position, title, description, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+            [(project_id, bug['id'], pos, bug['title'], bug['description'], bug.get('created_at'))
+             for pos, bug in enumerate(project.get('bugs', []))]
+        )
+
+    def _read_children(self, conn, project_id):
+        checklist = []
+        by_row = {}
+        for row in conn.execute(
+                'SELECT id, heading_id, title FROM headings WHERE project_id = ? ORDER BY position', (project_id,)):
+            heading = {"id": row['heading_id'], "title": row['title'], "items": []}
+            by_row[row['id']] = heading
+            checklist.append(heading)
+        for row in conn.execute(
+                'SELECT heading_row, item_id, text, checked FROM items WHERE project_id = ? ORDER BY heading_row, position',
+                (project_id,)):
+            by_row[row['heading_row']]['items'].append(
+                {"id": row['item_id'], "text": row['text'], "checked": bool(row['checked'])}
+            )
+        notes = [
+            {"id": row['note_id'], "text": row['text'], "created_at": row['created_at']}
+            for row in conn.execute(
+                'SELECT note_id, text, created_at FROM notes WHERE project_id = ? ORDER BY position', (project_id,))
+        ]
+        bugs = [
+            {"id": row['bug_id'], "title": row['title'], "description": row['description'], "created_at": row['created_at']}
+            for row in conn.execute(
+                'SELECT bug_id, title, description, created_at FROM bugs WHERE project_id = ? ORDER BY position',
+                (project_id,))
+        ]
+        return checklist, notes, bugs
+
+    def _active_project_id(self, conn, session_id=DEFAULT_SESSION_ID):
+        row = conn.execute("SELECT id FROM projects WHERE status = 'active' AND session_id = ? ORDER BY id LIMIT 1",
+                           (session_id,)).fetchone()
+        return row['id'] if row else None
+
+    def session(self, session_id):
+        """Storage for one session"""
+        return SqliteSession(self, session_id)
+
+    def list_sessions(self):
+        """Metadata of every session (default first), straight from the projects table"""
+        rows = self._connect().execute(
+            "SELECT session_id, session_name, created_at, target_website, start_date FROM projects "
+            "WHERE status = 'active' ORDER BY id"
+        ).fetchall()
+        sessions = [dict(default_session_meta(), id=DEFAULT_SESSION_ID)]
+        for row in rows:
+            meta = {
+                "id": row['session_id'],
+                "name": row['session_name'],
+                "created_at": row['created_at'],
+                "target_website": row['target_website'],
+                "start_date": row['start_date']
+            }
+            if row['session_id'] == DEFAULT_SESSION_ID:
+                sessions[0].update((key, value) for key, value in meta.items() if value is not None)
+            else:
+                sessions.append(meta)
+        return sessions
+
+    def update_session_meta(self, session_id, **fields):
+        """Update the session row's listing columns ahead of its next save"""
+        columns = {'name': 'session_name', 'target_website': 'target_website', 'start_date': 'start_date'}
+        updates = [(columns[key], value) for key, value in fields.items() if key in columns]
+        if not updates:
+            return True
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE projects SET {', '.join(column + ' = ?' for column, _ in updates)} "
+                "WHERE status = 'active' AND session_id = ?",
+                [value for _, value in updates] + [session_id])
+        return True
+
+    def create_session(self, session_id, name):
+        with self._connect() as conn:
+            conn.execute("UPDATE projects SET session_name = ?, created_at = ? WHERE status = 'active' AND session_id = ?",
+                         (name, now_timestamp(), session_id))
+        return True
+
+    def delete_session(self, session_id):
+        """Remove a (non-default) session's row; child rows go with it via ON DELETE CASCADE"""
+        try:
+            self.session(session_id).delete()
+            return True
+        except Exception as e:
+            logger.exception("Error deleting session %s from %s: %s", session_id, self.db_path, e)
+            return False
+
+    def load_session(self, session_id=DEFAULT_SESSION_ID):
+        """Return a session dict, or None if there is none yet"""
+        started = time.perf_counter()
+        try:
+            conn = self._connect()
+            project_id = self._active_project_id(conn, session_id)
+            if project_id is None:
+                return None
+            row = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+            checklist, notes, bugs = self._read_children(conn, project_id)
+            metrics.record_storage('read', self.db_path, started)
+            return {
+                "target_website": row['target_website'],
+                "start_date": row['start_date'],
+                "checklist": checklist,
+                "notes": notes,
+                "bugs": bugs,
+                "version": row['version']
+            }
+        except Exception as e:
+            logger.exception("Error loading session from %s: %s", self.db_path, e)
+            return None
+
+    def session_signature(self, session_id=DEFAULT_SESSION_ID):
+        """The active project's version: bumped by every save, from any process"""
+        row = self._connect().execute(
+            "SELECT id, version FROM projects WHERE status = 'active' AND session_id = ? ORDER BY id LIMIT 1",
+            (session_id,)).fetchone()
+        return (row['id'], row['version']) if row else None
+
+    def backup_corrupt_session(self):
+        """A database session can't be half-written, so there is never anything to move aside"""
+        return None
+
+    def save_session(self, payload, fsync=False, atomic=True, session_id=DEFAULT_SESSION_ID):
+        """Replace the active project's rows with an already-serialized session"""
+        started = time.perf_counter()
+        try:
+            session_data = decode_json(payload)
+            conn = self._connect()
+            if fsync:
+                conn.execute('PRAGMA synchronous=FULL')
+            try:
+                with conn:
+                    project_id = self._active_project_id(conn, session_id)
+                    if project_id is None:
+                        project_id = conn.execute(
+                            "INSERT INTO projects (status, session_id, created_at) VALUES ('active', ?, ?)",
+                            (session_id, now_timestamp())).lastrowid
+                    conn.execute(
+                        'UPDATE projects SET target_website = ?, start_date = ?, version = ? WHERE id = ?',
+                        (session_data.get('target_website', ''), session_data.get('start_date', ''),
+                         session_data.get('version', 0), project_id)
+                    )
+                    for table in ('items', 'headings', 'notes', 'bugs'):
+                        conn.execute(f'DELETE FROM {table} WHERE project_id = ?', (project_id,))
+                    self._write_children(conn, project_id, session_data)
+            finally:
+                if fsync:
+                    conn.execute('PRAGMA synchronous=NORMAL')
+            metrics.record_storage('write', self.db_path, started)
+            return True
+        except Exception as e:
+            logger.exception("Error saving session to %s: %s", self.db_path, e)
+            return False
+
+    def ensure_history(self):
+        """Tables are created on connect, so there is never anything to repair"""
+        return False
+
+    def load_history(self):
+        """Return every completed project, oldest first"""
+        try:
+            conn = self._connect()
+            history = []
+            for row in conn.execute(
+                    "SELECT * FROM projects WHERE status = 'completed' ORDER BY id").fetchall():
+                history.append(self._project_from_row(conn, row))
+            return history
+        except Exception as e:
+            logger.exception("Error loading history from %s: %s", self.db_path, e)
+            return None
+
+    def iter_history(self, start=None, end=None):
+        """Yield completed projects oldest first, one at a time, optionally only those completed from start to end"""
+        query = "SELECT id FROM projects WHERE status = 'completed'"
+        params = []
+        if start:
+            query += " AND substr(completed_at, 1, 10) >= ?"
+            params.append(start)
+        if end:
+            query += " AND substr(completed_at, 1, 10) <= ?"
+            params.append(end)
+        project_ids = [row[0] for row in self._connect().execute(query + " ORDER BY id", params).fetchall()]
+        for project_id in project_ids:
+            # Skips projects deleted while the export runs
+            project = self.get_history_entry(project_id)
+            if project is not None:
+                yield project
+
+    def list_history(self, limit, offset):
+        """Return (total, summaries) for one page of history, newest first; counts come from SQL"""
+        try:
+            conn = self._connect()
+            total = conn.execute("SELECT COUNT(*) FROM projects WHERE status = 'completed'").fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT p.id, p.target_website, p.start_date, p.end_date, p.completed_at,
+                       COALESCE(p.item_count,
+                                (SELECT COUNT(*) FROM items i WHERE i.project_id = p.id)) AS item_count,
+                       COALESCE(p.checked_count,
+                                (SELECT COALESCE(SUM(i.checked), 0) FROM items i WHERE i.project_id = p.id)) AS checked_count,
+                       COALESCE(p.note_count,
+                                (SELECT COUNT(*) FROM notes n WHERE n.project_id = p.id)) AS note_count,
+                       COALESCE(p.bug_count,
+                                (SELECT COUNT(*) FROM bugs b WHERE b.project_id = p.id)) AS bug_count
+                FROM projects p
+                WHERE p.status = 'completed'
+                ORDER BY p.id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (limit, offset)
+            ).fetchall()
+            summaries = []
+            for row in rows:
+                summary = dict(row)
+                summary['completion_percentage'] = (
+                    round(summary['checked_count'] / summary['item_count'] * 100, 1) if summary['item_count'] else 0
+                )
+                summaries.append(summary)
+            return total, summaries
+        except Exception as e:
+            logger.exception("Error listing history from %s: %s", self.db_path, e)
+            return None
+
+    def data_files(self):
+        """The files whose size /metrics reports"""
+        return [self.db_path, self.db_path.with_name(f"{self.db_path.name}-wal")]
+
+    def get_history_entry(self, project_id):
+        """Return one completed project, or None"""
+        started = time.perf_counter()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT * FROM projects WHERE id = ? AND status = 'completed'", (project_id,)).fetchone()
+        if row is None:
+            return None
+        project = self._project_from_row(conn, row)
+        metrics.record_storage('read', self.db_path, started)
+        return project
+
+    def _project_from_row(self, conn, row):
+        checklist, notes, bugs = self._read_children(conn, row['id'])
+        project = {
+            "id": row['id'],
+            "target_website": row['target_website'],
+            "start_date": row['start_date'],
+            "end_date": row['end_date'],
+            "completed_at": row['completed_at'],
+            "checklist": checklist,
+            "notes": notes,
+            "bugs": bugs
+        }
+        project['stats'] = project_stats(project)
+        return project
+
+    def add_history_entry(self, entry):
+        """Insert one completed project in a single transaction; returns the stored entry"""
+        stored = self.add_history_entries([entry])
+        return stored[0] if stored else None
+
+    def add_history_entries(self, entries):
+        """Insert several completed projects in one transaction; returns them with their ids"""
+        started = time.perf_counter()
+        try:
+            conn = self._connect()
+            conn.execute('PRAGMA synchronous=FULL')
+            try:
+                with conn:
+                    project_ids = [self._insert_project(conn, entry) for entry in entries]
+            finally:
+                conn.execute('PRAGMA synchronous=NORMAL')
+            metrics.record_storage('append', self.db_path, started)
+            return [{"id": project_id, **entry} for project_id, entry in zip(project_ids, entries)]
+        except Exception as e:
+            logger.exception("Error adding history entries to %s: %s", self.db_path, e)
+            return None
+
+    def _insert_project(self, conn, entry):
+        stats = entry.get('stats') or project_stats(entry)
+        project_id = conn.execute(
+            "INSERT INTO projects (id, status, target_website, start_date, end_date, completed_at, "
+            "item_count, checked_count, note_count, bug_count) "
+            "VALUES (?, 'completed', ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.get('id'), entry.get('target_website', ''), entry.get('start_date', ''),
+             entry.get('end_date'), entry.get('completed_at'), stats['item_count'],
+             stats['checked_count'], stats['note_count'], stats['bug_count'])
+        ).lastrowid
+        self._write_children(conn, project_id, entry)
+        return project_id
+
+    def delete_history_entry(self, project_id):
+        """Remove a completed project; child rows go with it via ON DELETE CASCADE"""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM projects WHERE id = ? AND status = 'completed'", (project_id,))
+            return True
+        except Exception as e:
+            logger.exception("Error deleting history entry from %s: %s", self.db_path, e)
+            return False
+
+    def import_projects(self, sessions, history):
+        """Bulk load sessions (metadata, body pairs) and completed history, keeping history ids"""
+        conn = self._connect()
+        with conn:
+            for entry in history:
+                self._insert_project(conn, entry)
+        for meta, session_data in sessions:
+            self.save_session(json.dumps(session_data, ensure_ascii=False), fsync=True, session_id=meta['id'])
+            if meta['id'] != DEFAULT_SESSION_ID:
+                with conn:
+                    conn.execute(
+                        "UPDATE projects SET session_name = ?, created_at = ? WHERE status = 'active' AND session_id = ?",
+                        (meta.get('name'), meta.get('created_at'), meta['id']))
+
+    def is_empty(self):
+        """True if no project (active or completed) has been stored yet"""
+        return self._connect().execute('SELECT 1 FROM projects LIMIT 1').fetchone() is None
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SqliteSession:
+    """One session in a SqliteBackend (what a SessionStore reads and writes)"""
+
+    def __init__(self, backend, session_id):
+        self.backend = backend
+        self.session_id = session_id
+        self.location = backend.db_path
+        # Each session has its own cross-process lock, so sessions don't wait for each other
+        if session_id == DEFAULT_SESSION_ID:
+            self.session_lock = backend.session_lock
+        else:
+            db_path = backend.db_path
+            self.session_lock = FileLock(db_path.with_name(f"{db_path.name}.{session_id}"))
+
+    def exists(self):
+        return self.backend._active_project_id(self.backend._connect(), self.session_id) is not None
+
+    def load_session(self):
+        return self.backend.load_session(self.session_id)
+
+    def save_session(self, payload, fsync=False, atomic=True):
+        return self.backend.save_session(payload, fsync=fsync, atomic=atomic, session_id=self.session_id)
+
+    def session_signature(self):
+        return self.backend.session_signature(self.session_id)
+
+    def backup_corrupt_session(self):
+        return self.backend.backup_corrupt_session()
+
+    def delete(self):
+        with self.backend._connect() as conn:
+            conn.execute("DELETE FROM projects WHERE status = 'active' AND session_id = ?", (self.session_id,))
+        if self.session_lock is not self.backend.session_lock:
+            self.session_lock.lock_path.unlink(missing_ok=True)
+
+
+def create_backend(name, data_dir):
+    """Build the storage backend selected by configuration"""
+    if name == 'sqlite':
+        return SqliteBackend(data_dir / 'qa_checklist.db')
+    if name == 'json':
+        return JsonBackend(data_dir)
+    raise ValueError(f"Unknown storage backend: {name}")
+
+def migrate_json_to_sqlite(json_backend, sqlite_backend):
+    """One-shot import of current_session.json and completed.json into SQLite"""
+    if not sqlite_backend.is_empty():
+        raise RuntimeError(f"{sqlite_backend.db_path} already contains data; refusing to migrate over it")
+    sessions = []
+    for meta in json_backend.list_sessions():
+        session_data = json_backend.session(meta['id']).load_session()
+        if session_data is not None:
+            sessions.append((meta, session_data))
+    history = json_backend.load_history() or []
+    sqlite_backend.import_projects(sessions, history)
+    return len(history), len(sessions)
+
+
+class SessionLock:
+    """The lock routes hold around load -> modify -> save (``SessionStore.lock``).
+
+    A re-entrant in-process lock. For a store in shared mode the outermost
+    acquisition also takes the backend's cross-process session lock and
+    first picks up any change another process wrote.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and self._store.shared:
+            try:
+                self._store._begin_shared()
+            except BaseException:
+                self._depth -= 1
+                self._lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if self._depth == 1 and self._store.shared:
+                self._store._end_shared()
+        finally:
+            self._depth -= 1
+            self._lock.release()
+
+
+class SessionStore:
+    """Keeps the current session in memory and writes it to disk behind the requests.
+
+    Every change marks the session dirty; the first dirty change in a quiet
+    period arms a timer and all changes that land before it fires are coalesced
+    into a single write. ``flush_interval`` is therefore the upper bound (in
+    seconds) on how much work a crash can lose. An interval of 0 writes
+    synchronously.
+
+    In journal mode, operations passed to ``apply`` are instead appended as one
+    JSON line each to ``journal_path`` and the snapshot is only rewritten
+    (atomically) when the journal grows past ``compact_bytes``. Loading replays
+    the journal over the snapshot. Every applied operation bumps the session
+    ``version`` so replay can skip operations the snapshot already contains.
+
+    The last ``changelog_size`` applied operations are also kept in memory so
+    clients can catch up with ``changes_since`` instead of refetching the
+    whole session. Versions are only comparable within one ``epoch`` (one
+    server process).
+
+    With ``shared=True`` several processes (e.g. WSGI workers) may use the
+    same data directory: every ``lock`` acquisition holds the session file
+    lock across processes and reloads the session if another process changed
+    it, and every change is written before the lock is released. Journal mode
+    is not available in shared mode.
+    """
+
+    def __init__(self, backend, flush_interval=1.0, journal_path=None, compact_bytes=256 * 1024,
+                 changelog_size=1000, shared=False):
+        if shared and journal_path is not None:
+            raise ValueError("Journal mode can't be combined with a shared (multi-process) session")
+        self.backend = backend
+        self.flush_interval = 0 if shared else flush_interval
+        self.journal_path = journal_path
+        self.compact_bytes = compact_bytes
+        self.shared = shared
+        self.epoch = uuid.uuid4().hex[:8]
+        self._changes = deque(maxlen=changelog_size)
+        self._listeners = []
+        # What the backend looked like when we last read or wrote it (shared mode)
+        self._signature = None
+        # Held by routes around load -> modify -> save
+        self.lock = SessionLock(self)
+        # Serializes the actual file writes; never acquire self.lock while holding it
+        self._write_lock = threading.Lock()
+        self._data = None
+        self._model = None
+        self._dirty = False
+        self._timer = None
+        self._generation = 0
+        self._written_generation = 0
+        self._journal = None
+        self._compacting = False
+
+    def load(self):
+        """Return the in-memory session, reading it from disk on first use"""
+        with self.lock:
+            metrics.record_cache('session', self._data is not None)
+            if self._data is None:
+                data = self.backend.load_session()
+                if data is not None:
+                    data.setdefault('version', 0)
+                    self._model = SessionModel(data)
+                    if self.journal_path is not None:
+                        self._replay_journal(self._model)
+                self._data = data
+                if self.shared:
+                    self._signature = self.backend.session_signature()
+            return self._data
+
+    def model(self):
+        """Return the indexed view of the in-memory session (None if there is no session)"""
+        with self.lock:
+            if self.load() is None:
+                return None
+            return self._model
+
+    def reload(self):
+        """Drop the in-memory copy and read the session from disk again"""
+        with self.lock:
+            self._cancel_timer()
+            self._data = None
+            self._model = None
+            self._dirty = False
+            self._changes.clear()
+            return self.load()
+
+    def save(self, data, sync=False):
+        """Replace the session and schedule (or, with sync=True, perform) a durable write"""
+        with self.lock:
+            # Keep the version moving forward even when the whole session is replaced
+            previous = self._data.get('version', 0) if self._data else 0
+            data['version'] = max(previous, data.get('version', 0)) + 1
+            self._data = data
+            self._model = SessionModel(data)
+            # Operations from before the replacement no longer lead to this state
+            self._changes.clear()
+            self._notify('replace', {"version": data['version']})
+            if self.journal_path is not None:
+                return self.compact(fsync=sync)
+            return self._mark_dirty(sync)
+
+    def apply(self, operation):
+        """Apply one operation (see SessionModel.apply) and persist it"""
+        with self.lock:
+            data = self.load()
+            if data is None:
+                return False
+            self._model.apply(operation)
+            data['version'] = data.get('version', 0) + 1
+            operation = dict(operation, version=data['version'])
+            self._changes.append(operation)
+            self._notify('operation', operation)
+            if self.journal_path is not None:
+                return self._append_journal(operation)
+            return self._mark_dirty()
+
+    def add_listener(self, callback):
+        """Call ``callback(kind, data)`` after every change, with the lock held.
+
+        ``kind`` is 'operation' (data is the applied operation, including its
+        version) or 'replace' (the whole session was replaced; data holds the
+        new version). Callbacks must not block.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, kind, data):
+        for callback in self._listeners:
+            try:
+                callback(kind, data)
+            except Exception as e:
+                logger.exception("Error in session listener: %s", e)
+
+    def changes_since(self, version):
+        """Operations applied after ``version``, oldest first.
+
+        Returns None when the changelog no longer reaches back that far (or
+        the version is from the future), in which case the caller has to
+        resend the whole session.
+        """
+        with self.lock:
+            data = self.load()
+            if data is None:
+                return None
+            current = data['version']
+            # The changelog holds a contiguous run of versions ending at current
+            oldest = self._changes[0]['version'] - 1 if self._changes else current
+            if version < oldest or version > current:
+                return None
+            return [operation for operation in self._changes if operation['version'] > version]
+
+    def _mark_dirty(self, sync=False):
+        self._dirty = True
+        if sync or self.flush_interval <= 0:
+            return self.flush(fsync=sync)
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+        return True
+
+    def flush(self, fsync=False):
+        """Write pending changes to disk now"""
+        with self.lock:
+            self._cancel_timer()
+            if not self._dirty or self._data is None:
+                return True
+            # Serialize under the lock so the snapshot is consistent,
+            # but do the disk write without blocking other requests
+            started = time.perf_counter()
+            payload = dump_json(self._data)
+            metrics.record_storage('serialize', self.backend.location, started)
+            self._dirty = False
+            self._generation += 1
+            generation = self._generation
+
+        with self._write_lock:
+            # A newer snapshot may already have been written by another thread
+            if generation < self._written_generation:
+                return True
+            saved = self.backend.save_session(payload, fsync=fsync)
+            if saved:
+                self._written_generation = generation
+                if self.shared:
+                    self._signature = self.backend.session_signature()
+
+        if not saved:
+            with self.lock:
+                self._dirty = True
+        return saved
+
+    def close(self):
+        """Flush and fsync any pending changes (called on shutdown)"""
+        if self.journal_path is not None:
+            with self.lock:
+                if self._data is None:
+                    return True
+                return self.compact(fsync=True)
+        return self.flush(fsync=True)
+
+    def compact(self, fsync=False):
+        """Fold the journal into a fresh snapshot and truncate it"""
+        with self.lock:
+            self._compacting = False
+            if self._data is None:
+                return True
+            # Snapshot first, atomically: if we crash before truncating, replay
+            # simply skips the operations whose version the snapshot already has
+            if not self.backend.save_session(dump_json(self._data), fsync=fsync, atomic=True):
+                return False
+            journal = self._open_journal()
+            journal.seek(0)
+            journal.truncate()
+            journal.flush()
+            return True
+
+    def _open_journal(self):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return self._journal
+
+    def _append_journal(self, operation):
+        try:
+            started = time.perf_counter()
+            journal = self._open_journal()
+            line = json.dumps(operation, ensure_ascii=False, separators=(',', ':')) + '\n'
+            journal.write(line)
+            journal.flush()
+            metrics.record_storage('append', self.journal_path, started, len(line.encode('utf-8')))
+        except Exception as e:
+            logger.exception("Error appending to %s: %s", self.journal_path, e)
+            return False
+
+        if journal.tell() >= self.compact_bytes and not self._compacting:
+            # Fold the journal in the background so this request doesn't pay for it
+            self._compacting = True
+            threading.Thread(target=self.compact, daemon=True).start()
+        return True
+
+    def _replay_journal(self, model):
+        """Apply journaled operations newer than the snapshot; drop a torn last line"""
+        if not self.journal_path.exists():
+            return
+
+        data = model.data
+
+        replayed = 0
+        good_offset = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    operation = json.loads(line)
+                except ValueError:
+                    # A crash mid-append leaves a partial line; everything after it is unusable
+                    logger.warning("Discarding torn journal entry at byte %d of %s", good_offset, self.journal_path)
+                    break
+                good_offset += len(line)
+                if operation.get('version', 0) <= data['version']:
+                    continue
+                model.apply(operation)
+                data['version'] = operation['version']
+                replayed += 1
+
+        if good_offset != self.journal_path.stat().st_size:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+        if replayed:
+            logger.info("Replayed %d journaled operation(s) from %s", replayed, self.journal_path)
+
+    def discard(self):
+        """Forget the session without writing it (it has been deleted)"""
+        with self.lock:
+            self._cancel_timer()
+            self._data = None
+            self._model = None
+            self._dirty = False
+            self._changes.clear()
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def is_stale(self):
+        """True if another process changed the session since we last read or wrote it"""
+        return self.shared and self._data is not None and self.backend.session_signature() != self._signature
+
+    def _begin_shared(self):
+        self.backend.session_lock.acquire()
+        try:
+            if self.is_stale():
+                self._data = None
+                self._model = None
+                self._dirty = False
+                self._changes.clear()
+                data = self.load()
+                # Streams on this process haven't seen the other process's changes
+                if data is not None:
+                    self._notify('replace', {"version": data['version']})
+        except BaseException:
+            self.backend.session_lock.release()
+            raise
+
+    def _end_shared(self):
+        try:
+            # Changes are flushed synchronously in shared mode; this only
+            # retries one whose write failed
+            if self._dirty:
+                self.flush()
+        finally:
+            self.backend.session_lock.release()
+
+    def _flush_from_timer(self):
+        with self.lock:
+            self._timer = None
+        self.flush()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+class SessionManager:
+    """One SessionStore per session, opened on first use.
+
+    Every session has its own store, lock and storage (file or row), so
+    requests for different sessions never wait for each other; only looking
+    a store up takes the manager's lock. ``on_open(session_id, store)`` is
+    called once for each store as it is opened. In shared (multi-process)
+    mode a session deleted by another process is noticed on lookup.
+    """
+
+    def __init__(self, backend, journal_dir=None, on_open=None, shared=False, **store_options):
+        self.backend = backend
+        self.journal_dir = journal_dir
+        self.on_open = on_open
+        self.shared = shared
+        self.store_options = store_options
+        self._lock = threading.Lock()
+        self._stores = {}
+
+    def _journal_path(self, session_id):
+        if self.journal_dir is None:
+            return None
+        if session_id == DEFAULT_SESSION_ID:
+            return self.journal_dir / 'current_session.journal'
+        return self.journal_dir / 'sessions' / f"{session_id}.journal"
+
+    def _open(self, session_id):
+        journal_path = self._journal_path(session_id)
+        if journal_path is not None:
+            journal_path.parent.mkdir(exist_ok=True)
+        store = SessionStore(self.backend.session(session_id), journal_path=journal_path,
+                             shared=self.shared, **self.store_options)
+        self._stores[session_id] = store
+        if self.on_open is not None:
+            self.on_open(session_id, store)
+        return store
+
+    def get(self, session_id):
+        """The store for a session, or None if there is no such session"""
+        if not SESSION_ID_PATTERN.match(session_id):
+            return None
+        with self._lock:
+            store = self._stores.get(session_id)
+            if session_id == DEFAULT_SESSION_ID:
+                return store or self._open(session_id)
+            if store is not None and (not self.shared or store.backend.exists()):
+                return store
+            if store is not None:
+                # Deleted by another worker process
+                del self._stores[session_id]
+                store.discard()
+                return None
+            if not self.backend.session(session_id).exists():
+                return None
+            return self._open(session_id)
+
+    def create(self, name, data):
+        """Start a new session from ``data``; returns its id, or None if it couldn't be written"""
+        session_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            store = self._open(session_id)
+            # The body first: a session exists once its body does
+            if not store.save(data, sync=True) or not self.backend.create_session(session_id, name):
+                del self._stores[session_id]
+                store.discard()
+                self.backend.delete_session(session_id)
+                return None
+        return session_id
+
+    def delete(self, session_id):
+        """Delete a session (never the default one); returns False if that failed"""
+        with self._lock:
+            store = self._stores.pop(session_id, None)
+            if store is not None:
+                store.discard()
+            journal_path = self._journal_path(session_id)
+            if journal_path is not None:
+                journal_path.unlink(missing_ok=True)
+            return self.backend.delete_session(session_id)
+
+    def list(self):
+        """Metadata of every session, without loading any session body"""
+        return self.backend.list_sessions()
+
+    def close(self):
+        """Flush every open session (called on shutdown)"""
+        with self._lock:
+            stores = list(self._stores.values())
+        for store in stores:
+            store.close()
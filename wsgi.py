@@ -0,0 +1,17 @@
+"""
+QA Testing Checklist Application
+Production entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app           # Linux/macOS
+    waitress-serve --threads 8 wsgi:app             # Windows (or anywhere)
+
+Each worker process imports this module once: that builds the application,
+loads default_checklist.json and checks the data files before the first
+request comes in. Configure it with the QA_* environment variables (see
+readme.md); several gunicorn workers need QA_MULTI_PROCESS=1, which
+gunicorn.conf.py sets for you.
+"""
+
+from app import create_app
+
+app = create_app()